@@ -3,11 +3,78 @@ import streamlit as st
 st.set_page_config(layout="wide")
 
 
-import pandas as pd
-from verify import Verify
-from constants import charts, classification_columns, RULES
+from verify import Verify, prepare_classification
+from output import make_sink, NullSink
+from presenter import present
+from profiling import Profile
+from streaming import stream_verify, ReportReadError
+from readers import read_table, read_classification, sniff_format, file_digest
+from constants import charts, rules_help
 from utils import match_chart_type_from_filename
 
+# ==========================================================================================================================
+# * * * 快取：以上傳檔案的內容雜湊值（加上報表種類）為鍵，重新執行腳本時不需要重新讀取與驗證 * * *
+# ==========================================================================================================================
+
+def upload_digest(upload):
+    """上傳檔案的內容雜湊值；同一個上傳檔案 (file_id) 在 session 中只計算一次"""
+    digests = st.session_state.setdefault("upload_digests", {})
+    if upload.file_id not in digests:
+        digests[upload.file_id] = file_digest(upload)
+    return digests[upload.file_id]
+
+@st.cache_data(show_spinner = False, max_entries = 8)
+def load_classification(digest, _upload):
+    """讀取並準備分類表（加上組合鍵欄位）"""
+    return prepare_classification(read_classification(_upload))
+
+def load_report(chart_name, upload):
+    """
+    讀取報表；Parquet / Arrow 只載入此報表種類需要的欄位
+
+    不另外快取讀入的報表：run_verification 已快取驗證結果，保留整份報表只會佔用記憶體。
+    """
+    return read_table(upload, chart_name = chart_name)
+
+@st.cache_data(show_spinner = False, max_entries = 16)
+def run_verification(report_digest, classification_digest, chart_name, streaming_mode, trace_memory, _report, _classification):
+    """
+    執行分類覆蓋率檢查與報表種類的所有驗證步驟
+
+    只做計算不輸出，顯示時再交給 presenter.present；重新執行腳本時直接使用快取的結果。
+    trace_memory 時以 tracemalloc 記錄各步驟的記憶體峰值（會使驗證慢數倍，預設不開啟）。
+
+    Returns
+    -------
+    tuple or None
+        (各檢查的結果物件 (results.py) 列表, 讀檔與各步驟的效能紀錄 (profiling.Profile))；報表無法讀取時回傳 None
+    """
+    profile = Profile(trace_memory = trace_memory)
+    with profile.measure("prepare_classification"):
+        classification = load_classification(classification_digest, _classification)
+    verifier = Verify(classification, sink = NullSink(), profile = profile)
+
+    if streaming_mode:
+        # 逐段累計後一次整理所有步驟（含分類覆蓋率）的結果；讀到格式錯誤的區塊時與一次讀取相同地回報，
+        # 驗證步驟本身的錯誤照常拋出，不會被當成報表格式錯誤快取
+        try:
+            stream_verify(verifier, _report, chart_name)
+        except ReportReadError:
+            return None
+        return list(verifier.results.values()), profile
+
+    try:
+        with profile.measure("load_report"):
+            data = load_report(chart_name, _report)
+    except Exception:
+        return None
+
+    # 先檢查分類覆蓋率，再依 constants.charts 的步驟清單驗證
+    verifier.check_category_coverage(data)
+    verifier.run_plan(data, chart_name)
+    return list(verifier.results.values()), profile
+
+
 st.title("設研院資料驗證平台")
 st.markdown("""<style>
 div[data-baseweb="select"]:hover {
@@ -42,7 +109,7 @@ if 'chart_name' not in st.session_state:
     st.session_state.chart_name = chart_keys[0]
 
 with CR:
-    data = st.file_uploader("上傳欲驗證的報表", type = ["csv", "xlsx"], key="data_file")
+    data = st.file_uploader("上傳欲驗證的報表", type = ["csv", "xlsx", "parquet", "arrow", "feather"], key="data_file")
     if data is not None:
         # 檢查是否是新上傳的檔案
         file_changed = (st.session_state.last_uploaded_file != data.name)
@@ -58,22 +125,31 @@ with CR:
         st.session_state.last_uploaded_file = data.name
     submit = st.button("開始驗證")
 with CL:
-    classification = st.file_uploader("上傳你的分類表", type = ["csv", "xlsx"])
+    classification = st.file_uploader("上傳你的分類表", type = ["csv", "xlsx", "parquet", "arrow", "feather"])
     # selectbox 使用 session_state 的值，不設定 index 參數
     chart_name = st.selectbox("選擇欲驗證的報表種類", chart_keys, key="chart_name")
+    # 輸出模式：批次（驗證完成後一次顯示）、即時、逐字動畫
+    output_mode = st.radio(
+        "輸出模式",
+        ["buffered", "instant", "animated"],
+        format_func = lambda x: {"buffered": "完成後一次顯示", "instant": "即時顯示", "animated": "逐字動畫"}[x],
+        horizontal = True
+    )
+    # 大型 csv 報表分段讀取，記憶體用量取決於每段的列數而不是檔案大小
+    streaming_mode = st.checkbox("分段讀取大型 csv 報表（節省記憶體）")
+    # tracemalloc 會拖慢每個步驟數倍，只在需要時開啟
+    trace_memory = st.checkbox("記錄各步驟的記憶體峰值（驗證會變慢）")
     
     # 只在無法自動判斷時顯示警告
     if data is not None and not auto_detected:
         st.warning(f"⚠️ 無法自動判斷報表類型，請手動選擇正確的類型")
 
-help = "".join([RULES[x] for x in charts[chart_name]])
+help = rules_help(chart_name)
 instruction = st.empty()
 with instruction.container():
     st.code(help , wrap_lines = False)
 
 if submit:
-    instruction.empty()
-    
     # 檢查是否上傳了分類表
     if classification is None:
         st.error("❌ 請上傳分類表！")
@@ -83,81 +159,47 @@ if submit:
     if data is None:
         st.error("❌ 請上傳欲驗證的報表！")
         st.stop()
-    
-    # 讀取分類表
+
+    # 記住這次驗證的檔案與設定；之後重新執行腳本（例如按下載按鈕）時直接顯示快取的結果
+    st.session_state.verification = (upload_digest(data), upload_digest(classification), chart_name, streaming_mode, trace_memory)
+
+if (
+    data is not None and classification is not None
+    and st.session_state.get("verification") == (upload_digest(data), upload_digest(classification), chart_name, streaming_mode, trace_memory)
+):
+    instruction.empty()
+
+    # 讀取分類表（依檔案內容判斷格式；同一份分類表只解析一次）
     try:
-        classification = pd.read_csv(classification)
-    except:
-        try:
-            classification = pd.read_excel(classification)
-        except:
-            st.error("❌ 分類表格式錯誤，請上傳 csv 或 xlsx 檔案！")
-            st.stop()
-        
-    # 讀取報表資料
-    with st.spinner("讀取報表資料..."):  
-        try:
-            data = pd.read_csv(data)
-        except:
-            try:
-                data = pd.read_excel(data)
-            except:
-                st.error("❌ 報表格式錯誤，請上傳 csv 或 xlsx 檔案！")
-                st.stop()
-    
-    classification['classification_further_subcategory'] = classification.apply(lambda row: "_".join([row[col] for col in classification_columns]), axis = 1)
-    classification['classification_subcategory'] = classification.apply(lambda row: "_".join([row[col] for col in classification_columns if col != "further_subcategory"]), axis = 1)
-    verifier = Verify(classification)
+        load_classification(upload_digest(classification), classification)
+    except Exception:
+        st.error("❌ 分類表格式錯誤，請上傳 csv、xlsx、Parquet 或 Arrow 檔案！")
+        st.stop()
+
+    with st.spinner("驗證中..."):
+        # 分段讀取模式只適用於 csv；在驗證時才逐段讀取
+        verification = run_verification(
+            upload_digest(data),
+            upload_digest(classification),
+            chart_name,
+            streaming_mode and sniff_format(data) == "csv",
+            trace_memory,
+            data,
+            classification
+        )
+    if verification is None:
+        st.error("❌ 報表格式錯誤，請上傳 csv、xlsx、Parquet 或 Arrow 檔案！")
+        st.stop()
+    results, profile = verification
 
+    sink = make_sink(output_mode)
     with st.container(border = True):
-        # 先檢查分類覆蓋率
-        verifier.check_category_coverage(data)
-        if chart_name == "products":
-            dup_ids = verifier.check_products(data)
-            if dup_ids:
-                st.download_button(
-                    label = "下載 products 重複列 id",
-                    data = "\n".join(map(str, dup_ids)),
-                    file_name = "products_duplicated_id.txt",
-                    mime = "text/plain"
-                )
-
-        if chart_name == "products_extend":
-            dup_ids = verifier.check_products_extend(data)
-            if dup_ids:
-                st.download_button(
-                    label = "下載 products extend 重複列 id",
-                    data = "\n".join(map(str, dup_ids)),
-                    file_name = "products_extend_duplicated_id.txt",
-                    mime = "text/plain"
-                )
-
-        if chart_name == "chart_brands":
-            verifier.check_chart_brands(data)
-
-        if chart_name == "chart_brands_extend":
-            verifier.check_chart_brands_extend(data)
-
-        if chart_name == "chart_brands_extend_cross":
-            verifier.check_chart_brands_extend_cross(data)
-
-        if chart_name == "chart_brands_extend_image":
-            verifier.check_chart_brands_extend_image(data)
-
-        if chart_name == "chart_brands_comment_counts":
-            verifier.check_chart_brands_comment_counts(data)
-
-        # if chart_name == "chart_brands_comment_score":
-        #    verifier.check_chart_brands_comment_score(data)
-
-        if chart_name == "chart_others":
-            verifier.check_chart_others(data)
-
-        if chart_name == "chart_trends":
-            verifier.check_chart_trends(data)
-
-        if chart_name == "reference":
-            verifier.check_reference(data)
-
-        if chart_name == "keyword":
-            verifier.check_keyword(data)
\ No newline at end of file
+        with profile.measure("render"):
+            for result in results:
+                present(result, sink)
+            # 所有檢查完成後才輸出（buffered 模式）
+            sink.flush()
+
+    # 快取命中時讀檔與驗證步驟沿用第一次執行的紀錄；render 為這次顯示的時間
+    with st.expander("⏱️ 各步驟執行時間與記憶體" if trace_memory else "⏱️ 各步驟執行時間"):
+        st.dataframe(profile.to_frame(), hide_index = True)
@@ -1,3 +1,5 @@
+from rules import load_rules
+
 RULES = {
     "step1": """
 🔆 欄位檢測：依照輸入的報表種類與對應欄位規範，判斷是否缺少特定欄位。
@@ -10,9 +12,8 @@ RULES = {
 🔆 空值分析：印出各欄位的空值分佈狀況，以 dataframe 格式呈現。第一列為空值數量，第二列為空值比例。
 """,
     "step3": """
-🔆 重複值檢測：針對 products 和 products_extend 表格，計算重複值出現的次數，並且回傳重複列的 id（並非 source_product_id）。
-    - products 表使用 'source_product_id' 作為判定是否重複的欄位。
-    - products_extend 表使用 'source_product_id', 'extend_class', 'extend_detail' 作為判定是否重複的欄位。
+🔆 重複值檢測：計算重複值出現的次數，並且回傳重複列的 id（並非 source_product_id）。
+    - 使用 {duplicate_keys} 作為判定是否重複的欄位。
     • 若沒有重複值，則輸出以下：
         ✅ 沒有重複的[產品|產品擴增屬性]資料
     • 若有，則輸出以下：
@@ -22,8 +23,7 @@ RULES = {
     "step4": """
 🔆 擴充屬性檢測：
     • 針對所選報表的擴充屬性規範，判斷資料中是否缺少特定擴充屬性的統計資料。以 dataframe 呈現。缺少的擴充屬性會有 ❌ 標記。
-    • 分析各個 extend_class 下，extend_subclass 出現空值的比率。若為 products_extend 報表，額外檢查 extend_unit 出現空值的比率。以 dataframe 呈現。
-""",
+{extend_null_columns}""",
     "step5": """
 🔆 子品類標籤驗證：驗證產品分類組合（category, subcategory, further_subcategory）是否符合產品分類規範。產品分類規範的範例：設研院產品資料表.xlsx
     • 輸出以下：
@@ -36,349 +36,91 @@ RULES = {
         🔔 標籤數量排名
         -資料中的名次：[資料中名次的值域]
         -規範名次：[該報表的名次規範]
+    • 若有名次不在規範內（1 ~ 最大名次，或 999），則輸出以下：
+        ⚠️ [名次欄位]: 共有 [X] 列的名次不在規範內：[不符規範的名次]
+        (最後面提供下載不符規範列 id 的按鈕)
 """,
     "step7": """
-🔆 小數點位數驗證：對有 extend_stats 欄位的報表，檢驗以下兩點：
-    - ratio: 是否最多至小數三位
-        • 若有列數之 ratio 超過三位小數，輸出以下：
-            🔔 extend_stats -> ratio: [X] 列超過 3 位小數
-    - avg_price: 是否最多至小數兩位
-        • 若有列數之 avg_price 超過兩位小數，輸出以下：
-            🔔 extend_stats -> avg_price: [X] 列超過 2 位小數
-
+🔆 小數點位數驗證：對有 extend_stats 欄位的報表，檢驗以下各項：
+{decimal_limits}
     • 若報表沒有 extend_stats，則輸出以下：
         ✅ 沒有 extend_stats 欄位
+""",
+    "step8": """
+🔆 搜尋量檢測：檢查 keyword 表中 search_volume 欄位為 0 或空值的列數。
+    • 若沒有，則輸出以下：
+        ✅ 沒有 search_volume 為 0 或空值的資料
+    • 若有，則輸出以下：
+        🔔 共有 [X] 列之 search_volume 為 0 或空值！
 """
 }
 
 
-charts = {
-    "products": ["step1", "step2", "step3", "step5"],
-    "products_extend": ["step1", "step2", "step3", "step4", "step5"],
-    "chart_brands": ["step1", "step2", "step5", "step6"],
-    "chart_brands_extend": ["step1", "step2", "step4", "step5", "step6", "step7"],
-    "chart_brands_extend_cross": ["step1", "step2", "step4", "step5", "step6", "step7"],
-    "chart_brands_extend_image": ["step1", "step2", "step4", "step5", "step6", "step7"],
-    "chart_brands_comment_counts":["step1", "step2", "step4", "step5", "step6", "step7"],
-    # "chart_brands_comment_score":["step1", "step2", "step4", "step5"],
-    "chart_others": ["step1", "step2", "step4", "step5", "step6", "step7"],
-    "chart_trends": ["step1", "step2", "step5", "step6"],
-    "reference": ["step1", "step2", "step5"],
-    "keyword": ["step1", "step2", "step5"]
-}
+# step4 說明中分析空值的欄位（規範的 extend_null_columns 為空的清單時不分析，也不顯示）
+EXTEND_NULL_HELP = """    • 分析各個 extend_class 下，{columns} 出現空值的比率。以 dataframe 呈現。
+"""
+
+# step7 說明中每個數值的小數位數規範
+DECIMAL_LIMIT_HELP = """    - {key}: 是否最多至小數 {limit} 位
+        • 若有列數之 {key} 超過 {limit} 位小數，輸出以下：
+            🔔 extend_stats -> {key}: [X] 列超過 {limit} 位小數
+"""
 
 
 classification_columns = ["category", "subcategory", "further_subcategory"]
 
 
-"""
-各表格 schema
-"""
-Config = {
-    "products": 
-        ["domain", 
-         "category", 
-         "subcategory", 
-         "further_subcategory", 
-         "brand", 
-         "list_price", 
-         "sale_price", 
-         "sales_volume", 
-         'best_sellers_rank', 
-         'accessories', 
-         'url', 
-         'image_url_1', 
-         'source'
-    ],
-    "products_extend": [
-        'source_product_id', 
-        'extend_class',
-        'extend_subclass', 
-        'extend_detail_raw', 
-        'extend_detail', 
-        'extend_unit', 
-        'source',
-        'domain', 
-        'category', 
-        'subcategory', 
-        'further_subcategory'],
-    "chart_brands": [
-        "id",
-        "category",
-        "subcategory",
-        "further_subcategory",
-        "brand",
-        "brand_rank",
-        "amount",
-        "product_sales",
-        "sales_ratio",
-        "sales_ranking",
-        "ranking_ratio",
-        "highest_price",
-        "lowest_price",
-        "average_price",
-        "average_discounted_price",
-        "amount_of_positive_comment",
-        "amount_of_negative_comment",
-        "score_of_positive_comment",
-        "score_of_negative_comment",
-        "stats_type",
-        "source"
-    ],
-    "chart_brands_extend": [
-        "id",
-        "category",
-        "subcategory",
-        "further_subcategory",
-        "brand",
-        "brand_rank",
-        "extend_class",
-        "extend_subclass",
-        "extend_detail",
-        "extend_stats",
-        "stats_type",
-        "source",
-        "extend_detail_rank",
-        "extend_detail_rank_ordinal"
-    ],
-    "chart_brands_extend_cross": [
-        "id",
-        "category",
-        "subcategory",
-        "further_subcategory",
-        "brand",
-        "brand_rank",
-        "extend_class",
-        "extend_subclass",
-        "extend_detail",
-        "extend_stats",
-        "stats_type",
-        "source"
-    ],
-    "chart_brands_extend_image": [
-        "id",
-        "category",
-        "subcategory",
-        "further_subcategory",
-        "brand",
-        "brand_rank",
-        "extend_class",
-        "extend_subclass",
-        "extend_detail",
-        "stats_type",
-        "source"
-    ],
-    "chart_brands_comment_counts": [
-        "id",
-        "category",
-        "subcategory",
-        "further_subcategory",
-        "brand",
-        "brand_rank",
-        "extend_class",
-        "extend_detail",
-        "extend_detail_snippet",
-        "extend_detail_snippet_source",
-        "extend_stats",
-        "stats_type",
-        "source"
-    ],
-    "chart_brands_comment_score": [
-        "id",
-        "category",
-        "subcategory",
-        "further_subcategory",
-        "brand",
-        "extend_class",
-        "extend_detail",
-        "extend_stats",
-        "stats_type",
-        "source"
-    ],
-    "chart_others": [
-        "id",
-        "category",
-        "subcategory",
-        "further_subcategory",
-        "extend_class",
-        "extend_subclass",
-        "extend_detail",
-        "extend_detail_rank",
-        "brand_rank_detail",
-        "extend_stats",
-        "stats_type",
-        "source"
-    ],
-    "chart_trends": [
-        "id",
-        "category",
-        "subcategory",
-        "further_subcategory",
-        "chart_name",
-        "labels",
-        "labels_rank",
-        "element_name",
-        "element_name_rank",
-        "element_name_rank_ordinal",
-        "features",
-        "stats_type",
-        "source"
-    ],
-    "reference": [
-        "references_id",
-        "domain",
-        "category",
-        "subcategory",
-        "further_subcategory",
-        "label",
-        "type",
-        "title",
-        "url",
-        "process",
-        "is_domestic",
-        "content",
-        "source"
-    ],
-    "keyword": [
-        "domain",
-        "category",
-        "subcategory",
-        "further_subcategory",
-        "items",
-        "search_volume",
-        "search_volume_max",
-        "search_volume_min",
-        "trends",
-        "end_at",
-        "is_brand",
-        "predict_volume"
-    ]
-}
+# 產品分類的覆蓋率閾值 (70%)
+CATEGORY_COVERAGE_THRESHOLD = 0.7
 
 """
-各表格擴充屬性（若有）schema
+各報表的驗證規範，定義於 rules.json（格式見 rules.py）；修改規範只需要編輯 rules.json
+
+    Chart_rules         : 報表種類 -> rules.ChartRules
+    charts              : 開放驗證的報表種類 -> 驗證步驟
+    Config              : 各表格的必要欄位 schema
+    Extend_class_schema : 各表格擴充屬性（若有）schema
+    Rank_col_schema     : 各表格排名欄位與規範，名次種類 -> (欄位名稱, 最大名次)
 """
-Extend_class_schema = {
-    "products_extend": [
-        "適用環境",
-        "使用情境",
-        "功能",
-        "功能_相機規格",
-        "訴求",
-        "保固",
-        "風格",
-        "色彩",
-        "材質",
-        "材質_部件材質",
-        "尺寸",
-        "尺寸_部件尺寸",
-        "尺寸_收納尺寸",
-        "重量",
-        "效能",
-        "容量",
-        "族群"
-    ],
-    "chart_brands_extend": [
-        "使用情境",
-        "適用環境",
-        "功能",
-        "效能",
-        "色彩",
-        "訴求",
-        "材質",
-        "尺寸",
-        "風格",
-        "重量",
-        "容量",
-        "族群"
-    ],
-    "chart_brands_extend_cross": [
-        "使用情境 x 售價",
-        "功能 x 售價",
-        "效能 x 售價",
-        "尺寸 x 售價",
-        "重量 x 售價",
-        "容量 x 售價",
-        "風格 x 售價",
-        "色彩 x 售價",
-        "材質 x 售價",
-        "尺寸二維分析",
-        "尺寸 x 色彩",
-        "尺寸 x 材質",
-        "訴求 x 尺寸",
-        "訴求 x 重量",
-        "訴求 x 容量",
-        "訴求 x 功能",
-        "訴求 x 效能",
-        "訴求 x 材質",
-        "使用情境 x 風格",
-        "使用情境 x 尺寸",
-        "使用情境 x 重量",
-        "使用情境 x 容量",
-        "功能 x 風格",
-        "功能 x 尺寸",
-        "功能 x 重量",
-        "功能 x 容量",
-        "色彩 x 材質"
-    ],
-    "chart_brands_extend_image": [
-        "使用情境 x 風格",
-        "風格",
-        "使用情境"
-    ],
-    "chart_brands_comment_counts": [
-        "正面留言因素",
-        "負面留言因素"
-    ],
-    "chart_brands_comment_score": [
-        "正面留言因素",
-        "負面留言因素"
-    ],
-    "chart_others": [
-        "配件",
-        "產品族群分析"
-    ],
-    "chart_trends": [
+Chart_rules = load_rules()
 
-    ]
-}
+charts = {name: chart_rules.steps for name, chart_rules in Chart_rules.items() if chart_rules.enabled}
+Config = {name: chart_rules.required_columns for name, chart_rules in Chart_rules.items()}
+Extend_class_schema = {name: chart_rules.extend_classes for name, chart_rules in Chart_rules.items() if chart_rules.extend_classes is not None}
+Rank_col_schema = {name: chart_rules.rank_schema for name, chart_rules in Chart_rules.items() if chart_rules.rank_columns is not None}
 
-classification_columns = ["category", "subcategory", "further_subcategory"]
 
-# 產品分類的覆蓋率閾值 (70%)
-CATEGORY_COVERAGE_THRESHOLD = 0.7
+def rules_help(chart_name):
+    """
+    報表種類各驗證步驟的說明文字（網頁版的說明區塊）
+
+    step3 的重複值組合鍵、step4 分析空值的欄位與 step7 的小數位數都依 rules.json 的規範填入 RULES 的說明。
+    """
+    chart_rules = Chart_rules[chart_name]
+    values = {
+        "duplicate_keys": ", ".join(f"'{key}'" for key in chart_rules.duplicate_keys or []),
+        "extend_null_columns": EXTEND_NULL_HELP.format(columns = ", ".join(chart_rules.extend_null_columns)) if chart_rules.extend_null_columns else "",
+        "decimal_limits": "".join(
+            DECIMAL_LIMIT_HELP.format(key = key, limit = limit) for key, limit in (chart_rules.decimal_limits or {}).items()
+        )
+    }
+    return "".join(RULES[step].format(**values) for step in chart_rules.steps)
+
 
 """
-各表格排名欄位與規範
+各步驟除了 Config 之外還會讀取、不依報表規範的欄位（讀取 Parquet / Arrow 報表時只載入需要的欄位）；
+重複值組合鍵、分析空值的欄位與名次欄位依 rules.json 的規範加入（見 rules.ChartRules.step_columns）
 """
-Rank_col_schema = {
-    "chart_brands": {
-        "brand": ("brand_rank", 10)
-    },
-    "chart_brands_extend": {
-        "brand": ("brand_rank", 5),
-        "factor_stats": ("extend_detail_rank", 10),
-        "factor_alphabet": ("extend_detail_rank_ordinal", 10)
-    },
-    "chart_brands_extend_cross": {
-        "brand": ("brand_rank", 5)
-    },
-    "chart_brands_extend_image": {
-        "brand": ("brand_rank", 5)
-    },
-    "chart_brands_comment_counts": {
-        "brand": ("brand_rank", 5)
-    },
-    "chart_brands_comment_score": {
-        "brand": ("brand_rank", 5)
-    },
-    "chart_others": {
-        "factor_stats": ("extend_detail_rank", 10)
-    },
-    "chart_trends": {
-        "element_stats": ("element_name_rank", 5),
-        "element_alphabet": ("element_name_rank_ordinal", 5),
-        "labels_rank": ("labels_rank", 10)
-    }
+Step_col_schema = {
+    "step3": ["id"],
+    "step4": ["extend_class"],
+    "step5": ["id", "reference_id", "stats_type", "is_brand", "domain"],
+    "step7": ["extend_stats"],
+    "step8": ["search_volume"]
 }
 
+
+"""
+低基數的文字欄位（數百個不同值，卻有數百萬列）：讀取報表時轉為 category dtype，各檢查以整數代碼分組與比對
+"""
+Categorical_columns = classification_columns + ["stats_type", "source", "domain", "extend_class", "extend_unit"]
@@ -0,0 +1,219 @@
+"""
+輸出模組：驗證結果的輸出管道 (sink)
+
+所有驗證步驟都透過 sink 輸出文字與表格，而不直接呼叫 streamlit：
+    - InstantSink  : 立即輸出，不做任何延遲
+    - BufferedSink : 先暫存所有輸出，驗證完成後再一次輸出（flush）
+    - AnimatedSink : 逐字輸出的打字效果（原本 stream_write 的行為）
+    - CollectingSink : 不輸出，只收集文字與表格（命令列模式）
+    - NullSink : 不輸出也不收集，只需要檢查結果物件時使用（見 results.py、presenter.py）
+"""
+
+import os
+import sys
+import time
+
+
+def is_testing_environment():
+    """判斷是否在測試環境中運行"""
+    return 'PYTEST_CURRENT_TEST' in os.environ or any('test' in arg.lower() for arg in sys.argv)
+
+def get_streamlit():
+    """延遲匯入 streamlit，讓測試中替換的 sys.modules['streamlit'] 也能生效"""
+    import streamlit
+    return streamlit
+
+def safe_st_call(func, *args, **kwargs):
+    """安全地調用 Streamlit 函數，在測試環境中不會拋出異常"""
+    if is_testing_environment():
+        return None
+    try:
+        return func(*args, **kwargs)
+    except Exception:
+        # 在非 Streamlit 環境中運行時忽略錯誤
+        return None
+
+
+class InstantSink():
+    """立即將文字與表格輸出至 streamlit；在測試或非 streamlit 環境中文字改印到標準輸出"""
+
+    def write(self, text, time_interval = None):
+        if is_testing_environment():
+            print(text)
+            return
+        try:
+            get_streamlit().write(text)
+        except Exception:
+            # 在 streamlit 上下文外，回退到標準輸出
+            print(text)
+
+    def dataframe(self, data):
+        get_streamlit().dataframe(data)
+
+    def divider(self):
+        safe_st_call(lambda: get_streamlit().divider())
+
+    def caption(self, text):
+        safe_st_call(lambda: get_streamlit().caption(text))
+
+    def download_button(self, label, data, file_name, mime):
+        get_streamlit().download_button(
+            label = label,
+            data = data,
+            file_name = file_name,
+            mime = mime
+        )
+
+    def flush(self):
+        pass
+
+
+class AnimatedSink(InstantSink):
+    """逐字輸出文字的打字效果；time_interval 為每個字元的延遲秒數"""
+
+    def __init__(self, time_interval = 0.04):
+        self.time_interval = time_interval
+
+    def write(self, text, time_interval = None):
+        if is_testing_environment():
+            print(text)
+            return
+        interval = self.time_interval if time_interval is None else time_interval
+
+        def gen_stream(text):
+            for word in text:
+                yield word
+                time.sleep(interval)
+
+        try:
+            get_streamlit().write_stream(gen_stream(text))
+        except Exception:
+            print(text)
+
+
+class BufferedSink():
+    """
+    暫存所有輸出，直到呼叫 flush() 才依序交給 target 輸出
+
+    驗證過程只做計算，結束後一次渲染，等待時間只反映實際的運算量。
+    """
+
+    def __init__(self, target = None):
+        self.target = target if target is not None else InstantSink()
+        self.records = []
+
+    def _record(self, method, *args, **kwargs):
+        self.records.append((method, args, kwargs))
+
+    def write(self, text, time_interval = None):
+        self._record("write", text, time_interval)
+
+    def dataframe(self, data):
+        self._record("dataframe", data)
+
+    def divider(self):
+        self._record("divider")
+
+    def caption(self, text):
+        self._record("caption", text)
+
+    def download_button(self, label, data, file_name, mime):
+        self._record("download_button", label = label, data = data, file_name = file_name, mime = mime)
+
+    def flush(self):
+        records, self.records = self.records, []
+        replay_records(records, self.target)
+        self.target.flush()
+
+
+def replay_records(records, target):
+    """
+    將 BufferedSink 暫存的輸出依序交給 target 輸出；不修改 records，可重複播放（例如快取的驗證結果）
+
+    Parameters
+    ----------
+    records : list
+        BufferedSink.records，(method, args, kwargs) 的列表
+    target : sink 物件
+    """
+    for method, args, kwargs in records:
+        getattr(target, method)(*args, **kwargs)
+
+
+class CollectingSink():
+    """
+    不輸出到畫面，而是收集所有文字與表格（命令列批次模式使用）
+
+    messages 為文字列表；tables 為以 orient="split" 轉換的表格字典列表。
+    """
+
+    def __init__(self):
+        self.messages = []
+        self.tables = []
+
+    def write(self, text, time_interval = None):
+        self.messages.append(text.strip())
+
+    def dataframe(self, data):
+        # Styler 物件取出內部的 DataFrame
+        if not hasattr(data, 'to_dict'):
+            data = data.data
+        self.tables.append(data.to_dict(orient = "split"))
+
+    def divider(self):
+        pass
+
+    def caption(self, text):
+        self.messages.append(text.strip())
+
+    def download_button(self, label, data, file_name, mime):
+        pass
+
+    def flush(self):
+        pass
+
+
+class NullSink():
+    """捨棄所有輸出；檢查結果保存在 Verify.results，之後可再交給 presenter.present 輸出"""
+
+    def write(self, text, time_interval = None):
+        pass
+
+    def dataframe(self, data):
+        pass
+
+    def divider(self):
+        pass
+
+    def caption(self, text):
+        pass
+
+    def download_button(self, label, data, file_name, mime):
+        pass
+
+    def flush(self):
+        pass
+
+
+OUTPUT_MODES = {
+    "instant": InstantSink,
+    "buffered": BufferedSink,
+    "animated": AnimatedSink
+}
+
+def make_sink(mode = "instant"):
+    """
+    依輸出模式建立 sink
+
+    Parameters
+    ----------
+    mode : str
+        "instant"、"buffered" 或 "animated"
+
+    Returns
+    -------
+    sink 物件
+    """
+    if mode not in OUTPUT_MODES:
+        raise ValueError(f"unknown output mode: {mode}, available: {list(OUTPUT_MODES)}")
+    return OUTPUT_MODES[mode]()
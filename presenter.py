@@ -0,0 +1,263 @@
+"""
+呈現模組：將檢查結果（results.py）輸出至 sink
+
+檢查只負責計算並回傳結果物件，文字、表格與下載按鈕都在這裡產生。
+快取或批次模式保存的結果可以隨時交給 present() 重新輸出，不需要重新執行檢查：
+
+    for result in verifier.results.values():
+        present(result, make_sink("instant"))
+"""
+
+import numpy as np
+import pandas as pd
+from constants import Rank_col_schema
+from results import (
+    ColumnResult,
+    NullResult,
+    DuplicateResult,
+    ExtendClassResult,
+    ClassificationResult,
+    ClassificationStepResult,
+    RankResult,
+    DecimalResult,
+    SearchVolumeResult,
+    CoverageResult
+)
+
+# 重複列檢查 (step3) 的輸出名稱：chart_name -> (報表名稱, 資料名稱)
+DUPLICATE_LABELS = {
+    "products": ("Products", "產品資料"),
+    "products_extend": ("Products Extend", "產品擴增屬性資料")
+}
+
+# 名次欄位的輸出標題：schema key -> (檢查標題, 結果標題)；其他名次種類使用 rank_check_labels 的通用標題
+RANK_CHECK_LABELS = {
+    "brand": ("\n🔆 驗證品牌排名欄位...", "🔔 品牌排名"),
+    "factor_stats": ("\n🔆 驗證因素統計排名欄位...", "🔔 因素統計排名"),
+    "factor_alphabet": ("\n🔆 驗證因素名稱排名欄位...", "🔔 因素名稱排名"),
+    "element_stats": ("\n🔆 (chart_trends) 驗證因素數量排名欄位...", "🔔 因素數量排名"),
+    "element_alphabet": ("\n🔆 (chart_trends) 驗證因素名稱排名欄位...", "🔔 因素名稱排名"),
+    "labels_rank": ("\n🔆 (chart_trends) 驗證標籤數量排名欄位...", "🔔 標籤數量排名")
+}
+
+
+def rank_check_labels(key, col_name):
+    """名次種類的 (檢查標題, 結果標題)；rules.json 新增、沒有專屬標題的名次種類以欄位名稱表示"""
+    if key in RANK_CHECK_LABELS:
+        return RANK_CHECK_LABELS[key]
+    return (f"\n🔆 驗證 {col_name} 排名欄位...", f"🔔 {col_name} 排名")
+
+
+def present_columns(result, sink):
+    sink.write("🔆 檢查是否缺少特定欄位...")
+    for col in result.missing_columns:
+        sink.write(f"⚠️ missing column: {col}")
+    if not result.missing_columns:
+        sink.write("✅ 沒有缺失重要欄位")
+
+def present_nulls(result, sink):
+    sink.divider()
+    sink.write(f"\n📊 總列數：{result.rows}")
+    table = (pd.DataFrame(pd.Series(result.null_counts, dtype = np.int64))
+     .rename(columns = {0: "count"}))
+    table['proportion'] = table['count'] / result.rows
+    table = table.astype("object")
+    table['count'] = table['count'].apply(lambda x: f"{int(x)}")
+    table['proportion'] = table['proportion'].apply(lambda x: f"{x * 100:.2f} %")
+
+    sink.write("🔆 各欄位空值分佈")
+    sink.dataframe(table.T)
+
+def present_duplicates(result, sink):
+    sink.divider()
+    sink.write("\n🔆 檢查重複列...")
+    # rules.json 新增、沒有專屬名稱的報表以報表種類表示
+    report_label, data_label = DUPLICATE_LABELS.get(result.chart_name, (result.chart_name, f"{result.chart_name} 資料"))
+    if not result.duplicated_ids:
+        sink.write(f"✅ 沒有重複的{data_label}")
+        return
+    sink.write(f"🔔 {report_label} 有重複值。")
+    sink.write(f"共 {len(result.groups)} 組重複，{sum(group['size'] for group in result.groups)} 列屬於重複組。")
+    sink.dataframe(pd.DataFrame({
+        "第一次出現的 id": [group["first_id"] for group in result.groups],
+        "重複次數": [group["size"] for group in result.groups],
+        "所有 id": [", ".join(map(str, group["ids"])) for group in result.groups]
+    }))
+    sink.download_button(
+        label = f"下載 {result.chart_name.replace('_', ' ')} 重複列 id",
+        data = "\n".join(map(str, result.duplicated_ids)),
+        file_name = f"{result.chart_name}_duplicated_id.txt",
+        mime = "text/plain"
+    )
+
+def present_extend_class(result, sink):
+    sink.divider()
+    sink.write("\n🔆 檢查是否缺少擴充屬性...")
+    present = set(result.present)
+    extend_classes_status = pd.DataFrame(
+        [["✅" if col in present else "❌" for col in result.expected]],
+        index = ["是否出現在資料表中"],
+        columns = result.expected,
+        dtype = object
+    )
+    sink.dataframe(extend_classes_status)
+
+    if result.presence:
+        matrix = result.presence_frame()
+        lacking = int((matrix == 0).any(axis = 1).sum())
+        sink.write("\n🔆 各小分類的擴充屬性")
+        if lacking:
+            sink.write(f"🔔 共有 {lacking} 個小分類缺少部分擴充屬性")
+        else:
+            sink.write("✅ 每個小分類都有所有擴充屬性")
+        sink.dataframe(matrix)
+        sink.caption("數值為各小分類 (further_subcategory) 中該擴充屬性的列數，0 表示該小分類缺少此擴充屬性")
+
+    if result.null_counts is None:
+        return
+    sink.write("\n🔆 子擴充屬性空值分析")
+    counts = pd.DataFrame.from_dict(result.null_counts, orient = "index").reindex(columns = result.null_columns + ["rows"])
+    counts.index.name = "extend_class"
+    subclass_decomp = pd.DataFrame(index = counts.index)
+    for col in result.null_columns:
+        subclass_decomp[f"{col}為空之列數"] = counts[col].astype(np.int64)
+        subclass_decomp[f"{col}為空比例"] = np.char.mod("%.2f%%", (counts[col] / counts["rows"] * 100).to_numpy(dtype = float))
+
+    sink.dataframe(subclass_decomp)
+    sink.caption("""計算方式：
+                   
+1. groupby("extend_class")，計算 extend_subclass (extend_unit) 的空值數
+
+2. 將上步驟算出的數量，除以每個 group (extend_class) 的列數，計算比例""")
+
+def present_classification(result, sink):
+    sink.divider()
+    sink.write("\n🔆 檢查分類組合...")
+    ratio = result.incorrect_count / result.rows * 100 if result.rows else 0
+    sink.write(f"🔔 共有 {result.incorrect_count} 筆資料的分類組合不存在於分類資料表中，佔總資料的 {ratio :.2f}%")
+    if result.caption is not None:
+        sink.caption(result.caption)
+
+def present_classification_step(result, sink):
+    for group in result.groups:
+        present_classification(group, sink)
+
+def present_rank(result, sink):
+    sink.divider()
+    schema = Rank_col_schema[result.chart_name]
+    for key, (col_name, _) in schema.items():
+        header, title = rank_check_labels(key, col_name)
+        sink.write(header)
+        if key not in result.columns:
+            sink.write(f"⚠️ 缺少名次欄位 {col_name}，無法驗證")
+            continue
+        column = result.columns[key]
+        sink.write(title)
+        sink.write(f"- 資料中的名次：{column['values']}", 0.002)
+        sink.write(f"- 規範名次： {set(column['expected'])}", 0.002)
+        if column['invalid_count'] > 0:
+            sink.write(f"⚠️ {col_name}: 共有 {column['invalid_count']} 列的名次不在規範內：{column['invalid_values']}")
+            sink.download_button(
+                label = f"下載 {col_name} 名次不符規範的列 id",
+                data = "\n".join(map(str, column['invalid_ids'])),
+                file_name = f"{col_name}_invalid_rank_id.txt",
+                mime = "text/plain"
+            )
+
+def present_decimal(result, sink):
+    sink.divider()
+    sink.write("\n🔆 檢查小數點規範...")
+
+    if not result.has_column:
+        sink.write("✅ 沒有 extend_stats 欄位")
+        return
+
+    for key, counts in result.counts.items():
+        if counts["too_many_decimals"] > 0:
+            sink.write(f"🔔 extend_stats -> {key}: {counts['too_many_decimals']} 列超過 {result.limits[key]} 位小數" )
+        if counts["ends_with_zero"] > 0:
+            sink.write(f"🔔 extend_stats -> {key}: {counts['ends_with_zero']} 列小數以 0 結尾" )
+
+    sink.write("✅ 檢查完成")
+
+def present_search_volume(result, sink):
+    sink.write("\n🔆 檢查 keyword 表中的 search_volume 欄位...")
+    if result.error is not None:
+        sink.write(f"⚠️ 檢查 search_volume 時發生錯誤: {result.error}")
+    elif result.zero_count == 0:
+        sink.write(f"✅ 沒有 search_volume 為 0 或空值的資料")
+    else:
+        sink.write(f"🔔 共有 {result.zero_count} 列之 search_volume 為 0 或空值！")
+        if result.breakdown:
+            breakdown = pd.DataFrame(result.breakdown).rename(columns = {
+                "rows": "列數", "zero": "search_volume 為 0", "empty": "search_volume 空值"
+            })
+            sink.dataframe(breakdown)
+
+def style_category_coverage(df):
+    """
+    為分類覆蓋率結果添加樣式（數量為 0 的分類以紅色底色標示）
+
+    Parameters
+    ----------
+    df : pandas DataFrame
+        含有 category 與 count 欄位的資料
+
+    Returns
+    -------
+    pandas Styler
+    """
+    # 使用 pandas styler API 來設置樣式
+    def highlight_zero(val):
+        return 'background-color: #FFCCCC' if val == 0 else ''
+
+    # 將樣式應用到 'count' 列
+    return df.style.map(highlight_zero, subset=['count'])
+
+def present_category_coverage(result, sink):
+    sink.divider()
+    sink.write("\n🔆 檢查分類覆蓋率...")
+
+    if result.missing_columns:
+        sink.write(f"⚠️ 資料缺少必要的分類欄位: {result.missing_columns}")
+        sink.write("無法進行分類覆蓋率檢查")
+        return
+
+    sink.write(f"🔔 分類覆蓋率檢查結果（共 {result.total_categories} 個分類，缺失 {len(result.missing)} 個）：")
+    sink.dataframe(style_category_coverage(result.to_frame()))
+
+    # 如果有缺失的分類，提供下載按鈕
+    if result.missing:
+        sink.download_button(
+            label = "下載缺失分類清單",
+            data = "\n".join(result.missing),
+            file_name = "missing_categories.txt",
+            mime = "text/plain"
+        )
+
+
+PRESENTERS = {
+    ColumnResult: present_columns,
+    NullResult: present_nulls,
+    DuplicateResult: present_duplicates,
+    ExtendClassResult: present_extend_class,
+    ClassificationResult: present_classification,
+    ClassificationStepResult: present_classification_step,
+    RankResult: present_rank,
+    DecimalResult: present_decimal,
+    SearchVolumeResult: present_search_volume,
+    CoverageResult: present_category_coverage
+}
+
+def present(result, sink):
+    """
+    將一個檢查結果輸出至 sink
+
+    Parameters
+    ----------
+    result : results.CheckResult
+        檢查回傳的結果物件
+    sink : sink 物件
+        見 output.py
+    """
+    PRESENTERS[type(result)](result, sink)
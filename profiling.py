@@ -0,0 +1,132 @@
+"""
+效能紀錄模組：記錄每個步驟的執行時間、CPU 時間與記憶體峰值
+
+    profile = Profile(trace_memory = True)
+    with profile.measure("load_report"):
+        data = read_table(path)
+    profile.to_dict()   # [{"name": "load_report", "wall": ..., "cpu": ..., "peak_bytes": ..., "calls": 1}]
+
+同一個名稱重複量測時（例如分段讀取時每一段都執行一次的步驟）會累計時間與次數，記憶體峰值取最大值。
+記憶體峰值以 tracemalloc 量測，為步驟執行期間相對於開始時多使用的記憶體；
+tracemalloc 會拖慢執行速度，因此預設不開啟 (trace_memory = False)。
+"""
+
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import Optional
+
+import pandas as pd
+
+
+@dataclass
+class StepTiming:
+    """單一步驟的累計量測結果；peak_bytes 在沒有追蹤記憶體時為 None"""
+    name: str
+    wall: float = 0.0
+    cpu: float = 0.0
+    peak_bytes: Optional[int] = None
+    calls: int = 0
+
+    def to_dict(self):
+        return asdict(self)
+
+
+class Profile():
+    """
+    依步驟名稱累計量測結果
+
+    Parameters
+    ----------
+    trace_memory : bool
+        是否以 tracemalloc 量測記憶體峰值
+    """
+
+    def __init__(self, trace_memory = False):
+        self.trace_memory = trace_memory
+        self.timings = {}
+        # 巢狀量測時，外層步驟目前為止的記憶體峰值：[開始時的記憶體, 峰值]
+        self._memory_stack = []
+        self._started_tracing = False
+
+    @contextmanager
+    def measure(self, name):
+        """
+        量測 with 區塊的執行時間、CPU 時間與記憶體峰值，累計到 timings[name]
+
+        Parameters
+        ----------
+        name : str
+            步驟名稱
+        """
+        self._enter_memory()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            peak = self._exit_memory()
+
+            timing = self.timings.setdefault(name, StepTiming(name))
+            timing.wall += wall
+            timing.cpu += cpu
+            timing.calls += 1
+            if peak is not None:
+                timing.peak_bytes = max(timing.peak_bytes or 0, peak)
+
+    def _enter_memory(self):
+        if not self.trace_memory:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        current, peak = tracemalloc.get_traced_memory()
+        # reset_peak 會清掉外層步驟的峰值，先記下來
+        if self._memory_stack:
+            self._memory_stack[-1][1] = max(self._memory_stack[-1][1], peak)
+        tracemalloc.reset_peak()
+        self._memory_stack.append([current, current])
+
+    def _exit_memory(self):
+        if not self.trace_memory:
+            return None
+        baseline, peak = self._memory_stack.pop()
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        if self._memory_stack:
+            self._memory_stack[-1][1] = max(self._memory_stack[-1][1], peak)
+        elif self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        return peak - baseline
+
+    def to_dict(self):
+        """
+        Returns
+        -------
+        list
+            依第一次量測的順序排列的 StepTiming.to_dict()
+        """
+        return [timing.to_dict() for timing in self.timings.values()]
+
+    def to_frame(self):
+        """
+        整理成顯示用的表格（毫秒與 MB）；沒有追蹤記憶體時不包含記憶體峰值欄位
+
+        Returns
+        -------
+        pandas DataFrame
+        """
+        frame = pd.DataFrame({
+            "步驟": [timing.name for timing in self.timings.values()],
+            "執行時間 (ms)": [round(timing.wall * 1000, 1) for timing in self.timings.values()],
+            "CPU 時間 (ms)": [round(timing.cpu * 1000, 1) for timing in self.timings.values()],
+            "記憶體峰值 (MB)": [
+                round(timing.peak_bytes / 2 ** 20, 2) if timing.peak_bytes is not None else None
+                for timing in self.timings.values()
+            ],
+            "次數": [timing.calls for timing in self.timings.values()]
+        })
+        return frame if self.trace_memory else frame.drop(columns = "記憶體峰值 (MB)")
@@ -0,0 +1,335 @@
+"""
+讀取模組：依檔案內容判斷格式，讀取分類表與報表
+
+檔案格式以開頭的 magic bytes 判斷（sniff_format），不依賴副檔名，也不需要先嘗試以 csv 解析失敗：
+    - csv                 : 讀取整份表格
+    - Excel (xlsx / xls)  : 有安裝 python-calamine 時使用較快的 calamine 引擎，否則使用 pandas 預設引擎 (openpyxl)
+    - Parquet / Arrow IPC : 欄式格式，只載入該報表種類需要的欄位（見 report_columns），
+                          字串欄位使用 Arrow 儲存的 string dtype
+
+分類表以檔案內容的雜湊值快取（read_classification），同一份分類表重複驗證時不會重新解析。
+
+讀取報表（指定 chart_name）時會縮減欄位型別（optimize_dtypes）：低基數的文字欄位 (constants.Categorical_columns)
+轉為 category，名次欄位轉為較小的數值型別，數百萬列的報表記憶體用量減少數倍。
+"""
+
+import io
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = feather = pq = None
+try:
+    import python_calamine
+    EXCEL_ENGINE = "calamine"
+except ImportError:
+    # 沒有安裝 python-calamine 時使用 pandas 預設的 openpyxl
+    EXCEL_ENGINE = None
+from constants import Chart_rules, Config, Rank_col_schema, Step_col_schema, Categorical_columns, classification_columns
+
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+ARROW_EXTENSIONS = (".arrow", ".feather", ".ipc")
+COLUMNAR_EXTENSIONS = PARQUET_EXTENSIONS + ARROW_EXTENSIONS
+
+# 檔案開頭的 magic bytes -> 格式；都不符合時視為 csv
+MAGIC_BYTES = [
+    (b"PAR1", "parquet"),
+    (b"ARROW1", "arrow"),
+    # xlsx 為 zip 壓縮檔；xls 為 OLE2 複合文件
+    (b"PK\x03\x04", "excel"),
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "excel")
+]
+
+# float32 可以精確表示的整數範圍；有空值的名次欄位只在此範圍內才縮減為 float32
+FLOAT32_EXACT_INTEGER = 2 ** 24
+
+
+def report_columns(chart_name):
+    """
+    列出驗證某種報表需要讀取的欄位
+
+    包含 Config[chart_name] 的必要欄位、分類欄位、Rank_col_schema 的名次欄位，
+    以及步驟清單中各步驟額外讀取的欄位（Step_col_schema 與規範中的 ChartRules.step_columns，例如重複值組合鍵）。
+
+    Parameters
+    ----------
+    chart_name : str
+        報表種類
+
+    Returns
+    -------
+    list
+        不重複的欄位名稱，依 Config 的順序排在前面
+    """
+    columns = list(Config[chart_name]) + classification_columns
+    columns += [col_name for col_name, _ in Rank_col_schema.get(chart_name, {}).values()]
+    # 從規範讀取步驟清單：停用的報表種類（不在 charts 中）也能讀到各步驟需要的欄位
+    for step in Chart_rules[chart_name].steps:
+        columns += Step_col_schema.get(step, [])
+        columns += Chart_rules[chart_name].step_columns(step)
+    return list(dict.fromkeys(columns))
+
+def compact_rank_column(column):
+    """
+    縮減名次欄位的數值型別
+
+    沒有空值的整數欄位縮減為能容納所有名次的最小整數型別（通常為 int16）；
+    有空值的欄位會被讀成 float64，若都是整數值則縮減為 float32。其他欄位（例如混有文字）維持原樣。
+
+    Parameters
+    ----------
+    column : pandas Series
+
+    Returns
+    -------
+    pandas Series
+    """
+    if pd.api.types.is_integer_dtype(column.dtype):
+        return pd.to_numeric(column, downcast = "integer")
+    if pd.api.types.is_float_dtype(column.dtype) and column.dtype != np.float32:
+        values = column.dropna().to_numpy()
+        if ((values == np.round(values)) & (np.abs(values) < FLOAT32_EXACT_INTEGER)).all():
+            return column.astype(np.float32)
+    return column
+
+def optimize_dtypes(data, chart_name = None):
+    """
+    縮減報表欄位的記憶體用量
+
+    - Categorical_columns 中的文字欄位轉為 category dtype，分組、比對與重複列檢查都以整數代碼進行
+    - chart_name 的名次欄位 (Rank_col_schema) 以 compact_rank_column 縮減型別
+
+    Parameters
+    ----------
+    data : pandas DataFrame
+    chart_name : str or None
+        報表種類；None 時只轉換 category 欄位
+
+    Returns
+    -------
+    pandas DataFrame
+        轉換後的資料（不修改傳入的 data）
+    """
+    conversions = {}
+    for col in Categorical_columns:
+        if col not in data.columns or isinstance(data[col].dtype, pd.CategoricalDtype):
+            continue
+        if pd.api.types.is_object_dtype(data[col].dtype) or pd.api.types.is_string_dtype(data[col].dtype):
+            conversions[col] = data[col].astype("category")
+    for col_name, _ in Rank_col_schema.get(chart_name, {}).values():
+        if col_name in data.columns:
+            conversions[col_name] = compact_rank_column(data[col_name])
+    return data.assign(**conversions) if conversions else data
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("讀取 Parquet / Arrow 檔案需要安裝 pyarrow")
+
+def _arrow_string_dtype(arrow_type):
+    """Arrow 字串型別對應到以 Arrow 儲存的 pandas string dtype，其他型別使用預設轉換"""
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return pd.StringDtype("pyarrow")
+    return None
+
+def _select_columns(names, columns):
+    """只保留檔案中存在的欄位；columns 為 None 時讀取全部欄位。缺少的欄位交給欄位檢測 (step1) 回報"""
+    if columns is None:
+        return None
+    return [col for col in columns if col in names]
+
+def read_parquet(source, columns = None):
+    """
+    讀取 Parquet 檔案，只載入 columns 中存在的欄位
+
+    Parameters
+    ----------
+    source : str or file-like
+        檔案路徑或上傳的檔案物件
+    columns : list or None
+        要讀取的欄位；None 表示全部
+
+    Returns
+    -------
+    pandas DataFrame
+    """
+    _require_pyarrow()
+    parquet_file = pq.ParquetFile(source)
+    table = parquet_file.read(columns = _select_columns(parquet_file.schema_arrow.names, columns))
+    return table.to_pandas(types_mapper = _arrow_string_dtype)
+
+def read_arrow(source, columns = None):
+    """
+    讀取 Arrow IPC (Feather v2) 檔案，只載入 columns 中存在的欄位
+
+    只讀取（與解壓縮）選取的欄位；以檔案路徑讀取時使用 memory map。
+
+    Parameters
+    ----------
+    source : str or file-like
+        檔案路徑或上傳的檔案物件
+    columns : list or None
+        要讀取的欄位；None 表示全部
+
+    Returns
+    -------
+    pandas DataFrame
+    """
+    _require_pyarrow()
+    if isinstance(source, str):
+        names = pa.ipc.open_file(pa.memory_map(source)).schema.names
+    else:
+        names = pa.ipc.open_file(source).schema.names
+        source.seek(0)
+    table = feather.read_table(source, columns = _select_columns(names, columns), memory_map = isinstance(source, str))
+    return table.to_pandas(types_mapper = _arrow_string_dtype)
+
+def _read_head(source, size = 8):
+    """讀取檔案開頭的位元組；檔案物件讀完後回到原本的位置"""
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            return f.read(size)
+    position = source.tell()
+    head = source.read(size)
+    source.seek(position)
+    return head
+
+def sniff_format(source):
+    """
+    以檔案開頭的 magic bytes 判斷格式
+
+    Parameters
+    ----------
+    source : str or file-like
+        檔案路徑或上傳的檔案物件
+
+    Returns
+    -------
+    str
+        "parquet"、"arrow"、"excel" 或 "csv"
+    """
+    head = _read_head(source)
+    for magic, file_format in MAGIC_BYTES:
+        if head.startswith(magic):
+            return file_format
+    return "csv"
+
+def _read_format(source, file_format, columns = None):
+    """依 sniff_format 的結果讀取檔案；columns 只用於欄式格式"""
+    if file_format == "parquet":
+        return read_parquet(source, columns)
+    if file_format == "arrow":
+        return read_arrow(source, columns)
+    if file_format == "excel":
+        return pd.read_excel(source, engine = EXCEL_ENGINE)
+    return pd.read_csv(source)
+
+def read_table(source, chart_name = None):
+    """
+    依檔案內容判斷格式並讀取分類表或報表
+
+    Parameters
+    ----------
+    source : str or file-like
+        檔案路徑或上傳的檔案物件
+    chart_name : str or None
+        報表種類；指定時欄式格式只載入該報表需要的欄位，並以 optimize_dtypes 縮減欄位型別
+
+    Returns
+    -------
+    pandas DataFrame
+    """
+    # 上傳的檔案物件可能已被讀取過（例如前一次驗證），一律從頭讀取
+    if not isinstance(source, str):
+        source.seek(0)
+    file_format = sniff_format(source)
+    if chart_name is None:
+        return _read_format(source, file_format)
+    if file_format == "csv":
+        # 低基數的文字欄位在解析時就直接建立 category，不會先產生整欄的字串物件
+        data = pd.read_csv(source, dtype = {col: "category" for col in Categorical_columns})
+    else:
+        data = _read_format(source, file_format, report_columns(chart_name))
+    return optimize_dtypes(data, chart_name)
+
+# 分類表內容的雜湊值 -> 解析後的分類表；網頁版與驗證服務會在多個執行緒中同時讀取，存取時需持有 _classification_cache_lock
+_classification_cache = OrderedDict()
+_classification_cache_lock = threading.Lock()
+CLASSIFICATION_CACHE_SIZE = 4
+
+def _read_bytes(source):
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            return f.read()
+    if hasattr(source, "getvalue"):
+        return source.getvalue()
+    position = source.tell()
+    content = source.read()
+    source.seek(position)
+    return content
+
+def file_digest(source, block_size = 1 << 20):
+    """
+    計算檔案內容的 sha1 雜湊值（分段讀取，不會複製整個檔案）
+
+    Parameters
+    ----------
+    source : str or file-like
+        檔案路徑或上傳的檔案物件；檔案物件讀完後回到原本的位置
+
+    Returns
+    -------
+    str
+        十六進位的雜湊值
+    """
+    digest = hashlib.sha1()
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            for block in iter(lambda: f.read(block_size), b""):
+                digest.update(block)
+        return digest.hexdigest()
+    if hasattr(source, "getbuffer"):
+        digest.update(source.getbuffer())
+        return digest.hexdigest()
+    position = source.tell()
+    source.seek(0)
+    for block in iter(lambda: source.read(block_size), b""):
+        digest.update(block)
+    source.seek(position)
+    return digest.hexdigest()
+
+def read_classification(source):
+    """
+    讀取分類表，以檔案內容的雜湊值快取解析結果
+
+    同一份分類表（例如每次驗證都上傳的 設研院產品分類表.xlsx）只解析一次，
+    之後直接回傳快取的副本。
+
+    Parameters
+    ----------
+    source : str or file-like
+        檔案路徑或上傳的檔案物件
+
+    Returns
+    -------
+    pandas DataFrame
+    """
+    content = _read_bytes(source)
+    digest = hashlib.sha1(content).hexdigest()
+    with _classification_cache_lock:
+        classification = _classification_cache.get(digest)
+        if classification is not None:
+            _classification_cache.move_to_end(digest)
+    if classification is None:
+        # 解析時不持有鎖，其他分類表的讀取不需要等待
+        classification = read_table(io.BytesIO(content))
+        with _classification_cache_lock:
+            _classification_cache[digest] = classification
+            if len(_classification_cache) > CLASSIFICATION_CACHE_SIZE:
+                _classification_cache.popitem(last = False)
+    return classification.copy()
@@ -0,0 +1,174 @@
+"""
+驗證結果的磁碟快取：同樣的報表、分類表與規則重新驗證時（重試、重新上傳、修正其他問題後重跑）直接回傳先前的結果
+
+    cache = ResultCache("~/.cache/tdri_verifier/results.sqlite", max_bytes = 256 * 2 ** 20)
+    key = cache.key(report_digest, classification_digest, chart_name)
+    result = cache.get(key)             # 沒有快取時為 None
+    cache.put(key, result)
+
+快取鍵為以下內容的 sha1：
+    - 報表檔案內容的雜湊值（readers.file_digest）
+    - 分類表檔案內容的雜湊值
+    - 報表種類
+    - rules.json 與 constants.py 中各項規範的指紋（schema_fingerprint）：修改欄位規範、名次範圍、擴充屬性等規則後，舊的結果自動失效
+
+結果以 zlib 壓縮的 JSON 存在 SQLite 資料庫中，多個程序可以共用同一個快取檔案。
+總大小超過 max_bytes 時，依最後使用時間淘汰最久沒有使用的結果 (LRU)。
+"""
+
+import dataclasses
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import zlib
+
+import constants
+
+# 結果的格式（verify_report 回傳的欄位）改變時遞增，讓舊版本存下的結果失效
+CACHE_FORMAT_VERSION = 1
+DEFAULT_CACHE_BYTES = 256 * 2 ** 20
+
+# 影響驗證結果的規範；Chart_rules 為 rules.json 編譯後的各報表規範，RULES 為各步驟顯示的說明文字
+SCHEMA_NAMES = [
+    "RULES",
+    "Chart_rules",
+    "classification_columns",
+    "CATEGORY_COVERAGE_THRESHOLD",
+    "Step_col_schema",
+    "Categorical_columns"
+]
+
+
+def schema_fingerprint():
+    """
+    rules.json 與 constants.py 中各項規範的指紋
+
+    Returns
+    -------
+    str
+        規範內容（以排序過鍵值的 JSON 表示）與 CACHE_FORMAT_VERSION 的 sha1
+    """
+    schemas = {name: getattr(constants, name) for name in SCHEMA_NAMES}
+    content = json.dumps([CACHE_FORMAT_VERSION, schemas], ensure_ascii = False, sort_keys = True, default = dataclasses.asdict)
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+class ResultCache():
+    """
+    以 SQLite 儲存的驗證結果快取，總大小超過 max_bytes 時淘汰最久沒有使用的結果
+
+    Parameters
+    ----------
+    path : str
+        SQLite 資料庫檔案路徑；資料夾不存在時自動建立
+    max_bytes : int
+        壓縮後結果的總大小上限
+    """
+
+    def __init__(self, path, max_bytes = DEFAULT_CACHE_BYTES):
+        self.path = os.path.expanduser(path)
+        self.max_bytes = max_bytes
+        self.fingerprint = schema_fingerprint()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok = True)
+        # 多個批次程序共用快取時，寫入會等待其他程序的交易結束
+        self.connection = sqlite3.connect(self.path, timeout = 30)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL)"
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+
+    def key(self, report_digest, classification_digest, chart_name):
+        """
+        快取鍵
+
+        Parameters
+        ----------
+        report_digest : str
+            報表檔案內容的雜湊值
+        classification_digest : str
+            分類表檔案內容的雜湊值
+        chart_name : str
+            報表種類
+
+        Returns
+        -------
+        str
+        """
+        content = "\0".join([report_digest, classification_digest, chart_name, self.fingerprint])
+        return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """
+        讀取快取的結果，並更新最後使用時間
+
+        Returns
+        -------
+        dict or None
+            沒有快取時為 None
+        """
+        with self.connection:
+            row = self.connection.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self.connection.execute("UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key))
+        return json.loads(zlib.decompress(row[0]).decode("utf-8"))
+
+    def put(self, key, result):
+        """
+        儲存結果；總大小超過 max_bytes 時淘汰最久沒有使用的結果
+
+        Parameters
+        ----------
+        key : str
+            key() 的結果
+        result : dict
+            可轉為 JSON 的結果
+        """
+        value = zlib.compress(json.dumps(result, ensure_ascii = False).encode("utf-8"))
+        if len(value) > self.max_bytes:
+            return
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO results (key, value, size, accessed) VALUES (?, ?, ?, ?)",
+                (key, value, len(value), time.time())
+            )
+            self._evict()
+
+    def _evict(self):
+        total = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = []
+        for key, size in self.connection.execute("SELECT key, size FROM results ORDER BY accessed, rowid"):
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self.connection.executemany("DELETE FROM results WHERE key = ?", evicted)
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def total_bytes(self):
+        """快取中壓縮後結果的總大小"""
+        return self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def clear(self):
+        """刪除所有快取的結果"""
+        with self.connection:
+            self.connection.execute("DELETE FROM results")
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
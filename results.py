@@ -0,0 +1,163 @@
+"""
+驗證結果模組：每個檢查回傳的結構化結果
+
+Verify 的每個檢查只負責計算，回傳下列其中一種結果物件（計數、不符合規範的 id、計算時間），
+如何顯示由 presenter.py 負責。批次模式、快取與 generate_verification_report 都直接使用這些結果，
+不需要重新執行檢查，也不需要 streamlit。
+
+所有結果都可以用 to_dict() 轉為可 json.dumps 的字典；比較兩個結果時不比較計算時間 (seconds)。
+"""
+
+from dataclasses import dataclass, field, asdict
+from typing import ClassVar, Optional
+
+import pandas as pd
+
+
+@dataclass
+class CheckResult:
+    """所有檢查結果的共同欄位"""
+    name: ClassVar[str] = "check"
+    # 檢查的計算時間（秒），不含輸出
+    seconds: float = field(default = 0.0, kw_only = True, compare = False)
+
+    def to_dict(self):
+        return {"check": self.name, **asdict(self)}
+
+
+@dataclass
+class ColumnResult(CheckResult):
+    """欄位檢測 (step1)：缺少的必要欄位"""
+    name: ClassVar[str] = "columns"
+    chart_name: str
+    missing_columns: list
+
+
+@dataclass
+class NullResult(CheckResult):
+    """空值分析 (step2)：各欄位的空值數"""
+    name: ClassVar[str] = "nulls"
+    rows: int
+    null_counts: dict
+
+
+@dataclass
+class DuplicateResult(CheckResult):
+    """
+    重複值檢測 (step3)
+
+    duplicated_ids 為重複列（第二次以後出現）的 id；
+    groups 為完整的重複組 [{"first_id": 第一次出現的 id, "ids": 組內所有 id, "size": 列數}]
+    """
+    name: ClassVar[str] = "duplicates"
+    chart_name: str
+    duplicated_ids: list
+    groups: list = field(default_factory = list)
+
+
+@dataclass
+class ExtendClassResult(CheckResult):
+    """
+    擴充屬性檢測 (step4)
+
+    null_counts 為 extend_class -> {"rows": 列數, 欄位: 空值數}；
+    chart_brands_comment_counts 不做子擴充屬性空值分析，為 None。
+    presence 為 further_subcategory -> {extend_class: 列數}（規範中的每個擴充屬性，0 表示該小分類缺少）；
+    資料沒有 further_subcategory 欄位時為 None
+    """
+    name: ClassVar[str] = "extend_class"
+    chart_name: str
+    expected: list
+    present: list
+    null_columns: list
+    null_counts: Optional[dict]
+    presence: Optional[dict] = None
+
+    @property
+    def missing(self):
+        return [extend_class for extend_class in self.expected if extend_class not in self.present]
+
+    def presence_frame(self):
+        """presence 整理成小分類 x 擴充屬性的列數表"""
+        frame = pd.DataFrame.from_dict(self.presence or {}, orient = "index").reindex(columns = self.expected, fill_value = 0)
+        frame.index.name = "further_subcategory"
+        return frame
+
+
+@dataclass
+class ClassificationResult(CheckResult):
+    """子品類標籤驗證 (step5) 中一組資料的結果；caption 為該組的說明（keyword 報表依 is_brand 分組）"""
+    name: ClassVar[str] = "classification"
+    statstype: str
+    rows: int
+    incorrect_count: int
+    incorrect_ids: list
+    caption: Optional[str] = None
+
+
+@dataclass
+class ClassificationStepResult(CheckResult):
+    """子品類標籤驗證 (step5)：依報表種類分組檢查的所有結果"""
+    name: ClassVar[str] = "classification_step"
+    chart_name: str
+    groups: list
+
+    @property
+    def incorrect_ids(self):
+        return [id_ for group in self.groups for id_ in group.incorrect_ids]
+
+
+@dataclass
+class RankResult(CheckResult):
+    """名次驗證 (step6)：columns 為 Rank_col_schema 的 key -> check_rank_column 的結果；資料缺少的名次欄位列在 missing_columns"""
+    name: ClassVar[str] = "rank"
+    chart_name: str
+    columns: dict
+    missing_columns: list
+
+
+@dataclass
+class DecimalResult(CheckResult):
+    """
+    小數點位數驗證 (step7)
+
+    counts 為 count_decimal_places 的結果，只包含資料中有出現的數值；limits 為各數值允許的最多位數；
+    has_column 為資料是否有 extend_stats 欄位
+    """
+    name: ClassVar[str] = "decimal"
+    has_column: bool
+    counts: dict
+    limits: dict
+
+
+@dataclass
+class SearchVolumeResult(CheckResult):
+    """
+    搜尋量檢測 (step8)：search_volume 為 0 或空值的列數；檢查失敗時 zero_count 為 None，error 為錯誤訊息
+
+    breakdown 為依 is_brand、domain 分組的 [{"is_brand", "domain", "rows": 列數, "zero": 為 0 的列數, "empty": 空值的列數}]
+    """
+    name: ClassVar[str] = "search_volume"
+    zero_count: Optional[int]
+    error: Optional[str] = None
+    breakdown: list = field(default_factory = list)
+
+
+@dataclass
+class CoverageResult(CheckResult):
+    """
+    分類覆蓋率檢查
+
+    categories / counts 依分類表的順序排列（只含層級數正確的分類）；
+    total_categories 為分類表中的分類數；資料缺少分類欄位時 missing_columns 不為空，其他欄位為空
+    """
+    name: ClassVar[str] = "category_coverage"
+    level: str
+    total_categories: int
+    categories: list
+    counts: list
+    missing: list
+    missing_columns: list
+
+    def to_frame(self):
+        return pd.DataFrame({'category': self.categories, 'count': self.counts}, columns = ['category', 'count']).astype({'count': 'int64'})
@@ -0,0 +1,206 @@
+"""
+報表驗證規範：讀取 rules.json，檢查格式後編譯成每種報表的 ChartRules
+
+rules.json 以報表種類為 key，每種報表的規範包含：
+    - steps               : 依序執行的驗證步驟（step1 ~ step8，說明見 constants.RULES 與 RULES.md）
+    - enabled             : 是否開放驗證（網頁版、命令列的報表種類選項），預設 true
+    - required_columns    : 必要欄位（欄位檢測 step1、空值分析 step2）
+    - classification_mode : 子品類標籤驗證 (step5) 的分類層級，"mixed"（預設）、"further_subcategory" 或 "subcategory"
+    - duplicate_keys      : 重複值檢測 (step3) 的組合鍵欄位
+    - rank_columns        : 名次驗證 (step6)，名次種類 -> {"column": 欄位名稱, "max": 最大名次}
+    - extend_classes      : 擴充屬性檢測 (step4) 應出現的 extend_class
+    - extend_null_columns : 依 extend_class 分析空值的欄位（預設 ["extend_subclass"]，空的清單表示不分析）
+    - decimal_limits      : 小數點位數驗證 (step7)，extend_stats 中的數值名稱 -> 允許的最多位數
+
+修改規範只需要編輯 rules.json；constants.py 的 Config、charts、Rank_col_schema、Extend_class_schema
+都由這裡編譯的結果產生，各驗證步驟直接使用。
+"""
+
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Optional
+
+RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rules.json")
+
+STEPS = ["step1", "step2", "step3", "step4", "step5", "step6", "step7", "step8"]
+CLASSIFICATION_MODES = ["mixed", "further_subcategory", "subcategory"]
+DEFAULT_EXTEND_NULL_COLUMNS = ["extend_subclass"]
+
+# 各步驟需要的規範項目
+STEP_REQUIREMENTS = {
+    "step3": "duplicate_keys",
+    "step4": "extend_classes",
+    "step6": "rank_columns",
+    "step7": "decimal_limits"
+}
+
+SPEC_KEYS = [
+    "steps",
+    "enabled",
+    "required_columns",
+    "classification_mode",
+    "duplicate_keys",
+    "rank_columns",
+    "extend_classes",
+    "extend_null_columns",
+    "decimal_limits"
+]
+
+
+class RuleError(ValueError):
+    """rules.json 的格式錯誤"""
+
+
+@dataclass(frozen = True)
+class ChartRules:
+    """
+    單一報表種類編譯後的規範
+
+    沒有出現在規範中的項目為 None（例如 products 沒有 rank_columns），與空的清單（有此項目但沒有內容）不同。
+    """
+    name: str
+    steps: list
+    required_columns: list
+    enabled: bool = True
+    classification_mode: str = "mixed"
+    duplicate_keys: Optional[list] = None
+    rank_columns: Optional[dict] = None
+    extend_classes: Optional[list] = None
+    extend_null_columns: list = field(default_factory = lambda: list(DEFAULT_EXTEND_NULL_COLUMNS))
+    decimal_limits: Optional[dict] = None
+
+    @property
+    def rank_schema(self):
+        """名次種類 -> (欄位名稱, 最大名次)，與 constants.Rank_col_schema 的格式相同"""
+        return {key: (rank["column"], rank["max"]) for key, rank in (self.rank_columns or {}).items()}
+
+    def step_columns(self, step):
+        """
+        步驟依這份規範讀取的欄位：重複值組合鍵 (step3)、分析空值的欄位 (step4) 與名次欄位 (step6)
+
+        不依規範的欄位（例如 id、extend_class）見 constants.Step_col_schema。
+        """
+        if step == "step3":
+            return list(self.duplicate_keys or [])
+        if step == "step4":
+            return list(self.extend_null_columns)
+        if step == "step6":
+            return [column for column, _ in self.rank_schema.values()]
+        return []
+
+
+def _require(condition, chart_name, message):
+    if not condition:
+        raise RuleError(f"{chart_name}: {message}")
+
+def _is_text_list(value):
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
+
+def compile_chart(chart_name, spec):
+    """
+    檢查單一報表的規範並編譯成 ChartRules
+
+    Parameters
+    ----------
+    chart_name : str
+        報表種類
+    spec : dict
+        rules.json 中該報表的規範
+
+    Returns
+    -------
+    ChartRules
+
+    Raises
+    ------
+    RuleError
+        規範有未知的項目、未知的步驟、型別錯誤，或步驟缺少需要的規範項目
+    """
+    _require(isinstance(spec, dict), chart_name, "規範必須是物件")
+    unknown = [key for key in spec if key not in SPEC_KEYS]
+    _require(not unknown, chart_name, f"未知的規範項目 {unknown}")
+
+    steps = spec.get("steps")
+    _require(_is_text_list(steps), chart_name, "steps 必須是步驟名稱的清單")
+    _require(all(step in STEPS for step in steps), chart_name, f"未知的步驟 {[step for step in steps if step not in STEPS]}")
+    _require(len(set(steps)) == len(steps), chart_name, "steps 有重複的步驟")
+    for step, key in STEP_REQUIREMENTS.items():
+        _require(step not in steps or key in spec, chart_name, f"{step} 需要 {key}")
+
+    _require(_is_text_list(spec.get("required_columns")), chart_name, "required_columns 必須是欄位名稱的清單")
+    _require(isinstance(spec.get("enabled", True), bool), chart_name, "enabled 必須是 true 或 false")
+    _require(spec.get("classification_mode", "mixed") in CLASSIFICATION_MODES, chart_name, f"classification_mode 必須是 {CLASSIFICATION_MODES} 之一")
+    for key in ["duplicate_keys", "extend_classes", "extend_null_columns"]:
+        _require(key not in spec or _is_text_list(spec[key]), chart_name, f"{key} 必須是文字的清單")
+    _require("duplicate_keys" not in spec or spec["duplicate_keys"], chart_name, "duplicate_keys 不可為空")
+
+    rank_columns = spec.get("rank_columns")
+    if rank_columns is not None:
+        _require(isinstance(rank_columns, dict), chart_name, "rank_columns 必須是物件")
+        for key, rank in rank_columns.items():
+            _require(
+                isinstance(rank, dict) and set(rank) == {"column", "max"} and isinstance(rank["column"], str),
+                chart_name, f"rank_columns.{key} 必須是 {{\"column\": 欄位名稱, \"max\": 最大名次}}"
+            )
+            _require(isinstance(rank["max"], int) and not isinstance(rank["max"], bool) and rank["max"] > 0,
+                     chart_name, f"rank_columns.{key}.max 必須是正整數")
+
+    decimal_limits = spec.get("decimal_limits")
+    if decimal_limits is not None:
+        _require(isinstance(decimal_limits, dict) and decimal_limits, chart_name, "decimal_limits 必須是非空的物件")
+        for key, limit in decimal_limits.items():
+            _require(isinstance(limit, int) and not isinstance(limit, bool) and limit >= 0,
+                     chart_name, f"decimal_limits.{key} 必須是非負整數")
+
+    return ChartRules(
+        name = chart_name,
+        steps = list(steps),
+        required_columns = list(spec["required_columns"]),
+        enabled = spec.get("enabled", True),
+        classification_mode = spec.get("classification_mode", "mixed"),
+        duplicate_keys = spec.get("duplicate_keys"),
+        rank_columns = rank_columns,
+        extend_classes = spec.get("extend_classes"),
+        extend_null_columns = spec.get("extend_null_columns", list(DEFAULT_EXTEND_NULL_COLUMNS)),
+        decimal_limits = decimal_limits
+    )
+
+def compile_rules(spec):
+    """
+    編譯所有報表的規範
+
+    Parameters
+    ----------
+    spec : dict
+        報表種類 -> 規範
+
+    Returns
+    -------
+    dict
+        報表種類 -> ChartRules，順序與 spec 相同
+    """
+    if not isinstance(spec, dict) or not spec:
+        raise RuleError("規範必須是以報表種類為 key 的非空物件")
+    return {chart_name: compile_chart(chart_name, chart_spec) for chart_name, chart_spec in spec.items()}
+
+def load_rules(path = RULES_FILE):
+    """
+    讀取並編譯規範檔案
+
+    Parameters
+    ----------
+    path : str
+        JSON 規範檔案路徑，預設為專案中的 rules.json
+
+    Returns
+    -------
+    dict
+        報表種類 -> ChartRules
+    """
+    with open(path, encoding = "utf-8") as f:
+        try:
+            spec = json.load(f)
+        except json.JSONDecodeError as e:
+            raise RuleError(f"{path} 不是正確的 JSON：{e}") from None
+    return compile_rules(spec)
@@ -0,0 +1,495 @@
+"""
+本機驗證服務：以 HTTP 接收報表（上傳檔案或本機路徑），交給固定數量的子程序驗證，回傳 JSON 結果
+
+    python -m service source/設研院產品分類表.xlsx --port 8765 -j 4
+
+分類表與分類組合鍵索引只在啟動時建立一次，子程序啟動後一直保留（以 fork 啟動時直接繼承），
+每個驗證工作不需要重新讀取分類表；多個驗證可以同時進行，超過子程序數量的工作依序排隊。
+
+    GET  /health               服務狀態：子程序數量、排隊中的工作數、子程序重新建立的次數、可驗證的報表種類
+    POST /jobs                 送出驗證工作，回傳工作狀態 (202)
+    POST /validate             送出驗證工作並等待完成，直接回傳驗證結果
+    GET  /jobs/<id>            工作狀態；完成後包含驗證結果 (result)
+    GET  /jobs/<id>/events     以 NDJSON 逐行輸出工作狀態的變化（queued -> running -> done），完成後結束
+
+送出工作的兩種方式（報表種類 chart 可省略，依檔名自動判斷）：
+    - 上傳檔案：request body 為報表檔案內容，以 query string 指定 filename（與 chart）
+        curl --data-binary @products_momo_1128.csv "http://127.0.0.1:8765/validate?filename=products_momo_1128.csv"
+      檔案內容分段寫入暫存檔，不會整個讀入記憶體；需要 Content-Length (411)，超過 --max-upload-mb 時回傳 413
+    - 本機路徑：Content-Type 為 application/json，body 為 {"path": 報表路徑, "chart": 報表種類}
+        curl -H "Content-Type: application/json" -d '{"path": "reports/products_momo_1128.csv"}' http://127.0.0.1:8765/jobs
+
+驗證結果與命令列批次模式 (python -m verify) 中每個報表的結果相同（見 verify.core.verify_report）。
+子程序異常結束（例如記憶體不足被系統終止）時，該工作回報 failed，服務自動重新建立子程序並繼續處理其他工作。
+"""
+
+import argparse
+import concurrent.futures
+import itertools
+import json
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import urlsplit, parse_qs
+
+from verify.core import (
+    prepare_classification,
+    build_classification_index,
+    make_worker_pool,
+    verify_in_worker
+)
+from readers import read_classification
+from constants import charts
+
+DEFAULT_PORT = 8765
+# 排隊中與執行中的工作數上限，超過時拒絕新的工作 (503)
+DEFAULT_MAX_PENDING = 64
+# 保留結果的已完成工作數，超過時刪除最早完成的工作
+DEFAULT_MAX_FINISHED = 256
+# events 檢查工作狀態的間隔（秒）
+EVENT_INTERVAL = 0.2
+# 上傳檔案的大小上限
+DEFAULT_MAX_UPLOAD_BYTES = 1024 * 2 ** 20
+# 上傳檔案每次讀取並寫入暫存檔的大小
+UPLOAD_BLOCK_SIZE = 2 ** 20
+# 以本機路徑送出工作時 JSON request body 的大小上限
+MAX_JSON_BYTES = 64 * 2 ** 10
+
+
+class ServiceError(Exception):
+    """無法處理的請求；status 為回應的 HTTP 狀態碼"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class Job:
+    """
+    一個驗證工作
+
+    file 為回傳結果中的檔案名稱（上傳檔案時為 filename，而不是暫存檔的路徑）；
+    upload_dir 為上傳檔案的暫存資料夾，工作完成後刪除
+    """
+    id: str
+    file: str
+    chart_name: Optional[str]
+    future: concurrent.futures.Future
+    submitted: float = field(default_factory = time.time)
+    upload_dir: Optional[str] = None
+    finished: Optional[float] = None
+
+    @property
+    def status(self):
+        if self.future.done():
+            return "failed" if self.future.exception() is not None else "done"
+        return "running" if self.future.running() else "queued"
+
+
+class ValidationService():
+    """
+    以固定數量的子程序驗證報表的工作佇列
+
+    Parameters
+    ----------
+    classification : pandas DataFrame
+        已加上 classification_* 組合鍵欄位的分類表
+    jobs : int
+        子程序數量；0 表示使用所有 CPU 核心
+    chunksize : int or None
+        指定時 csv 報表改為分段讀取
+    max_pending : int
+        排隊中與執行中的工作數上限
+    path_roots : list or None
+        以本機路徑送出工作時，允許的資料夾；None 表示不限制
+    max_finished : int
+        保留結果的已完成工作數
+    max_upload_bytes : int
+        上傳檔案的大小上限
+    """
+
+    def __init__(self, classification, jobs = 1, chunksize = None, max_pending = DEFAULT_MAX_PENDING,
+                 path_roots = None, max_finished = DEFAULT_MAX_FINISHED, max_upload_bytes = DEFAULT_MAX_UPLOAD_BYTES):
+        self.jobs = jobs or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.max_finished = max_finished
+        self.max_upload_bytes = max_upload_bytes
+        self.path_roots = [os.path.realpath(root) for root in path_roots] if path_roots else None
+        self.upload_root = tempfile.mkdtemp(prefix = "tdri_verifier_")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._classification = classification
+        self._classification_index = build_classification_index(classification)
+        self._chunksize = chunksize
+        # 子程序異常結束（例如記憶體不足被系統終止）後重新建立子程序的次數
+        self.restarts = 0
+        self.executor = self._make_executor()
+
+    def _make_executor(self):
+        executor = make_worker_pool(self._classification, self.jobs, self._classification_index, chunksize = self._chunksize)
+        # 以 fork 啟動時，所有子程序在第一次送出工作時一起建立；先在這裡建立，
+        # 子程序就不會繼承之後才建立的 HTTP server socket，第一個工作也不需要等待子程序啟動
+        executor.submit(int).result()
+        return executor
+
+    def _restart_executor(self, broken):
+        """子程序異常結束後 executor 無法再使用 (BrokenProcessPool)，以新的子程序取代；呼叫時需持有 _lock"""
+        if self.executor is not broken:
+            return
+        broken.shutdown(wait = False, cancel_futures = True)
+        self.executor = self._make_executor()
+        self.restarts += 1
+
+    def pending(self):
+        """排隊中與執行中的工作數"""
+        with self._lock:
+            return sum(not job.future.done() for job in self._jobs.values())
+
+    def _check_chart(self, chart_name):
+        if chart_name is not None and chart_name not in charts:
+            raise ServiceError(400, f"未知的報表種類 {chart_name}，可用的種類：{', '.join(charts)}")
+
+    def _check_path(self, path):
+        if not isinstance(path, str) or not os.path.isfile(path):
+            raise ServiceError(400, f"找不到報表檔案 {path}")
+        if self.path_roots is not None:
+            real_path = os.path.realpath(path)
+            if not any(os.path.commonpath([real_path, root]) == root for root in self.path_roots):
+                raise ServiceError(403, f"不允許讀取 {path}")
+
+    def _submit(self, path, chart_name, file_name, upload_dir = None):
+        with self._lock:
+            if sum(not job.future.done() for job in self._jobs.values()) >= self.max_pending:
+                if upload_dir is not None:
+                    shutil.rmtree(upload_dir, ignore_errors = True)
+                raise ServiceError(503, f"排隊中的工作已達上限 ({self.max_pending})，請稍後再試")
+            job_id = str(next(self._ids))
+            try:
+                future = self.executor.submit(verify_in_worker, path, chart_name, file_name)
+            except BrokenProcessPool:
+                self._restart_executor(self.executor)
+                future = self.executor.submit(verify_in_worker, path, chart_name, file_name)
+            job = Job(job_id, file_name, chart_name, future, upload_dir = upload_dir)
+            self._jobs[job_id] = job
+        executor = self.executor
+        future.add_done_callback(lambda _: self._finish(job, executor))
+        return job
+
+    def _finish(self, job, executor):
+        job.finished = time.time()
+        if job.upload_dir is not None:
+            shutil.rmtree(job.upload_dir, ignore_errors = True)
+        with self._lock:
+            if not job.future.cancelled() and isinstance(job.future.exception(), BrokenProcessPool):
+                self._restart_executor(executor)
+            finished = [job_id for job_id, other in self._jobs.items() if other.future.done()]
+            for job_id in finished[:max(len(finished) - self.max_finished, 0)]:
+                del self._jobs[job_id]
+
+    def submit_path(self, path, chart_name = None):
+        """
+        送出本機報表檔案的驗證工作
+
+        Returns
+        -------
+        Job
+
+        Raises
+        ------
+        ServiceError
+            報表種類不存在 (400)、找不到檔案 (400)、路徑不在 path_roots 中 (403) 或排隊中的工作已達上限 (503)
+        """
+        self._check_chart(chart_name)
+        self._check_path(path)
+        return self._submit(path, chart_name, path)
+
+    def submit_upload(self, stream, file_name, chart_name = None, length = None):
+        """
+        送出上傳檔案的驗證工作；檔案內容以 UPLOAD_BLOCK_SIZE 分段寫入暫存資料夾，工作完成後刪除
+
+        Parameters
+        ----------
+        stream : file-like
+            報表檔案內容的二進位檔案物件，例如 request body
+        file_name : str
+            原始檔名（依檔名判斷報表種類，也是結果中的 file）
+        chart_name : str or None
+            報表種類；None 時依檔名自動判斷
+        length : int or None
+            從 stream 讀取的位元組數（Content-Length）；None 時讀到檔案結尾
+
+        Returns
+        -------
+        Job
+
+        Raises
+        ------
+        ServiceError
+            沒有檔名或內容不完整 (400)、超過 max_upload_bytes (413)，以及 _submit 的錯誤
+        """
+        self._check_chart(chart_name)
+        # 只保留檔名，不允許以 filename 指定暫存資料夾以外的路徑
+        file_name = os.path.basename((file_name or "").replace("\\", "/"))
+        if file_name in ("", ".", ".."):
+            raise ServiceError(400, "上傳檔案時需要以 filename 指定檔名")
+        if length is not None and length > self.max_upload_bytes:
+            raise ServiceError(413, f"上傳檔案超過大小上限 ({self.max_upload_bytes} bytes)")
+        upload_dir = tempfile.mkdtemp(dir = self.upload_root)
+        try:
+            self._copy_upload(stream, os.path.join(upload_dir, file_name), length)
+        except BaseException:
+            shutil.rmtree(upload_dir, ignore_errors = True)
+            raise
+        return self._submit(os.path.join(upload_dir, file_name), chart_name, file_name, upload_dir)
+
+    def _copy_upload(self, stream, path, length):
+        remaining = length
+        written = 0
+        with open(path, "wb") as f:
+            while remaining is None or remaining > 0:
+                block = stream.read(UPLOAD_BLOCK_SIZE if remaining is None else min(UPLOAD_BLOCK_SIZE, remaining))
+                if not block:
+                    if remaining is not None:
+                        raise ServiceError(400, f"上傳檔案不完整：應為 {length} bytes，只收到 {written} bytes")
+                    break
+                written += len(block)
+                if written > self.max_upload_bytes:
+                    raise ServiceError(413, f"上傳檔案超過大小上限 ({self.max_upload_bytes} bytes)")
+                f.write(block)
+                if remaining is not None:
+                    remaining -= len(block)
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise ServiceError(404, f"找不到工作 {job_id}")
+        return job
+
+    def describe(self, job):
+        """
+        工作狀態
+
+        Returns
+        -------
+        dict
+            id, file, chart_name, status (queued / running / done / failed), submitted；
+            排隊中的工作有 position（前面還有幾個排隊中的工作），完成的工作有 seconds 與 result，失敗的工作有 error
+        """
+        status = job.status
+        state = {"id": job.id, "file": job.file, "chart_name": job.chart_name, "status": status, "submitted": job.submitted}
+        if status == "queued":
+            with self._lock:
+                state["position"] = sum(
+                    other.status == "queued" for other in itertools.takewhile(lambda other: other is not job, self._jobs.values())
+                )
+        elif status == "done":
+            state["seconds"] = (job.finished or time.time()) - job.submitted
+            state["result"] = job.future.result()
+        elif status == "failed":
+            state["error"] = f"{type(job.future.exception()).__name__}: {job.future.exception()}"
+        return state
+
+    def wait(self, job, timeout = None):
+        """等待工作完成，回傳 describe() 的結果"""
+        concurrent.futures.wait([job.future], timeout = timeout)
+        return self.describe(job)
+
+    def events(self, job, interval = EVENT_INTERVAL):
+        """
+        工作狀態的變化：每次狀態或排隊位置改變時產生一次 describe() 的結果，完成（done / failed）後結束
+
+        Yields
+        ------
+        dict
+        """
+        last = None
+        while True:
+            state = self.describe(job)
+            progress = (state["status"], state.get("position"))
+            if progress != last:
+                yield state
+                last = progress
+            if state["status"] in ("done", "failed"):
+                return
+            concurrent.futures.wait([job.future], timeout = interval)
+
+    def close(self):
+        self.executor.shutdown(wait = True, cancel_futures = True)
+        shutil.rmtree(self.upload_root, ignore_errors = True)
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """HTTP 請求處理；service 由 make_server 設定在 server 上"""
+
+    server_version = "TDRIVerifier/1.0"
+
+    @property
+    def service(self):
+        return self.server.service
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, body):
+        content = json.dumps(body, ensure_ascii = False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _send_events(self, job):
+        # 沒有 Content-Length，逐行輸出並在完成後關閉連線
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        for state in self.service.events(job):
+            self.wfile.write(json.dumps(state, ensure_ascii = False).encode("utf-8") + b"\n")
+            self.wfile.flush()
+        self.close_connection = True
+
+    def _route(self, method):
+        url = urlsplit(self.path)
+        parts = [part for part in url.path.split("/") if part]
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        if method == "GET" and parts == ["health"]:
+            return self._send_json(200, {
+                "status": "ok",
+                "workers": self.service.jobs,
+                "pending": self.service.pending(),
+                "restarts": self.service.restarts,
+                "charts": list(charts)
+            })
+        if method == "GET" and len(parts) == 2 and parts[0] == "jobs":
+            return self._send_json(200, self.service.describe(self.service.get(parts[1])))
+        if method == "GET" and len(parts) == 3 and parts[0] == "jobs" and parts[2] == "events":
+            return self._send_events(self.service.get(parts[1]))
+        if method == "POST" and parts in (["jobs"], ["validate"]):
+            job = self._submit(query)
+            if parts == ["jobs"]:
+                return self._send_json(202, self.service.describe(job))
+            return self._send_json(200, self.service.wait(job))
+        raise ServiceError(404, f"找不到 {method} {url.path}")
+
+    def _content_length(self):
+        if "Content-Length" not in self.headers:
+            raise ServiceError(411, "需要 Content-Length")
+        value = self.headers["Content-Length"]
+        if not value.strip().isdigit():
+            raise ServiceError(400, f"Content-Length 不正確：{value}")
+        return int(value)
+
+    def _submit(self, query):
+        length = self._content_length()
+        if self.headers.get("Content-Type", "").split(";")[0].strip() == "application/json":
+            if length > MAX_JSON_BYTES:
+                raise ServiceError(413, f"JSON request body 超過大小上限 ({MAX_JSON_BYTES} bytes)")
+            body = self.rfile.read(length)
+            try:
+                request = json.loads(body)
+            except ValueError as e:
+                raise ServiceError(400, f"request body 不是正確的 JSON：{e}") from None
+            if not isinstance(request, dict) or "path" not in request:
+                raise ServiceError(400, "需要 {\"path\": 報表路徑}")
+            return self.service.submit_path(request["path"], request.get("chart", query.get("chart")))
+        return self.service.submit_upload(self.rfile, query.get("filename"), query.get("chart"), length)
+
+    def _handle(self, method):
+        try:
+            self._route(method)
+        except ServiceError as e:
+            if method == "POST":
+                # request body 可能沒有讀完，不能再以同一個連線處理下一個請求
+                self.close_connection = True
+            self._send_json(e.status, {"error": str(e)})
+        except ConnectionError:
+            # 用戶端已中斷連線（例如 events 輸出到一半），無法再回應
+            self.close_connection = True
+        except Exception as e:
+            sys.stderr.write(f"{method} {self.path} 處理失敗：\n{traceback.format_exc()}")
+            self.close_connection = True
+            self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+
+def make_server(service, host = "127.0.0.1", port = DEFAULT_PORT, verbose = False):
+    """
+    建立驗證服務的 HTTP server（每個請求一個執行緒，驗證本身在 service 的子程序中執行）
+
+    Parameters
+    ----------
+    service : ValidationService
+    host : str
+        監聽的位址；預設只接受本機連線
+    port : int
+        監聽的埠號；0 表示由系統指定（見 server.server_address）
+    verbose : bool
+        是否輸出每個請求的紀錄
+
+    Returns
+    -------
+    http.server.ThreadingHTTPServer
+    """
+    server = ThreadingHTTPServer((host, port), ServiceHandler)
+    server.daemon_threads = True
+    server.service = service
+    server.verbose = verbose
+    return server
+
+def _stop(signum, frame):
+    raise KeyboardInterrupt
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(prog = "python -m service", description = "設研院報表驗證服務（本機 HTTP）")
+    parser.add_argument("classification", help = "產品分類表（csv、xlsx、Parquet 或 Arrow）")
+    parser.add_argument("--host", default = "127.0.0.1", help = "監聽的位址（預設 127.0.0.1，只接受本機連線）")
+    parser.add_argument("--port", type = int, default = DEFAULT_PORT, help = f"監聽的埠號（預設 {DEFAULT_PORT}）")
+    parser.add_argument("-j", "--jobs", type = int, default = 1, help = "驗證的子程序數量，0 表示使用所有 CPU 核心（預設 1）")
+    parser.add_argument("--chunksize", type = int, help = "csv 報表改為分段讀取，每段的列數（大型報表節省記憶體）")
+    parser.add_argument("--max-pending", type = int, default = DEFAULT_MAX_PENDING, help = f"排隊中與執行中的工作數上限（預設 {DEFAULT_MAX_PENDING}）")
+    parser.add_argument("--path-root", action = "append", help = "以本機路徑送出工作時允許的資料夾，可指定多次（預設不限制）")
+    parser.add_argument("--max-upload-mb", type = int, default = DEFAULT_MAX_UPLOAD_BYTES // 2 ** 20,
+                        help = f"上傳檔案的大小上限（MB，預設 {DEFAULT_MAX_UPLOAD_BYTES // 2 ** 20}）")
+    parser.add_argument("-v", "--verbose", action = "store_true", help = "輸出每個請求的紀錄")
+    args = parser.parse_args(argv)
+
+    classification = prepare_classification(read_classification(args.classification))
+    service = ValidationService(classification, args.jobs, args.chunksize, args.max_pending, args.path_root,
+                                max_upload_bytes = args.max_upload_mb * 2 ** 20)
+    server = make_server(service, args.host, args.port, args.verbose)
+    host, port = server.server_address[:2]
+    print(f"驗證服務已啟動：http://{host}:{port}（{service.jobs} 個子程序）", flush = True)
+    # 以 SIGTERM 停止服務（例如排程或容器）時，與 Ctrl+C 相同地關閉子程序並刪除暫存的上傳檔案
+    signal.signal(signal.SIGTERM, _stop)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,317 @@
+"""
+串流驗證模組：分段 (chunk) 讀取大型 CSV 報表並累計各步驟的檢查結果
+
+整份報表不會同時載入記憶體，記憶體用量取決於每段的列數 (chunksize)，而不是檔案大小。
+每段資料只更新累計值（空值數、重複鍵、分類不符的列、分類組合數量、出現過的擴充屬性等），
+全部讀完後再整理成與 Verify 各檢查相同的結果物件（results.py）並輸出，結果與一次讀入整份資料的驗證相同。
+"""
+
+import numpy as np
+import pandas as pd
+from verify import (
+    DUPLICATE_KEYS,
+    EXTEND_NULL_COLUMNS,
+    COVERAGE_COLUMNS,
+    STEP_LABELS,
+    COVERAGE_LABEL,
+    check_rank_column,
+    merge_rank_results,
+    count_decimal_places,
+    decimal_limits,
+    count_extend_class_nulls,
+    extend_null_counts_to_dict,
+    count_extend_class_presence,
+    extend_class_result,
+    decimal_result,
+    coverage_result,
+    duplicate_groups,
+    count_search_volume,
+    search_volume_result
+)
+from results import (
+    ColumnResult,
+    NullResult,
+    DuplicateResult,
+    ClassificationResult,
+    ClassificationStepResult,
+    RankResult,
+    SearchVolumeResult
+)
+from readers import optimize_dtypes
+from constants import charts, Config, Rank_col_schema, Categorical_columns
+
+DEFAULT_CHUNKSIZE = 100_000
+
+
+class ReportReadError(ValueError):
+    """分段讀取報表時的格式或編碼錯誤（pandas ParserError、UnicodeDecodeError 等），與驗證步驟本身的錯誤區分"""
+
+def read_csv_chunks(source, chart_name, chunksize = DEFAULT_CHUNKSIZE):
+    """
+    分段讀取 CSV 報表
+
+    重複列檢查的組合鍵欄位一律讀成字串，避免不同區塊推斷出不同型別（例如 5 與 5.0）
+    而使相同的鍵得到不同的雜湊值。其他低基數的文字欄位 (Categorical_columns) 解析成 category，
+    名次欄位以 readers.compact_rank_column 縮減型別（與一次讀入時的 optimize_dtypes 相同）。
+
+    Parameters:
+    -----------
+    source : str or file-like
+        CSV 檔案路徑或上傳的檔案物件
+    chart_name : str
+        報表種類
+    chunksize : int
+        每段的列數
+
+    Returns:
+    --------
+    generator
+        DataFrame 區塊
+    """
+    dtype = {col: "category" for col in Categorical_columns}
+    dtype.update({col: str for col in DUPLICATE_KEYS.get(chart_name, [])})
+    if not isinstance(source, str):
+        source.seek(0)
+    with pd.read_csv(source, chunksize = chunksize, dtype = dtype) as reader:
+        for chunk in reader:
+            yield optimize_dtypes(chunk, chart_name)
+
+
+class StreamingVerifier():
+    """
+    逐段累計驗證步驟的結果，最後透過 Verify 的 sink 一次輸出
+
+    用法：
+        stream = StreamingVerifier(verifier, "products_extend")
+        for chunk in read_csv_chunks(path, "products_extend"):
+            stream.update(chunk)
+        results = stream.finish()
+
+    重複列檢查只記錄每列組合鍵的 64 位元雜湊值（numpy uint64 陣列，每列 8 bytes）與 id，
+    不保留組合鍵欄位本身；全部讀完後再以雜湊值一次分組，得到與一次讀入相同的完整重複組。
+    """
+
+    def __init__(self, verifier, chart_name, steps = None, coverage_level = "further_subcategory"):
+        self.verifier = verifier
+        self.chart_name = chart_name
+        self.steps = charts[chart_name] if steps is None else steps
+        # coverage_level 為 None 時不做分類覆蓋率檢查
+        self.coverage_level = coverage_level
+
+        self.header = None
+        self.rows = 0
+        self.null_counts = None
+        self.dup_hashes = []
+        self.dup_row_ids = []
+        self.extend_present = set()
+        self.extend_null_counts = None
+        self.extend_presence = None
+        # 說明文字 -> [分類層級, 不符合的列數, 列數, 不符合的列 id]
+        self.classification = {}
+        self.rank = {}
+        self.decimal = None
+        self.search_volume_counts = None
+        self.search_volume_error = None
+        self.coverage_counts = None
+        # finish() 之後為步驟名稱 -> 結果
+        self.results = None
+
+    def update(self, chunk):
+        """以一段資料更新所有累計值（依步驟清單的順序，與一次驗證整份資料的處理順序相同）"""
+        if self.header is None:
+            self.header = chunk.iloc[0:0]
+        self.rows += len(chunk)
+
+        # 各步驟的累計時間記錄在 verifier.profile，名稱與一次讀入時相同
+        profile = self.verifier.profile
+        if self.coverage_level is not None:
+            with profile.measure(COVERAGE_LABEL):
+                self._update_coverage(chunk)
+        for step in self.steps:
+            with profile.measure(STEP_LABELS[step]):
+                getattr(self, "_update_" + step)(chunk)
+
+    def finish(self):
+        """
+        輸出累計的結果
+
+        Returns:
+        --------
+        dict
+            步驟名稱 -> 該步驟的結果物件（與 Verify.run_plan 相同）
+        """
+        header = self.header if self.header is not None else pd.DataFrame()
+        if self.coverage_level is not None:
+            counts = self.coverage_counts
+            if counts is None:
+                counts = pd.Series(dtype = np.int64)
+            self._publish(COVERAGE_LABEL, lambda header: coverage_result(self.verifier.classification, header.columns, counts, self.coverage_level), header)
+        self.results = {step: self._publish(STEP_LABELS[step], getattr(self, "_finish_" + step), header) for step in self.steps}
+        return self.results
+
+    def _publish(self, label, finish, header):
+        profile = self.verifier.profile
+        with profile.measure(label):
+            result = finish(header)
+            # 計算時間為所有區塊累計的時間（不含讀取檔案與輸出）
+            result.seconds = profile.timings[label].wall if label in profile.timings else 0.0
+            return self.verifier.publish(result)
+
+    # * * * 各步驟的累計 * * *
+
+    def _update_coverage(self, chunk):
+        class_cols = COVERAGE_COLUMNS[self.coverage_level]
+        if not all(col in chunk.columns for col in class_cols):
+            return
+        counts = chunk.groupby(class_cols, dropna = True, observed = True).size()
+        self.coverage_counts = counts if self.coverage_counts is None else self.coverage_counts.add(counts, fill_value = 0)
+
+    def _update_step1(self, chunk):
+        pass
+
+    def _update_step2(self, chunk):
+        columns = [col for col in Config[self.chart_name] if col in chunk.columns]
+        counts = chunk[columns].isna().sum()
+        self.null_counts = counts if self.null_counts is None else self.null_counts + counts
+
+    def _update_step3(self, chunk):
+        # 區塊之間的整數代碼不一致，改以欄位內容計算的雜湊值作為組合鍵
+        self.dup_hashes.append(pd.util.hash_pandas_object(chunk[DUPLICATE_KEYS[self.chart_name]], index = False).to_numpy())
+        self.dup_row_ids.append(chunk["id"].to_numpy())
+
+    def _update_step4(self, chunk):
+        self.extend_present.update(chunk['extend_class'].dropna().unique())
+        presence = count_extend_class_presence(chunk)
+        if presence is not None:
+            self.extend_presence = presence if self.extend_presence is None else self.extend_presence.add(presence, fill_value = 0)
+        null_columns = EXTEND_NULL_COLUMNS.get(self.chart_name, ["extend_subclass"])
+        if not null_columns:
+            return
+        counts = count_extend_class_nulls(chunk, null_columns)
+        self.extend_null_counts = counts if self.extend_null_counts is None else self.extend_null_counts.add(counts, fill_value = 0)
+
+    def _update_step5(self, chunk):
+        for caption, group, statstype in self.verifier.classification_groups(chunk, self.chart_name):
+            count, ids = self.verifier.find_incorrect_classified(group, statstype)
+            total = self.classification.setdefault(caption, [statstype, 0, 0, []])
+            total[1] += count
+            total[2] += len(group)
+            total[3].extend(ids)
+
+    def _update_step6(self, chunk):
+        for key, (col_name, range_) in Rank_col_schema[self.chart_name].items():
+            if col_name not in chunk.columns:
+                continue
+            result = check_rank_column(chunk, col_name, range_)
+            self.rank[key] = merge_rank_results(self.rank[key], result) if key in self.rank else result
+
+    def _update_step7(self, chunk):
+        if "extend_stats" not in chunk.columns:
+            return
+        counts = count_decimal_places(chunk["extend_stats"], decimal_limits(self.chart_name))
+        if self.decimal is None:
+            self.decimal = counts
+            return
+        for key, result in counts.items():
+            for name, value in result.items():
+                self.decimal[key][name] += value
+
+    def _update_step8(self, chunk):
+        if self.search_volume_error is not None:
+            return
+        try:
+            counts = count_search_volume(chunk)
+            self.search_volume_counts = counts if self.search_volume_counts is None else self.search_volume_counts.add(counts, fill_value = 0)
+        except Exception as e:
+            self.search_volume_error = e
+
+    # * * * 各步驟的結果 * * *
+
+    def _finish_step1(self, header):
+        return ColumnResult(self.chart_name, [col for col in Config[self.chart_name] if col not in header.columns])
+
+    def _finish_step2(self, header):
+        null_counts = self.null_counts
+        if null_counts is None:
+            null_counts = pd.Series(0, index = [col for col in Config[self.chart_name] if col in header.columns])
+        return NullResult(self.rows, {col: int(count) for col, count in null_counts.items()})
+
+    def _finish_step3(self, header):
+        if not self.dup_hashes:
+            return DuplicateResult(self.chart_name, [], [])
+        duplicated_ids, groups = duplicate_groups(np.concatenate(self.dup_hashes), pd.Series(np.concatenate(self.dup_row_ids)))
+        return DuplicateResult(self.chart_name, duplicated_ids, groups)
+
+    def _finish_step4(self, header):
+        null_counts = None
+        if EXTEND_NULL_COLUMNS.get(self.chart_name, ["extend_subclass"]):
+            null_counts = extend_null_counts_to_dict(self.extend_null_counts) if self.extend_null_counts is not None else {}
+        # 沒有讀到任何區塊時，以空的表頭得到與一次讀入相同的結果
+        presence = self.extend_presence if self.extend_presence is not None else count_extend_class_presence(header)
+        return extend_class_result(self.chart_name, self.extend_present, null_counts, presence)
+
+    def _finish_step5(self, header):
+        groups = [
+            ClassificationResult(statstype, rows, count, ids, caption)
+            for caption, (statstype, count, rows, ids) in self.classification.items()
+        ]
+        return ClassificationStepResult(self.chart_name, groups)
+
+    def _finish_step6(self, header):
+        missing_columns = [
+            col_name for key, (col_name, _) in Rank_col_schema[self.chart_name].items()
+            if key not in self.rank
+        ]
+        return RankResult(self.chart_name, self.rank, missing_columns)
+
+    def _finish_step7(self, header):
+        return decimal_result(self.decimal, decimal_limits(self.chart_name))
+
+    def _finish_step8(self, header):
+        if self.search_volume_error is not None:
+            return SearchVolumeResult(None, str(self.search_volume_error))
+        if self.search_volume_counts is None:
+            return SearchVolumeResult(0)
+        return search_volume_result(self.search_volume_counts)
+
+
+def stream_verify(verifier, source, chart_name, chunksize = DEFAULT_CHUNKSIZE, coverage_level = "further_subcategory"):
+    """
+    分段讀取 CSV 報表並執行該報表種類的所有驗證步驟（含分類覆蓋率檢查）
+
+    Parameters:
+    -----------
+    verifier : Verify
+    source : str or file-like
+        CSV 檔案路徑或上傳的檔案物件
+    chart_name : str
+        報表種類
+    chunksize : int
+        每段的列數
+    coverage_level : str or None
+        分類覆蓋率檢查的層級；None 表示不檢查
+
+    Returns:
+    --------
+    StreamingVerifier
+        已輸出結果的累計器；results 為步驟名稱 -> 結果，rows 為總列數
+
+    Raises:
+    -------
+    ReportReadError
+        讀取或解析報表失敗；驗證步驟中的錯誤照原樣拋出
+    """
+    stream = StreamingVerifier(verifier, chart_name, coverage_level = coverage_level)
+    chunks = iter(read_csv_chunks(source, chart_name, chunksize))
+    while True:
+        with verifier.profile.measure("load_report"):
+            try:
+                chunk = next(chunks, None)
+            except ValueError as e:
+                # ParserError、EmptyDataError 與 UnicodeDecodeError 都是 ValueError
+                raise ReportReadError(f"{type(e).__name__}: {e}") from e
+        if chunk is None:
+            break
+        stream.update(chunk)
+    stream.finish()
+    return stream
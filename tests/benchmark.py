@@ -0,0 +1,141 @@
+"""
+效能測試：以合成報表 (tests/synthetic.py) 量測每種報表的 Verify.check_* 與各步驟的執行時間
+
+    python -m tests.benchmark                                  # 所有報表，10k / 100k / 1M 列
+    python -m tests.benchmark --charts products keyword --rows 10000 100000
+    python -m tests.benchmark -o baseline.json                 # 儲存結果
+    python -m tests.benchmark --baseline baseline.json         # 與先前的結果比較，變慢超過門檻時結束碼為 1
+
+每個組合執行 --repeat 次，取最快的一次；時間由 profiling.Profile 記錄（不含產生資料）。
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import pandas as pd
+
+# 將專案根目錄添加到 Python 路徑
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from verify import Verify
+from output import NullSink
+from profiling import Profile
+from tests.synthetic import make_classification, make_report, chart_names
+
+DEFAULT_ROWS = [10_000, 100_000, 1_000_000]
+# 與 baseline 比較時，慢於 baseline 的倍數超過此門檻視為退步；太短的步驟不比較（誤差大）
+REGRESSION_THRESHOLD = 1.5
+MIN_COMPARED_SECONDS = 0.01
+
+
+def benchmark_chart(chart_name, data, classification, repeat = 3, trace_memory = False):
+    """
+    量測一份報表的分類覆蓋率檢查與 check_{chart_name}
+
+    Returns
+    -------
+    dict
+        步驟名稱 -> {"wall", "cpu", "peak_bytes"}（repeat 次中最快的一次）；
+        "check_{chart_name}" 為整個報表驗證的時間
+    """
+    best = {}
+    for _ in range(repeat):
+        profile = Profile(trace_memory = trace_memory)
+        verifier = Verify(classification, sink = NullSink(), profile = profile)
+        verifier.check_category_coverage(data)
+        with profile.measure(f"check_{chart_name}"):
+            getattr(verifier, f"check_{chart_name}")(data)
+        for timing in profile.timings.values():
+            if timing.name not in best or timing.wall < best[timing.name]["wall"]:
+                best[timing.name] = {"wall": timing.wall, "cpu": timing.cpu, "peak_bytes": timing.peak_bytes}
+    return best
+
+def run_benchmark(charts = None, rows = DEFAULT_ROWS, repeat = 3, trace_memory = False, seed = 0, log = print):
+    """
+    以合成報表量測每種報表在各個列數下的執行時間
+
+    Parameters
+    ----------
+    charts : list or None
+        報表種類；None 表示 constants.Config 的所有報表
+    rows : list
+        列數
+    repeat : int
+        每個組合的執行次數，取最快的一次
+    trace_memory : bool
+        是否記錄記憶體峰值（會拖慢執行速度）
+    seed : int
+        合成資料的亂數種子
+    log : callable or None
+        顯示進度的函數
+
+    Returns
+    -------
+    list
+        每個 (報表, 列數, 步驟) 一筆：{"chart_name", "rows", "step", "wall", "cpu", "peak_bytes"}
+    """
+    classification = make_classification()
+    results = []
+    for chart_name in charts or chart_names():
+        for n in rows:
+            data = make_report(chart_name, n, classification, seed = seed)
+            timings = benchmark_chart(chart_name, data, classification, repeat, trace_memory)
+            if log is not None:
+                log(f"{chart_name:<30} {n:>10,} 列  {timings[f'check_{chart_name}']['wall']:.3f} s")
+            results += [{"chart_name": chart_name, "rows": n, "step": step, **timing} for step, timing in timings.items()]
+    return results
+
+def compare_with_baseline(results, baseline, threshold = REGRESSION_THRESHOLD):
+    """
+    找出比 baseline 慢超過 threshold 倍的步驟
+
+    Returns
+    -------
+    pandas DataFrame
+        chart_name, rows, step, baseline, current, ratio；只包含退步的步驟
+    """
+    columns = ["chart_name", "rows", "step"]
+    merged = pd.DataFrame(results)[columns + ["wall"]].merge(
+        pd.DataFrame(baseline)[columns + ["wall"]], on = columns, suffixes = ("", "_baseline")
+    )
+    merged = merged[merged["wall_baseline"] >= MIN_COMPARED_SECONDS]
+    merged = merged.assign(ratio = merged["wall"] / merged["wall_baseline"])
+    return (merged[merged["ratio"] > threshold]
+            .rename(columns = {"wall": "current", "wall_baseline": "baseline"})
+            [columns + ["baseline", "current", "ratio"]]
+            .reset_index(drop = True))
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(prog = "python -m tests.benchmark", description = "以合成報表量測驗證步驟的執行時間")
+    parser.add_argument("--charts", nargs = "+", choices = chart_names(), help = "報表種類（預設全部）")
+    parser.add_argument("--rows", nargs = "+", type = int, default = DEFAULT_ROWS, help = "列數（預設 10000 100000 1000000）")
+    parser.add_argument("--repeat", type = int, default = 3, help = "每個組合的執行次數，取最快的一次（預設 3）")
+    parser.add_argument("--trace-memory", action = "store_true", help = "記錄記憶體峰值（會拖慢執行速度）")
+    parser.add_argument("-o", "--output", help = "將結果存成 JSON 檔案")
+    parser.add_argument("--baseline", help = "與先前存下的 JSON 結果比較")
+    parser.add_argument("--threshold", type = float, default = REGRESSION_THRESHOLD, help = "慢於 baseline 幾倍視為退步（預設 1.5）")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.charts, args.rows, args.repeat, args.trace_memory)
+    table = pd.DataFrame(results).pivot_table(index = ["chart_name", "step"], columns = "rows", values = "wall", sort = False)
+    print(table.map(lambda x: f"{x * 1000:.1f} ms").to_string())
+
+    if args.output:
+        with open(args.output, "w", encoding = "utf-8") as f:
+            json.dump(results, f, ensure_ascii = False, indent = 2)
+
+    if args.baseline:
+        with open(args.baseline, encoding = "utf-8") as f:
+            regressions = compare_with_baseline(results, json.load(f), args.threshold)
+        if len(regressions):
+            print(f"\n⚠️ 以下步驟比 baseline 慢超過 {args.threshold} 倍：")
+            print(regressions.to_string())
+            return 1
+        print("\n✅ 沒有步驟比 baseline 慢")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
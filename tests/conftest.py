@@ -3,67 +3,37 @@
 """
 
 import pandas as pd
-import numpy as np
-import sys
-from unittest import mock
 
-# 模擬 streamlit 功能的類別
-class MockStreamlit:
-    """模擬 streamlit 功能的類別"""
+from verify import prepare_classification
+
+class CountingSink:
+    """記錄各種輸出呼叫次數與最後一次資料的 sink，用來檢查驗證步驟輸出了哪些表格與下載按鈕"""
     def __init__(self):
-        self.container_calls = 0
         self.divider_calls = 0
         self.dataframe_calls = 0
         self.dataframe_data = None
         self.download_button_calls = 0
         self.download_button_data = None
 
+    def write(self, text, time_interval = None):
+        pass
+
+    def caption(self, text):
+        pass
+
     def divider(self):
         self.divider_calls += 1
-        
+
     def dataframe(self, data):
         self.dataframe_calls += 1
         self.dataframe_data = data
-        
+
     def download_button(self, label, data, file_name, mime):
         self.download_button_calls += 1
         self.download_button_data = data
 
-# 模擬 streamlit 模組
-class MockSt:
-    def __init__(self):
-        self.mock_container = MockStreamlit()
-        
-    def divider(self):
-        self.mock_container.divider()
-        
-    def dataframe(self, data):
-        self.mock_container.dataframe(data)
-        
-    def download_button(self, label, data, file_name, mime):
-        self.mock_container.download_button(label, data, file_name, mime)
-        
-    def container(self, border=False):
-        self.mock_container.container_calls += 1
-        return self
-
-    def write_stream(self, generator):
-        # 消耗生成器但不做任何事
-        for _ in generator:
-            pass
-
-def setup_streamlit_mock():
-    """
-    設置 streamlit 模擬並返回模擬對象
-    """
-    mock_st = MockSt()
-    
-    # 替換全局 st
-    import verify
-    sys.modules['streamlit'] = mock_st
-    verify.st = mock_st
-    
-    return mock_st
+    def flush(self):
+        pass
 
 def create_test_classification():
     """
@@ -74,15 +44,7 @@ def create_test_classification():
         'subcategory': ['手機', '電腦', '桌子', '椅子'],
         'further_subcategory': ['智慧型手機', '筆記型電腦', '辦公桌', '辦公椅']
     })
-    classification['classification_further_subcategory'] = classification.apply(
-        lambda row: f"{row['category']}_{row['subcategory']}_{row['further_subcategory']}", 
-        axis=1
-    )
-    classification['classification_subcategory'] = classification.apply(
-        lambda row: f"{row['category']}_{row['subcategory']}", 
-        axis=1
-    )
-    return classification
+    return prepare_classification(classification)
 
 def create_complete_data():
     """
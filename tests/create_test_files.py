@@ -2,9 +2,15 @@
 創建測試用的 Excel 檔案
 """
 import os
+import sys
 import pandas as pd
 import numpy as np
 
+# 將專案根目錄添加到 Python 路徑
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from verify import prepare_classification
+
 def create_test_files():
     # 確保測試數據目錄存在
     test_data_dir = os.path.join(os.path.dirname(__file__), 'test_data')
@@ -44,14 +50,7 @@ def create_test_files():
         'subcategory': ['手機', '電腦', '桌子', '椅子'],
         'further_subcategory': ['智慧型手機', '筆記型電腦', '辦公桌', '辦公椅']
     })
-    classification_data['classification_further_subcategory'] = classification_data.apply(
-        lambda row: f"{row['category']}_{row['subcategory']}_{row['further_subcategory']}", 
-        axis=1
-    )
-    classification_data['classification_subcategory'] = classification_data.apply(
-        lambda row: f"{row['category']}_{row['subcategory']}", 
-        axis=1
-    )
+    classification_data = prepare_classification(classification_data)
     classification_file_path = os.path.join(test_data_dir, 'classification.xlsx')
     classification_data.to_excel(classification_file_path, index=False)
     print(f"已創建分類表檔案: {classification_file_path}")
@@ -0,0 +1,170 @@
+"""
+功能測試 - 命令列批次模式 (python -m verify)
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+
+# 將專案根目錄添加到 Python 路徑
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import verify
+
+# 測試資料檔案路徑
+TEST_DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../test_data'))
+
+def without_timings(results):
+    """去掉各檢查的計算時間與效能紀錄，只比較檢查結果"""
+    for result in results:
+        result.pop('profile', None)
+        for check in result.get('checks', {}).values():
+            check.pop('seconds')
+    return results
+
+class TestCommandLine(unittest.TestCase):
+    """測試命令列批次驗證"""
+
+    def setUp(self):
+        """建立暫存的報表資料夾"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.classification_file = os.path.join(TEST_DATA_DIR, 'classification.xlsx')
+        self.report_dir = os.path.join(self.tmp_dir, 'reports')
+        os.makedirs(self.report_dir)
+        pd.DataFrame({
+            'id': [1, 2, 3],
+            'source_product_id': ['a', 'a', 'b'],
+            'category': ['電子產品', '電子產品', '家具'],
+            'subcategory': ['手機', '電腦', '桌子'],
+            'further_subcategory': ['智慧型手機', '筆記型電腦', '辦公桌']
+        }).to_csv(os.path.join(self.report_dir, 'products_momo_1128.csv'), index = False)
+        pd.DataFrame({'id': [1]}).to_csv(os.path.join(self.report_dir, 'unknown_file.csv'), index = False)
+        self.output_file = os.path.join(self.tmp_dir, 'result.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_directory_fan_out(self):
+        """測試傳入資料夾時會驗證所有報表並輸出 JSON"""
+        exit_code = verify.main([self.classification_file, self.report_dir, '-o', self.output_file])
+
+        with open(self.output_file, encoding = 'utf-8') as f:
+            results = json.load(f)
+        by_file = {os.path.basename(result['file']): result for result in results}
+
+        products = by_file['products_momo_1128.csv']
+        self.assertEqual(products['chart_name'], 'products')
+        self.assertEqual(products['rows'], 3)
+        self.assertEqual(products['duplicated_ids'], [2])
+        self.assertEqual(products['missing_categories'], ['家具_椅子_辦公椅'])
+        self.assertIn('⚠️ missing column: brand', products['messages'])
+        self.assertEqual(products['checks']['duplicates']['duplicated_ids'], [2])
+        self.assertIn('brand', products['checks']['columns']['missing_columns'])
+
+        # 無法判斷報表種類的檔案會回報錯誤，結束碼為 1
+        self.assertIn('error', by_file['unknown_file.csv'])
+        self.assertEqual(exit_code, 1)
+
+    def test_parallel_jobs_match_serial(self):
+        """測試以多個子程序平行驗證的結果與依序驗證相同，且順序不變"""
+        classification = verify.prepare_classification(verify.load_table(self.classification_file))
+        paths = verify.collect_report_files([self.report_dir]) * 2
+
+        serial = verify.verify_reports(classification, paths, jobs = 1)
+        parallel = verify.verify_reports(classification, paths, jobs = 2)
+
+        self.assertEqual(without_timings(parallel), without_timings(serial))
+        self.assertEqual([result['file'] for result in parallel], paths)
+
+    def test_worker_pool(self):
+        """測試以 make_worker_pool 與 verify_in_worker 驗證的結果與依序驗證相同"""
+        classification = verify.prepare_classification(verify.load_table(self.classification_file))
+        report = os.path.join(self.report_dir, 'products_momo_1128.csv')
+        serial = verify.verify_reports(classification, [report])
+
+        with verify.make_worker_pool(classification, 1, chart_name = 'products') as executor:
+            pooled = executor.submit(verify.verify_in_worker, report).result()
+            renamed = executor.submit(verify.verify_in_worker, report, 'products', 'upload.csv').result()
+
+        self.assertEqual(without_timings([pooled]), without_timings(serial))
+        self.assertEqual(renamed['file'], 'upload.csv')
+        self.assertEqual(renamed['rows'], serial[0]['rows'])
+
+    def test_chunksize_matches_full_read(self):
+        """測試以 --chunksize 分段讀取 csv 報表的結果與一次讀入相同"""
+        classification = verify.prepare_classification(verify.load_table(self.classification_file))
+        paths = verify.collect_report_files([self.report_dir])
+
+        full = verify.verify_reports(classification, paths)
+        chunked = verify.verify_reports(classification, paths, chunksize = 1)
+
+        self.assertEqual(without_timings(chunked), without_timings(full))
+
+    def test_explicit_chart(self):
+        """測試以 --chart 指定報表種類"""
+        report = os.path.join(self.report_dir, 'unknown_file.csv')
+        pd.DataFrame({
+            'id': [1],
+            'category': ['家具'],
+            'subcategory': ['桌子'],
+            'further_subcategory': ['辦公桌']
+        }).to_csv(report, index = False)
+
+        exit_code = verify.main([self.classification_file, report, '--chart', 'reference', '-o', self.output_file])
+
+        with open(self.output_file, encoding = 'utf-8') as f:
+            results = json.load(f)
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(results[0]['chart_name'], 'reference')
+
+    def test_result_cache(self):
+        """測試 --cache：內容相同的報表直接使用快取的結果，修改報表後重新驗證"""
+        cache_file = os.path.join(self.tmp_dir, 'cache', 'results.sqlite')
+        report = os.path.join(self.report_dir, 'products_momo_1128.csv')
+        args = [self.classification_file, report, '--cache', cache_file, '-o', self.output_file]
+
+        def run():
+            verify.main(args)
+            with open(self.output_file, encoding = 'utf-8') as f:
+                return json.load(f)[0]
+
+        first = run()
+        second = run()
+        self.assertNotIn('cached', first)
+        self.assertTrue(second.pop('cached'))
+        self.assertEqual(second, first)
+
+        # 相同內容的報表放在其他路徑也會使用快取，結果中的 file 為目前的路徑
+        copied = os.path.join(self.tmp_dir, 'products_copy.csv')
+        shutil.copy(report, copied)
+        classification = verify.prepare_classification(verify.load_table(self.classification_file))
+        with verify.ResultCache(cache_file) as cache:
+            results = verify.verify_reports(
+                classification, [copied], chart_name = 'products', cache = cache,
+                classification_digest = verify.file_digest(self.classification_file)
+            )
+        self.assertTrue(results[0]['cached'])
+        self.assertEqual(results[0]['file'], copied)
+
+        pd.DataFrame({'id': [1], 'source_product_id': ['a']}).to_csv(report, index = False)
+        changed = run()
+        self.assertNotIn('cached', changed)
+        self.assertEqual(changed['rows'], 1)
+
+    def test_errors_not_cached(self):
+        """測試無法驗證的報表不會存入快取"""
+        cache_file = os.path.join(self.tmp_dir, 'results.sqlite')
+        report = os.path.join(self.report_dir, 'products_broken.csv')
+        with open(report, 'wb') as f:
+            f.write(b'\xff\xfe\x00broken')
+        verify.main([self.classification_file, report, '--cache', cache_file, '-o', self.output_file])
+        with verify.ResultCache(cache_file) as cache:
+            self.assertEqual(len(cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,205 @@
+"""
+功能測試 - 本機驗證服務 (service.py)
+"""
+
+import io
+import os
+import sys
+import json
+import shutil
+import signal
+import tempfile
+import threading
+import unittest
+import http.client
+import urllib.error
+import urllib.request
+from unittest import mock
+import pandas as pd
+
+# 將專案根目錄添加到 Python 路徑
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import verify
+from service import ValidationService, ServiceError, make_server
+from tests.functional.test_cli import without_timings
+
+# 測試資料檔案路徑
+TEST_DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../test_data'))
+
+class TestValidationService(unittest.TestCase):
+    """以本機啟動的服務測試各個 API"""
+
+    @classmethod
+    def setUpClass(cls):
+        """啟動服務（2 個子程序，埠號由系統指定）"""
+        cls.tmp_dir = tempfile.mkdtemp()
+        cls.report = os.path.join(cls.tmp_dir, 'products_momo_1128.csv')
+        pd.DataFrame({
+            'id': [1, 2, 3],
+            'source_product_id': ['a', 'a', 'b'],
+            'category': ['電子產品', '電子產品', '家具'],
+            'subcategory': ['手機', '電腦', '桌子'],
+            'further_subcategory': ['智慧型手機', '筆記型電腦', '辦公桌']
+        }).to_csv(cls.report, index = False)
+        cls.classification = verify.prepare_classification(verify.load_table(os.path.join(TEST_DATA_DIR, 'classification.xlsx')))
+        cls.service = ValidationService(cls.classification, jobs = 2, path_roots = [cls.tmp_dir])
+        cls.server = make_server(cls.service, port = 0)
+        cls.url = 'http://127.0.0.1:%d' % cls.server.server_address[1]
+        cls.thread = threading.Thread(target = cls.server.serve_forever, daemon = True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.service.close()
+        shutil.rmtree(cls.tmp_dir)
+
+    def request(self, path, body = None, content_type = None):
+        """送出請求，回傳 (狀態碼, 回應內容)"""
+        request = urllib.request.Request(self.url + path, data = body, method = 'POST' if body is not None else 'GET')
+        if content_type:
+            request.add_header('Content-Type', content_type)
+        try:
+            with urllib.request.urlopen(request, timeout = 60) as response:
+                return response.status, response.read().decode('utf-8')
+        except urllib.error.HTTPError as e:
+            return e.code, e.read().decode('utf-8')
+
+    def expected(self):
+        return without_timings([verify.verify_report(self.classification, self.report)])[0]
+
+    def test_health(self):
+        """測試服務狀態"""
+        status, body = self.request('/health')
+        self.assertEqual(status, 200)
+        health = json.loads(body)
+        self.assertEqual(health['workers'], 2)
+        self.assertIn('products', health['charts'])
+
+    def test_validate_upload(self):
+        """測試上傳檔案的驗證結果與命令列批次模式相同，結果中的 file 為上傳的檔名"""
+        with open(self.report, 'rb') as f:
+            status, body = self.request('/validate?filename=products_momo_1128.csv', f.read(), 'text/csv')
+        self.assertEqual(status, 200)
+        state = json.loads(body)
+        self.assertEqual(state['status'], 'done')
+        result = without_timings([state['result']])[0]
+        self.assertEqual(result['file'], 'products_momo_1128.csv')
+        self.assertEqual({**result, 'file': self.report}, self.expected())
+
+    def test_path_job_and_events(self):
+        """測試以本機路徑送出工作，events 逐行輸出狀態直到完成"""
+        status, body = self.request('/jobs', json.dumps({'path': self.report}).encode(), 'application/json')
+        self.assertEqual(status, 202)
+        job = json.loads(body)
+        self.assertIn(job['status'], ['queued', 'running', 'done'])
+
+        status, body = self.request(f"/jobs/{job['id']}/events")
+        events = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(events[-1]['status'], 'done')
+        self.assertEqual(without_timings([events[-1]['result']])[0], self.expected())
+
+        status, body = self.request(f"/jobs/{job['id']}")
+        self.assertEqual(json.loads(body)['status'], 'done')
+
+    def test_concurrent_jobs(self):
+        """測試同時送出多個工作，全部完成且結果相同"""
+        jobs = [self.service.submit_path(self.report, 'products') for _ in range(6)]
+        results = [self.service.wait(job, timeout = 60) for job in jobs]
+        self.assertEqual({state['status'] for state in results}, {'done'})
+        self.assertEqual(len({json.dumps(without_timings([state['result']])[0]) for state in results}), 1)
+
+    def test_errors(self):
+        """測試錯誤的請求回傳對應的狀態碼與錯誤訊息"""
+        cases = [
+            ('/jobs/unknown', None, None, 404),
+            ('/jobs?chart=unknown&filename=a.csv', b'id\n1\n', 'text/csv', 400),
+            ('/jobs', b'id\n1\n', 'text/csv', 400),
+            ('/jobs', json.dumps({'path': os.path.join(TEST_DATA_DIR, 'complete_data.xlsx')}).encode(), 'application/json', 403),
+            ('/jobs', b'{"path": 1', 'application/json', 400),
+            ('/jobs?filename=..', b'id\n1\n', 'text/csv', 400)
+        ]
+        for path, body, content_type, expected in cases:
+            with self.subTest(path = path, body = body):
+                status, response = self.request(path, body, content_type)
+                self.assertEqual(status, expected)
+                self.assertIn('error', json.loads(response))
+
+    def raw_request(self, path, headers, body = b''):
+        """不經過 urllib 送出 POST 請求（可省略或竄改 Content-Length），回傳 (狀態碼, 回應內容)"""
+        connection = http.client.HTTPConnection('127.0.0.1', self.server.server_address[1], timeout = 60)
+        try:
+            connection.putrequest('POST', path)
+            for key, value in headers.items():
+                connection.putheader(key, value)
+            connection.endheaders(body)
+            response = connection.getresponse()
+            return response.status, response.read().decode('utf-8')
+        finally:
+            connection.close()
+
+    def test_upload_limits(self):
+        """測試上傳檔案缺少 Content-Length (411)、Content-Length 不正確 (400) 與超過大小上限 (413)"""
+        status, body = self.raw_request('/jobs?filename=products_momo_1128.csv', {})
+        self.assertEqual(status, 411)
+        status, body = self.raw_request('/jobs?filename=products_momo_1128.csv', {'Content-Length': 'abc'})
+        self.assertEqual(status, 400)
+        self.assertIn('error', json.loads(body))
+
+        uploads = set(os.listdir(self.service.upload_root))
+        max_upload_bytes = self.service.max_upload_bytes
+        self.service.max_upload_bytes = 4
+        try:
+            status, body = self.request('/jobs?filename=products_momo_1128.csv', b'id\n1\n', 'text/csv')
+            self.assertEqual(status, 413)
+            with self.assertRaises(ServiceError) as context:
+                self.service.submit_upload(io.BytesIO(b'id\n1\n'), 'products_momo_1128.csv')
+            self.assertEqual(context.exception.status, 413)
+        finally:
+            self.service.max_upload_bytes = max_upload_bytes
+        # 超過上限時刪除已寫入一部分的暫存檔
+        self.assertEqual(set(os.listdir(self.service.upload_root)) - uploads, set())
+
+    def test_unknown_chart_in_file_name(self):
+        """測試無法依檔名判斷報表種類時，工作完成但結果帶有 error"""
+        state = self.service.wait(self.service.submit_upload(io.BytesIO(b'id\n1\n'), 'unknown_file.csv'), timeout = 60)
+        self.assertEqual(state['status'], 'done')
+        self.assertIn('error', state['result'])
+
+    def test_unexpected_error(self):
+        """測試處理請求時發生非預期的例外，回傳 500 與 JSON 錯誤訊息"""
+        with mock.patch.object(self.service, 'pending', side_effect = RuntimeError('boom')):
+            status, body = self.request('/health')
+        self.assertEqual(status, 500)
+        self.assertEqual(json.loads(body)['error'], 'RuntimeError: boom')
+
+    def test_broken_worker(self):
+        """測試子程序異常結束後，服務重新建立子程序並繼續處理工作"""
+        service = ValidationService(self.classification, jobs = 1)
+        try:
+            executor = service.executor
+            for process in list(executor._processes.values()):
+                os.kill(process.pid, signal.SIGKILL)
+            # 子程序結束後送出的第一個工作可能回報 failed，之後的工作使用新的子程序
+            states = [service.wait(service.submit_path(self.report, 'products'), timeout = 60) for _ in range(2)]
+            self.assertEqual(states[-1]['status'], 'done')
+            self.assertIsNot(service.executor, executor)
+            self.assertEqual(service.restarts, 1)
+        finally:
+            service.close()
+
+    def test_max_pending(self):
+        """測試排隊中的工作達到上限時拒絕新的工作"""
+        service = ValidationService(self.classification, jobs = 1, max_pending = 0)
+        try:
+            with self.assertRaises(ServiceError) as context:
+                service.submit_path(self.report)
+            self.assertEqual(context.exception.status, 503)
+        finally:
+            service.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+"""
+產生任意列數的合成報表，供效能測試 (tests/benchmark.py) 使用
+
+每種報表 (constants.Config 的每個 key) 都包含必要欄位、名次欄位與各步驟額外讀取的欄位，
+資料分佈接近實際報表：
+    - 分類欄位從分類表中抽樣，混入少量不存在的分類組合與空值
+    - 混合層級的報表約 30% 為品類層級 (stats_type = subcategory)
+    - 名次欄位大多在規範內，少數為 999、超出範圍或空值
+    - extend_stats 為 JSON 文字，ratio / avg_price 的小數位數不一，部分以 0 結尾
+    - products / products_extend 約有 2% 的重複列
+
+除了 extend_stats 的小數格式化之外，欄位都以 numpy 向量化產生，一百萬列的報表只需數秒。
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# 將專案根目錄添加到 Python 路徑
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from verify import prepare_classification
+from readers import report_columns
+from constants import Config, Rank_col_schema, Extend_class_schema, classification_columns
+
+# 不在分類表中的分類組合、重複列、名次違規等問題資料的比例
+ERROR_RATE = 0.02
+NULL_RATE = 0.01
+
+
+def make_classification(categories = 8, subcategories = 6, further_subcategories = 5):
+    """
+    產生分類表（已加上 classification_* 組合鍵欄位）
+
+    Parameters
+    ----------
+    categories, subcategories, further_subcategories : int
+        各層級的分類數量；子類數量為三者相乘
+
+    Returns
+    -------
+    pandas DataFrame
+    """
+    rows = [
+        (f"大分類{i}", f"中分類{i}-{j}", f"小分類{i}-{j}-{k}")
+        for i in range(categories)
+        for j in range(subcategories)
+        for k in range(further_subcategories)
+    ]
+    return prepare_classification(pd.DataFrame(rows, columns = classification_columns))
+
+def _with_nulls(rng, values, rate = NULL_RATE):
+    values = pd.Series(values, dtype = object)
+    values[rng.random(len(values)) < rate] = None
+    return values
+
+def _classification_sample(rng, classification, rows, mixed):
+    """從分類表抽樣分類欄位；少數列改成不存在的組合，mixed 時部分列為品類層級"""
+    sample = classification[classification_columns].iloc[rng.integers(0, len(classification), rows)].reset_index(drop = True)
+    wrong = rng.random(rows) < ERROR_RATE
+    sample.loc[wrong, "further_subcategory"] = "不存在的小分類"
+    sample["category"] = _with_nulls(rng, sample["category"])
+    if mixed:
+        sample["stats_type"] = np.where(rng.random(rows) < 0.3, "subcategory", "further_subcategory")
+        sample.loc[sample["stats_type"] == "subcategory", "further_subcategory"] = None
+    else:
+        sample["stats_type"] = "further_subcategory"
+    return sample
+
+def _rank(rng, rows, range_):
+    """名次欄位：大多在 1..range_，少數為 999、超出範圍或空值"""
+    rank = rng.integers(1, range_ + 1, rows).astype(float)
+    roll = rng.random(rows)
+    rank[roll < 0.05] = 999
+    rank[roll < ERROR_RATE] = range_ + rng.integers(1, 50, rows)[roll < ERROR_RATE]
+    rank[roll < NULL_RATE] = np.nan
+    return rank
+
+def _extend_stats(rng, rows):
+    """extend_stats JSON 文字：ratio 有 2～5 位小數，avg_price 有 0～4 位小數（部分以 0 結尾）"""
+    ratio = pd.Series(rng.random(rows))
+    ratio_digits = rng.integers(2, 6, rows)
+    price = pd.Series(rng.random(rows) * 5000)
+    price_digits = rng.integers(0, 5, rows)
+    ratio_text = pd.Series([f"{value:.{digits}f}" for value, digits in zip(ratio.to_numpy(), ratio_digits)])
+    price_text = pd.Series([f"{value:.{digits}f}" for value, digits in zip(price.to_numpy(), price_digits)])
+    stats = '{"ratio": ' + ratio_text + ', "avg_price": ' + price_text + ', "count": ' + pd.Series(rng.integers(1, 1000, rows)).astype(str) + '}'
+    return _with_nulls(rng, stats)
+
+def _text(rng, prefix, rows, distinct):
+    return pd.Series(prefix + pd.Series(rng.integers(0, distinct, rows)).astype(str))
+
+def make_report(chart_name, rows, classification = None, seed = 0):
+    """
+    產生一份合成報表
+
+    Parameters
+    ----------
+    chart_name : str
+        報表種類（constants.Config 的 key）
+    rows : int
+        列數
+    classification : pandas DataFrame or None
+        抽樣分類欄位用的分類表；None 時使用 make_classification()
+    seed : int
+        亂數種子；相同的參數會產生相同的報表
+
+    Returns
+    -------
+    pandas DataFrame
+        包含 readers.report_columns(chart_name) 的所有欄位
+    """
+    rng = np.random.default_rng(seed)
+    if classification is None:
+        classification = make_classification()
+    mixed = chart_name.startswith("chart_")
+    data = _classification_sample(rng, classification, rows, mixed)
+    data["id"] = np.arange(1, rows + 1)
+
+    if chart_name in ["products", "products_extend"]:
+        # 約 ERROR_RATE 的列重複前面的 source_product_id
+        source_product_id = np.arange(rows)
+        duplicated = rng.random(rows) < ERROR_RATE
+        source_product_id[duplicated] = rng.integers(0, rows, duplicated.sum())
+        data["source_product_id"] = pd.Series(source_product_id).astype(str)
+
+    if chart_name in Extend_class_schema and Extend_class_schema[chart_name]:
+        extend_classes = Extend_class_schema[chart_name]
+        data["extend_class"] = _with_nulls(rng, np.array(extend_classes, dtype = object)[rng.integers(0, len(extend_classes), rows)])
+        data["extend_subclass"] = _with_nulls(rng, _text(rng, "子屬性", rows, 20), 0.2)
+        data["extend_detail"] = _text(rng, "屬性值", rows, 200)
+        data["extend_unit"] = _with_nulls(rng, np.array(["cm", "kg", "ml", "吋"], dtype = object)[rng.integers(0, 4, rows)], 0.5)
+        if chart_name == "products_extend":
+            # 重複列的擴充屬性也相同，才會被組合鍵判斷為重複
+            first = data.groupby("source_product_id").cumcount() > 0
+            for col in ["extend_class", "extend_subclass", "extend_detail"]:
+                data.loc[first, col] = data.loc[first, "source_product_id"].map(data.drop_duplicates("source_product_id").set_index("source_product_id")[col])
+
+    for col_name, range_ in Rank_col_schema.get(chart_name, {}).values():
+        data[col_name] = _rank(rng, rows, range_)
+
+    if chart_name == "keyword":
+        search_volume = rng.integers(0, 100000, rows).astype(float)
+        search_volume[rng.random(rows) < 0.05] = 0
+        search_volume[rng.random(rows) < NULL_RATE] = np.nan
+        data["search_volume"] = search_volume
+        data["is_brand"] = rng.random(rows) < 0.4
+        data["domain"] = np.array(["momo", "pchome", "shopee", "google"], dtype = object)[rng.integers(0, 4, rows)]
+
+    if chart_name == "reference":
+        data["references_id"] = data["id"]
+        data["reference_id"] = data["id"]
+
+    # 其餘欄位：extend_stats 為 JSON 文字，其他為一般文字或數值
+    for col in report_columns(chart_name):
+        if col in data.columns:
+            continue
+        if col == "extend_stats":
+            data[col] = _extend_stats(rng, rows)
+        elif col in ["list_price", "sale_price", "sales_volume", "amount", "product_sales", "highest_price",
+                     "lowest_price", "average_price", "average_discounted_price", "predict_volume",
+                     "search_volume_max", "search_volume_min"]:
+            data[col] = np.round(rng.random(rows) * 10000, 2)
+        else:
+            data[col] = _with_nulls(rng, _text(rng, col + "_", rows, 1000))
+    return data[list(dict.fromkeys(report_columns(chart_name) + list(data.columns)))]
+
+def chart_names():
+    """可以產生的報表種類（constants.Config 的所有 key）"""
+    return list(Config.keys())
@@ -12,7 +12,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../.
 import pandas as pd
 from verify import Verify
 from tests.conftest import (
-    setup_streamlit_mock,
+    CountingSink,
     create_test_classification,
     create_complete_data,
     create_incomplete_data
@@ -29,11 +29,9 @@ class TestCategoryCoverage(unittest.TestCase):
         self.complete_data = create_complete_data()
         self.incomplete_data = create_incomplete_data()
         
-        # 模擬 streamlit
-        self.mock_st = setup_streamlit_mock()
-        
         # 創建驗證器實例
-        self.verifier = Verify(self.classification)
+        self.sink = CountingSink()
+        self.verifier = Verify(self.classification, sink = self.sink)
         
     def test_check_category_coverage_complete(self):
         """測試完整資料的分類覆蓋檢查"""
@@ -42,10 +40,10 @@ class TestCategoryCoverage(unittest.TestCase):
         
         # 驗證結果
         self.assertEqual(len(missing_categories), 0, "完整資料不應有缺失的分類")
-        self.assertEqual(self.mock_st.mock_container.dataframe_calls, 1, "應該調用 dataframe 展示結果")
+        self.assertEqual(self.sink.dataframe_calls, 1, "應該調用 dataframe 展示結果")
         
         # 檢查 dataframe 內容
-        df = self.mock_st.mock_container.dataframe_data
+        df = self.sink.dataframe_data
         # 如果是 Styler 對象，獲取內部的 DataFrame
         if hasattr(df, 'data'):
             df_data = df.data
@@ -57,7 +55,7 @@ class TestCategoryCoverage(unittest.TestCase):
         self.assertTrue((df_data['count'] > 0).all(), "所有分類的數量應該大於 0")
         
         # 下載按鈕不應該出現
-        self.assertEqual(self.mock_st.mock_container.download_button_calls, 0, "不應該顯示下載按鈕")
+        self.assertEqual(self.sink.download_button_calls, 0, "不應該顯示下載按鈕")
     
     def test_check_category_coverage_incomplete(self):
         """測試缺失分類的資料"""
@@ -69,7 +67,7 @@ class TestCategoryCoverage(unittest.TestCase):
         self.assertEqual(missing_categories[0], "家具_椅子_辦公椅", "缺失的分類應該是辦公椅")
         
         # 檢查 dataframe 內容
-        df = self.mock_st.mock_container.dataframe_data
+        df = self.sink.dataframe_data
         # 如果是 Styler 對象，獲取內部的 DataFrame
         if hasattr(df, 'data'):
             df_data = df.data
@@ -83,8 +81,18 @@ class TestCategoryCoverage(unittest.TestCase):
         self.assertEqual(len(zero_count_rows), 1, "應該有一個分類的數量為 0")
         
         # 檢查下載按鈕
-        self.assertEqual(self.mock_st.mock_container.download_button_calls, 1, "應該顯示下載按鈕")
+        self.assertEqual(self.sink.download_button_calls, 1, "應該顯示下載按鈕")
         
+    def test_check_category_coverage_subcategory_level(self):
+        """測試品類層級的覆蓋檢查，結果依分類表順序排列"""
+        missing_categories = self.verifier.check_category_coverage(self.incomplete_data, level="subcategory")
+
+        self.assertEqual(missing_categories, ["家具_椅子"])
+        df_result = self.verifier.category_coverage_details['result']
+        self.assertEqual(df_result['category'].tolist(),
+                         self.classification['classification_subcategory'].tolist())
+        self.assertEqual(df_result['count'].tolist(), [1, 1, 1, 0])
+
     def test_styling_highlight_zero(self):
         """測試高亮顯示 0 筆數的功能"""
         # 製作一個簡單的 DataFrame 來測試樣式
@@ -112,15 +120,16 @@ class TestCategoryCoverage(unittest.TestCase):
         
         # 調用待測試的函數
         missing_categories = self.verifier.check_category_coverage(data_without_columns)
+        self.assertEqual(self.verifier.results['category_coverage'].missing_columns, ['category', 'subcategory', 'further_subcategory'])
         
         # 驗證結果：應該返回空列表（因為無法進行檢查）
         self.assertEqual(len(missing_categories), 0, "缺少欄位時應該返回空列表")
         
         # 驗證不應該調用 dataframe（因為沒有結果可以顯示）
-        self.assertEqual(self.mock_st.mock_container.dataframe_calls, 0, "缺少欄位時不應該調用 dataframe")
+        self.assertEqual(self.sink.dataframe_calls, 0, "缺少欄位時不應該調用 dataframe")
         
         # 驗證不應該顯示下載按鈕
-        self.assertEqual(self.mock_st.mock_container.download_button_calls, 0, "缺少欄位時不應該顯示下載按鈕")
+        self.assertEqual(self.sink.download_button_calls, 0, "缺少欄位時不應該顯示下載按鈕")
 
 
 if __name__ == '__main__':
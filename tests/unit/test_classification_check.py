@@ -0,0 +1,134 @@
+"""
+測試 classification_check 向量化分類比對的單元測試
+"""
+
+import unittest
+import sys
+import os
+
+# 將專案根目錄添加到 Python 路徑
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import concurrent.futures
+import pandas as pd
+from unittest import mock
+import verify.core
+from verify import Verify, prepare_classification, factorize_columns
+from tests.conftest import (
+    create_test_classification
+)
+
+class TestClassificationCheck(unittest.TestCase):
+
+    def setUp(self):
+        """
+        設置測試環境
+        """
+        self.classification = create_test_classification()
+        self.verifier = Verify(self.classification)
+        self.data = pd.DataFrame({
+            'id': [1, 2, 3, 4, 5, 6],
+            'category': ['電子產品', '電子產品', '家具', '家具', '家具', '電子產品'],
+            'subcategory': ['手機', '電腦', '桌子', '沙發', '椅子', '手機'],
+            'further_subcategory': ['智慧型手機', '平板', '辦公桌', None, '辦公椅', None],
+            'stats_type': ['further_subcategory', 'further_subcategory', 'further_subcategory',
+                           'subcategory', 'further_subcategory', 'subcategory']
+        })
+
+    def test_further_subcategory(self):
+        """測試子類層級：錯誤的組合會被找出，空值列不列入檢查"""
+        ids = self.verifier.classification_check(self.data, "further_subcategory")
+        self.assertEqual(ids, [2])
+
+    def test_subcategory(self):
+        """測試品類層級"""
+        ids = self.verifier.classification_check(self.data, "subcategory")
+        self.assertEqual(ids, [4])
+
+    def test_mixed(self):
+        """測試混合層級：依 stats_type 分開檢查，子類在前、品類在後"""
+        ids = self.verifier.classification_check(self.data, "mixed")
+        self.assertEqual(ids, [2, 4])
+
+    def test_reference_id_fallback(self):
+        """測試沒有 id 欄位時改用 reference_id"""
+        data = self.data.drop(columns = ['id']).assign(reference_id = [11, 12, 13, 14, 15, 16])
+        ids = self.verifier.classification_check(data, "further_subcategory")
+        self.assertEqual(ids, [12])
+
+    def test_empty_data(self):
+        """測試空資料不會因除以零而失敗"""
+        ids = self.verifier.classification_check(self.data.iloc[0:0], "further_subcategory")
+        self.assertEqual(ids, [])
+
+    def test_categorical_columns(self):
+        """測試 category 欄位（以整數代碼比對）的結果與文字欄位相同"""
+        data = self.data.astype({col: "category" for col in ['category', 'subcategory', 'further_subcategory', 'stats_type']})
+        for statstype in ["further_subcategory", "subcategory", "mixed"]:
+            self.assertEqual(
+                self.verifier.classification_check(data, statstype),
+                self.verifier.classification_check(self.data, statstype)
+            )
+
+    def test_factorize_columns(self):
+        """測試組別代碼：相同組合同一組、依出現順序編號，有空值的列為 -1"""
+        data = pd.DataFrame({
+            'a': pd.Categorical(['x', 'y', 'x', None, 'x']),
+            'b': ['1', '1', '1', '2', '2']
+        })
+        group_ids, first = factorize_columns(data, ['a', 'b'])
+        self.assertEqual(group_ids.tolist(), [0, 1, 0, -1, 2])
+        self.assertEqual(first.tolist(), [0, 1, 4])
+
+    def test_index_built_once(self):
+        """測試分類組合鍵索引只建立一次並重複使用"""
+        self.verifier.classification_check(self.data, "mixed")
+        index = self.verifier._classification_keys("further_subcategory")
+        self.verifier.classification_check(self.data, "further_subcategory")
+        self.assertIs(self.verifier._classification_keys("further_subcategory"), index)
+
+
+class TestPrepareClassification(unittest.TestCase):
+
+    def setUp(self):
+        self.raw = pd.DataFrame({
+            'category': ['電子產品', '家具', '家具'],
+            'subcategory': ['手機', '桌子', None],
+            'further_subcategory': ['智慧型手機', '辦公桌', '辦公椅']
+        })
+
+    def test_keys(self):
+        """測試組合鍵欄位，且不修改傳入的分類表"""
+        prepared = prepare_classification(self.raw)
+        self.assertEqual(prepared['classification_further_subcategory'].tolist()[:2],
+                         ['電子產品_手機_智慧型手機', '家具_桌子_辦公桌'])
+        self.assertEqual(prepared['classification_subcategory'].tolist()[:2],
+                         ['電子產品_手機', '家具_桌子'])
+        self.assertNotIn('classification_subcategory', self.raw.columns)
+
+    def test_nan_safe(self):
+        """測試分類欄位有空值時組合鍵為空值，而不是 'nan' 字串"""
+        prepared = prepare_classification(self.raw)
+        self.assertTrue(pd.isna(prepared['classification_further_subcategory'].iloc[2]))
+        self.assertTrue(pd.isna(prepared['classification_subcategory'].iloc[2]))
+
+    def test_cached_by_content(self):
+        """測試內容相同的分類表會重複使用快取的組合鍵"""
+        first = prepare_classification(self.raw)
+        with mock.patch('verify.core.join_class_columns', wraps = verify.core.join_class_columns) as join:
+            second = prepare_classification(self.raw.copy())
+        join.assert_not_called()
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_concurrent_calls(self):
+        """測試多個執行緒同時準備不同的分類表（超過快取數量而持續淘汰），結果與依序執行相同"""
+        tables = [self.raw.assign(category = self.raw['category'] + str(i)) for i in range(verify.core.PREPARED_CLASSIFICATION_CACHE_SIZE * 2)]
+        expected = [prepare_classification(table) for table in tables]
+        with concurrent.futures.ThreadPoolExecutor(max_workers = 8) as executor:
+            results = list(executor.map(prepare_classification, tables * 10))
+        for result, table in zip(results, expected * 10):
+            pd.testing.assert_frame_equal(result, table)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
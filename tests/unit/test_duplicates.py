@@ -0,0 +1,72 @@
+"""
+測試重複值檢測 (step3) 整數組合鍵與完整重複組的單元測試
+"""
+
+import unittest
+import sys
+import os
+
+# 將專案根目錄添加到 Python 路徑
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import numpy as np
+import pandas as pd
+from verify import Verify, DUPLICATE_KEYS, composite_keys, duplicate_groups
+from output import CollectingSink
+from readers import optimize_dtypes
+from tests.synthetic import make_classification, make_report
+from tests.conftest import (
+    create_test_classification
+)
+
+class TestDuplicateGroups(unittest.TestCase):
+
+    def setUp(self):
+        """設置測試環境"""
+        self.data = pd.DataFrame({
+            'id': [11, 12, 13, 14, 15, 16],
+            'source_product_id': ['a', 'b', 'a', None, 'b', None],
+            'extend_class': ['功能', '功能', '功能', '色彩', '色彩', '色彩'],
+            'extend_subclass': [None, None, None, 'x', None, 'x'],
+            'extend_detail': ['1', '2', '1', '3', '2', '3']
+        })
+
+    def test_groups(self):
+        """測試完整的重複組：依第一次出現的順序，組內維持列順序；空值視為相同的值"""
+        result = Verify(create_test_classification(), sink = CollectingSink()).duplicates_analysis(self.data, "products_extend")
+        self.assertEqual(result.duplicated_ids, [13, 16])
+        self.assertEqual(result.groups, [
+            {"first_id": 11, "ids": [11, 13], "size": 2},
+            {"first_id": 14, "ids": [14, 16], "size": 2}
+        ])
+
+    def test_same_as_dataframe_duplicated(self):
+        """測試與 DataFrame.duplicated 找出相同的重複列（文字欄位與 category 欄位）"""
+        classification = make_classification()
+        for chart_name in ["products", "products_extend"]:
+            data = make_report(chart_name, 5000, classification)
+            expected = data["id"][data.duplicated(subset = DUPLICATE_KEYS[chart_name])].tolist()
+            for report in [data, optimize_dtypes(data, chart_name)]:
+                result = Verify(classification, sink = CollectingSink()).duplicates_analysis(report, chart_name)
+                self.assertEqual(result.duplicated_ids, expected)
+                self.assertEqual(sum(group["size"] - 1 for group in result.groups), len(expected))
+
+    def test_keys_compressed_before_overflow(self):
+        """測試多個高基數欄位合併時不會溢位"""
+        rng = np.random.default_rng(0)
+        data = pd.DataFrame({f"c{i}": rng.integers(0, 10 ** 6, 3000) * 1000 for i in range(6)})
+        data = pd.concat([data, data.iloc[:100]], ignore_index = True)
+        keys, _ = composite_keys(data, list(data.columns))
+        duplicated_ids, groups = duplicate_groups(keys, pd.Series(range(len(data))))
+        self.assertEqual(duplicated_ids, list(range(3000, 3100)))
+        self.assertEqual(len(groups), 100)
+
+    def test_no_duplicates(self):
+        """測試沒有重複列與空資料"""
+        for data in [self.data.iloc[:2], self.data.iloc[:0]]:
+            keys, _ = composite_keys(data, DUPLICATE_KEYS["products_extend"])
+            self.assertEqual(duplicate_groups(keys, data["id"]), ([], []))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,66 @@
+"""
+測試擴充屬性檢測 (step4) 空值分析與小分類 x 擴充屬性矩陣的單元測試
+"""
+
+import unittest
+import sys
+import os
+
+# 將專案根目錄添加到 Python 路徑
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pandas as pd
+from verify import Verify
+from output import CollectingSink
+from streaming import StreamingVerifier
+from constants import Extend_class_schema
+from tests.conftest import (
+    create_test_classification
+)
+
+class TestExtendClass(unittest.TestCase):
+
+    def setUp(self):
+        """設置測試環境"""
+        self.classification = create_test_classification()
+        self.expected = Extend_class_schema["products_extend"]
+        self.data = pd.DataFrame({
+            'further_subcategory': ['智慧型手機', '智慧型手機', '智慧型手機', '辦公桌', None],
+            'extend_class': [self.expected[0], self.expected[0], self.expected[1], self.expected[0], self.expected[2]],
+            'extend_subclass': ['a', None, None, 'b', 'c'],
+            'extend_unit': [None, None, 'cm', 'cm', None]
+        })
+
+    def check(self, data):
+        return Verify(self.classification, sink = CollectingSink()).check_extend_class(data, "products_extend")
+
+    def test_null_counts(self):
+        """測試依 extend_class 分組的空值數與列數"""
+        result = self.check(self.data)
+        self.assertEqual(result.null_counts[self.expected[0]], {"extend_subclass": 1, "extend_unit": 2, "rows": 3})
+        self.assertEqual(result.present, self.expected[:3])
+
+    def test_presence_matrix(self):
+        """測試小分類 x 擴充屬性的列數矩陣：包含規範中所有擴充屬性，沒有出現的為 0，小分類為空值的列不計入"""
+        result = self.check(self.data)
+        self.assertEqual(set(result.presence), {'智慧型手機', '辦公桌'})
+        self.assertEqual(list(result.presence['辦公桌']), self.expected)
+        self.assertEqual(result.presence['智慧型手機'][self.expected[0]], 2)
+        self.assertEqual(result.presence['智慧型手機'][self.expected[1]], 1)
+        self.assertEqual(result.presence['辦公桌'][self.expected[1]], 0)
+        self.assertEqual(result.presence_frame().loc['辦公桌', self.expected[0]], 1)
+
+    def test_without_further_subcategory(self):
+        """測試沒有 further_subcategory 欄位時不產生矩陣"""
+        self.assertIsNone(self.check(self.data.drop(columns = ['further_subcategory'])).presence)
+
+    def test_streaming_same_as_in_memory(self):
+        """測試分段累計的結果與一次計算相同"""
+        stream = StreamingVerifier(Verify(self.classification, sink = CollectingSink()), "products_extend", steps = ["step4"], coverage_level = None)
+        for start in range(0, len(self.data), 2):
+            stream.update(self.data.iloc[start:start + 2])
+        self.assertEqual(stream.finish()["step4"], self.check(self.data))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
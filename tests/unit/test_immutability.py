@@ -0,0 +1,54 @@
+"""
+測試各檢查不修改傳入的資料（不新增欄位、不轉換型別）的單元測試
+"""
+
+import unittest
+import sys
+import os
+
+# 將專案根目錄添加到 Python 路徑
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pandas as pd
+from verify import Verify
+from output import NullSink
+from readers import optimize_dtypes
+from streaming import StreamingVerifier
+from constants import charts
+from tests.synthetic import make_classification, make_report, chart_names
+
+class TestChecksDoNotMutateInput(unittest.TestCase):
+
+    def setUp(self):
+        """設置測試環境"""
+        self.classification = make_classification()
+
+    def reports(self, chart_name):
+        """原始的文字欄位，以及讀檔時縮減型別後的 category 欄位"""
+        data = make_report(chart_name, 300, self.classification)
+        return [data, optimize_dtypes(data, chart_name)]
+
+    def test_check_methods(self):
+        """測試每種報表的 check_* 與分類覆蓋率檢查執行後，資料與執行前完全相同"""
+        for chart_name in chart_names():
+            for data in self.reports(chart_name):
+                with self.subTest(chart_name = chart_name, dtypes = "category" if isinstance(data["category"].dtype, pd.CategoricalDtype) else "text"):
+                    snapshot = data.copy()
+                    verifier = Verify(self.classification, sink = NullSink())
+                    verifier.check_category_coverage(data)
+                    getattr(verifier, f"check_{chart_name}")(data)
+                    pd.testing.assert_frame_equal(data, snapshot)
+
+    def test_streaming_update(self):
+        """測試串流驗證逐段累計時也不修改每段資料"""
+        for chart_name in charts:
+            data = make_report(chart_name, 300, self.classification)
+            snapshot = data.copy()
+            stream = StreamingVerifier(Verify(self.classification, sink = NullSink()), chart_name)
+            stream.update(data)
+            stream.finish()
+            pd.testing.assert_frame_equal(data, snapshot)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
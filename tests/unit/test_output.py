@@ -0,0 +1,93 @@
+"""
+測試輸出管道 (sink) 的單元測試
+"""
+
+import unittest
+import sys
+import os
+
+# 將專案根目錄添加到 Python 路徑
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from output import BufferedSink, InstantSink, AnimatedSink, NullSink, make_sink, replay_records
+from verify import Verify
+from tests.conftest import (
+    create_test_classification,
+    create_incomplete_data
+)
+
+class RecordingSink:
+    """記錄所有輸出呼叫的 sink"""
+    def __init__(self):
+        self.calls = []
+        self.flushed = 0
+
+    def write(self, text, time_interval = None):
+        self.calls.append(("write", text))
+
+    def dataframe(self, data):
+        self.calls.append(("dataframe", data))
+
+    def divider(self):
+        self.calls.append(("divider",))
+
+    def caption(self, text):
+        self.calls.append(("caption", text))
+
+    def download_button(self, label, data, file_name, mime):
+        self.calls.append(("download_button", file_name))
+
+    def flush(self):
+        self.flushed += 1
+
+class TestOutputSink(unittest.TestCase):
+
+    def test_make_sink(self):
+        """測試依模式建立 sink"""
+        self.assertIsInstance(make_sink("instant"), InstantSink)
+        self.assertIsInstance(make_sink("buffered"), BufferedSink)
+        self.assertIsInstance(make_sink("animated"), AnimatedSink)
+        with self.assertRaises(ValueError):
+            make_sink("unknown")
+
+    def test_buffered_sink_defers_output(self):
+        """測試 buffered sink 在 flush 前不輸出，flush 後依序輸出"""
+        target = RecordingSink()
+        sink = BufferedSink(target)
+        verifier = Verify(create_test_classification(), sink = sink)
+        verifier.check_category_coverage(create_incomplete_data())
+
+        self.assertEqual(target.calls, [])
+        self.assertGreater(len(sink.records), 0)
+
+        sink.flush()
+        methods = [call[0] for call in target.calls]
+        self.assertEqual(methods[0], "divider")
+        self.assertIn("dataframe", methods)
+        self.assertEqual(methods[-1], "download_button")
+        self.assertEqual(target.flushed, 1)
+        self.assertEqual(sink.records, [])
+
+    def test_replay_records(self):
+        """測試暫存的輸出可以重複播放（快取的驗證結果），且播放不會清空 records"""
+        sink = BufferedSink(RecordingSink())
+        verifier = Verify(create_test_classification(), sink = sink)
+        verifier.check_category_coverage(create_incomplete_data())
+
+        first, second = RecordingSink(), RecordingSink()
+        replay_records(sink.records, first)
+        replay_records(sink.records, second)
+        self.assertGreater(len(first.calls), 0)
+        self.assertEqual(first.calls, second.calls)
+        self.assertEqual(len(sink.records), len(first.calls))
+
+    def test_default_sink_is_null(self):
+        """測試預設 sink 不輸出，檢查結果保存在 Verify.results"""
+        verifier = Verify(create_test_classification())
+        self.assertIsInstance(verifier.sink, NullSink)
+        missing = verifier.check_category_coverage(create_incomplete_data())
+        self.assertEqual(verifier.results['category_coverage'].missing, missing)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
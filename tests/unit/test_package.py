@@ -0,0 +1,60 @@
+"""
+測試 verify 套件的延遲載入與批次模式入口的單元測試
+"""
+
+import unittest
+import subprocess
+import sys
+import os
+
+# 將專案根目錄添加到 Python 路徑
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, ROOT)
+
+import verify
+import verify.core
+
+def run_python(*args):
+    """在專案根目錄以新的直譯器執行，避免受到測試程序已載入的模組影響"""
+    return subprocess.run([sys.executable, *args], cwd = ROOT, capture_output = True, text = True)
+
+class TestPackage(unittest.TestCase):
+
+    def test_import_is_lazy(self):
+        """測試只匯入套件時不會載入 verify.core、pandas 與 streamlit"""
+        result = run_python("-c", (
+            "import sys, verify; "
+            "print(sorted(name for name in ['verify.core', 'pandas', 'streamlit'] if name in sys.modules))"
+        ))
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), "[]")
+
+    def test_attributes_from_core(self):
+        """測試套件的名稱都來自 verify.core"""
+        self.assertIs(verify.Verify, verify.core.Verify)
+        self.assertIs(verify.prepare_classification, verify.core.prepare_classification)
+        self.assertIn("Verify", dir(verify))
+        with self.assertRaises(AttributeError):
+            verify.not_a_name
+
+    def test_library_mode(self):
+        """測試在沒有 streamlit 的程序中以預設的 sink 驗證報表，不會匯入 streamlit"""
+        result = run_python("-c", (
+            "import sys, pandas as pd; from verify import Verify, prepare_classification; "
+            "classification = prepare_classification(pd.DataFrame({'category': ['A'], 'subcategory': ['B'], 'further_subcategory': ['C']})); "
+            "verifier = Verify(classification); "
+            "verifier.check_category_coverage(pd.DataFrame({'category': ['A'], 'subcategory': ['B'], 'further_subcategory': ['C']})); "
+            "print('streamlit' in sys.modules)"
+        ))
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), "False")
+
+    def test_main_module(self):
+        """測試 python -m verify 為批次模式的入口"""
+        result = run_python("-m", "verify", "--help")
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("python -m verify", result.stdout)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,98 @@
+"""
+測試效能紀錄 (profiling.Profile) 的單元測試
+"""
+
+import unittest
+import sys
+import os
+import tracemalloc
+
+# 將專案根目錄添加到 Python 路徑
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pandas as pd
+from profiling import Profile
+from verify import Verify, STEP_LABELS, COVERAGE_LABEL
+from output import NullSink
+from constants import charts
+from tests.conftest import (
+    create_test_classification
+)
+
+class TestProfile(unittest.TestCase):
+
+    def test_accumulates_by_name(self):
+        """測試同一個名稱重複量測時累計時間與次數"""
+        profile = Profile()
+        for _ in range(3):
+            with profile.measure("step"):
+                sum(range(1000))
+        timing = profile.timings["step"]
+        self.assertEqual(timing.calls, 3)
+        self.assertGreater(timing.wall, 0)
+        self.assertIsNone(timing.peak_bytes)
+
+    def test_peak_memory(self):
+        """測試記憶體峰值：巢狀量測時外層的峰值包含內層配置的記憶體，結束後停止 tracemalloc"""
+        profile = Profile(trace_memory = True)
+        with profile.measure("outer"):
+            with profile.measure("inner"):
+                data = bytearray(8 * 2 ** 20)
+                del data
+        self.assertGreaterEqual(profile.timings["inner"].peak_bytes, 8 * 2 ** 20)
+        self.assertGreaterEqual(profile.timings["outer"].peak_bytes, profile.timings["inner"].peak_bytes)
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_measure_records_on_error(self):
+        """測試步驟拋出例外時仍記錄量測結果"""
+        profile = Profile(trace_memory = True)
+        with self.assertRaises(ValueError):
+            with profile.measure("step"):
+                raise ValueError()
+        self.assertEqual(profile.timings["step"].calls, 1)
+        self.assertFalse(tracemalloc.is_tracing())
+
+
+class TestVerifyProfile(unittest.TestCase):
+
+    def setUp(self):
+        """設置測試環境"""
+        self.data = pd.DataFrame({
+            'id': [1, 2],
+            'source_product_id': ['a', 'a'],
+            'category': ['電子產品', '家具'],
+            'subcategory': ['手機', '桌子'],
+            'further_subcategory': ['智慧型手機', '辦公桌']
+        })
+
+    def test_steps_recorded(self):
+        """測試分類覆蓋率與每個步驟都有量測結果，並包含在驗證報告中"""
+        verifier = Verify(create_test_classification(), sink = NullSink())
+        verifier.check_category_coverage(self.data)
+        verifier.run_plan(self.data, "products")
+
+        expected = [COVERAGE_LABEL] + [STEP_LABELS[step] for step in charts["products"]]
+        self.assertEqual(list(verifier.profile.timings), expected)
+        report = verifier.generate_verification_report()
+        self.assertEqual([timing['name'] for timing in report['profile']], expected)
+
+    def test_to_frame(self):
+        """測試顯示用的表格"""
+        profile = Profile(trace_memory = True)
+        with profile.measure("load_report"):
+            pass
+        frame = profile.to_frame()
+        self.assertEqual(frame["步驟"].tolist(), ["load_report"])
+        self.assertEqual(frame["次數"].tolist(), [1])
+        self.assertIn("記憶體峰值 (MB)", frame.columns)
+
+    def test_to_frame_without_memory(self):
+        """測試沒有追蹤記憶體時，表格不包含記憶體峰值欄位"""
+        profile = Profile()
+        with profile.measure("load_report"):
+            pass
+        self.assertNotIn("記憶體峰值 (MB)", profile.to_frame().columns)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,82 @@
+"""
+測試名次驗證 (rank_verifier / check_rank_column) 的單元測試
+"""
+
+import unittest
+import sys
+import os
+
+# 將專案根目錄添加到 Python 路徑
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import numpy as np
+import pandas as pd
+from unittest import mock
+import constants
+from verify import Verify, check_rank_column
+from output import CollectingSink
+from presenter import present
+from tests.conftest import (
+    CountingSink,
+    create_test_classification
+)
+
+class TestRankVerifier(unittest.TestCase):
+
+    def setUp(self):
+        """設置測試環境"""
+        self.sink = CountingSink()
+        self.verifier = Verify(create_test_classification(), sink = self.sink)
+        self.data = pd.DataFrame({
+            'id': [10, 11, 12, 13, 14, 15],
+            'brand_rank': [1, 2.0, 999, 6, np.nan, 3.5]
+        })
+
+    def test_values_formatted(self):
+        """測試名次值域只格式化 distinct 值，整數值的浮點數去掉小數點"""
+        result = check_rank_column(self.data, 'brand_rank', 5)
+        self.assertEqual(result['values'], ['1', '2', '3.5', '6', '999', 'nan'])
+        self.assertEqual(result['expected'], [1, 2, 3, 4, 5, 999])
+
+    def test_invalid_rows(self):
+        """測試找出不在規範內的名次，空值另外計數"""
+        result = check_rank_column(self.data, 'brand_rank', 5)
+        self.assertEqual(result['invalid_count'], 2)
+        self.assertEqual(result['invalid_values'], ['3.5', '6'])
+        self.assertEqual(result['invalid_ids'], [13, 15])
+        self.assertEqual(result['null_count'], 1)
+
+    def test_non_numeric_values(self):
+        """測試非數值的名次會被視為違規"""
+        data = pd.DataFrame({'id': [1, 2], 'brand_rank': ['1', 'x']})
+        result = check_rank_column(data, 'brand_rank', 5)
+        self.assertEqual(result['invalid_ids'], [2])
+
+    def test_rank_verifier_schema(self):
+        """測試 rank_verifier 依 Rank_col_schema 檢查所有名次欄位並提供下載"""
+        results = self.verifier.rank_verifier(self.data, "chart_brands_extend_cross")
+        self.assertEqual(list(results.columns.keys()), ["brand"])
+        self.assertEqual(results.columns["brand"]["invalid_ids"], [13, 15])
+        self.assertEqual(self.sink.download_button_calls, 1)
+
+    def test_rank_key_without_label(self):
+        """測試 rules.json 新增沒有專屬標題的名次種類時，仍會檢查並以欄位名稱輸出"""
+        data = self.data.assign(sales_rank = [1, 2, 3, 4, 5, 6])
+        schema = {**constants.Rank_col_schema['chart_brands'], 'sales': ('sales_rank', 5)}
+        with mock.patch.dict(constants.Rank_col_schema, {'chart_brands': schema}):
+            results = self.verifier.rank_verifier(data, 'chart_brands')
+            sink = CollectingSink()
+            present(results, sink)
+        self.assertEqual(list(results.columns), ['brand', 'sales'])
+        self.assertEqual(results.columns['sales']['invalid_ids'], [15])
+        self.assertIn('🔔 sales_rank 排名', sink.messages)
+
+    def test_missing_rank_column(self):
+        """測試缺少名次欄位時略過而不是拋出例外"""
+        results = self.verifier.rank_verifier(self.data, "chart_trends")
+        self.assertEqual(results.columns, {})
+        self.assertEqual(results.missing_columns, ["element_name_rank", "element_name_rank_ordinal", "labels_rank"])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
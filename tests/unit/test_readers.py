@@ -0,0 +1,285 @@
+"""
+測試讀取模組（Parquet / Arrow 欄位裁剪）的單元測試
+"""
+
+import unittest
+import sys
+import os
+import io
+import shutil
+import tempfile
+import concurrent.futures
+import dataclasses
+
+# 將專案根目錄添加到 Python 路徑
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pandas as pd
+import pyarrow.feather as feather
+from unittest import mock
+import readers
+from verify import Verify
+from output import CollectingSink
+import numpy as np
+from readers import read_table, read_classification, report_columns, sniff_format, file_digest, optimize_dtypes
+import constants
+from constants import Config, Rank_col_schema
+from tests.conftest import (
+    create_test_classification
+)
+
+class TestReportColumns(unittest.TestCase):
+
+    def test_schema_columns(self):
+        """測試需要的欄位包含 Config、名次欄位與步驟額外讀取的欄位"""
+        columns = report_columns("chart_brands_extend_image")
+        for col in Config["chart_brands_extend_image"]:
+            self.assertIn(col, columns)
+        self.assertIn(Rank_col_schema["chart_brands_extend_image"]["brand"][0], columns)
+        # step7 讀取 extend_stats，但 Config 中沒有
+        self.assertIn("extend_stats", columns)
+        self.assertEqual(len(columns), len(set(columns)))
+
+    def test_products_id(self):
+        """測試 products 的重複列檢查需要 id 欄位"""
+        self.assertIn("id", report_columns("products"))
+
+    def test_columns_from_rules(self):
+        """測試規範中的重複值組合鍵與分析空值的欄位都會讀取（rules.json 新增欄位時不需要修改程式）"""
+        products = dataclasses.replace(constants.Chart_rules["products"], duplicate_keys = ["source_product_id", "sku"])
+        with mock.patch.dict(constants.Chart_rules, {"products": products}):
+            self.assertIn("sku", report_columns("products"))
+        self.assertIn("extend_unit", report_columns("products_extend"))
+        self.assertNotIn("extend_unit", report_columns("chart_brands_comment_counts"))
+
+    def test_columns_of_disabled_chart(self):
+        """測試停用的報表種類（不在 charts 中）也會讀取步驟清單需要的欄位"""
+        self.assertNotIn("chart_brands_comment_score", constants.charts)
+        columns = report_columns("chart_brands_comment_score")
+        self.assertIn("reference_id", columns)
+        self.assertIn("is_brand", columns)
+
+
+class TestColumnarReaders(unittest.TestCase):
+
+    def setUp(self):
+        """
+        設置測試環境
+        """
+        self.classification = create_test_classification()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.data = pd.DataFrame({
+            'id': [1, 2, 3, 4],
+            'category': ['電子產品', '電子產品', '家具', '家具'],
+            'subcategory': ['手機', '電腦', '桌子', '沙發'],
+            'further_subcategory': ['智慧型手機', '平板', '辦公桌', None],
+            'stats_type': ['further_subcategory', 'further_subcategory', 'further_subcategory', 'subcategory'],
+            'brand': ['A', None, 'B', 'C'],
+            'brand_rank': [1, 2, 11, 999],
+            'unused_text': ['x', 'y', 'z', 'w'],
+            'unused_number': [1.0, 2.0, 3.0, 4.0]
+        })
+        self.paths = {
+            "csv": os.path.join(self.tmp_dir, "chart_brands.csv"),
+            "parquet": os.path.join(self.tmp_dir, "chart_brands.parquet"),
+            "arrow": os.path.join(self.tmp_dir, "chart_brands.arrow")
+        }
+        self.data.to_csv(self.paths["csv"], index = False)
+        self.data.to_parquet(self.paths["parquet"])
+        feather.write_feather(self.data, self.paths["arrow"])
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_column_pruning(self):
+        """測試欄式格式只載入報表需要且存在的欄位"""
+        for fmt in ["parquet", "arrow"]:
+            data = read_table(self.paths[fmt], chart_name = "chart_brands")
+            self.assertNotIn("unused_text", data.columns)
+            self.assertNotIn("unused_number", data.columns)
+            self.assertIn("brand_rank", data.columns)
+            self.assertEqual(len(data), 4)
+
+    def test_read_all_columns_without_chart(self):
+        """測試沒有指定報表種類時讀取全部欄位（例如分類表）"""
+        data = read_table(self.paths["parquet"])
+        self.assertEqual(list(data.columns), list(self.data.columns))
+
+    def test_arrow_string_dtype(self):
+        """測試字串欄位使用以 Arrow 儲存的 string dtype"""
+        for fmt in ["parquet", "arrow"]:
+            data = read_table(self.paths[fmt], chart_name = "chart_brands")
+            self.assertEqual(data["brand"].dtype, pd.StringDtype("pyarrow"))
+            self.assertTrue(pd.isna(data["brand"].iloc[1]))
+
+    def test_file_like_upload(self):
+        """測試以上傳的檔案物件讀取"""
+        for fmt in ["parquet", "arrow"]:
+            with open(self.paths[fmt], "rb") as f:
+                upload = io.BytesIO(f.read())
+            data = read_table(upload, chart_name = "chart_brands")
+            pd.testing.assert_frame_equal(data, read_table(self.paths[fmt], chart_name = "chart_brands"))
+
+    def test_same_result_as_csv(self):
+        """測試欄式格式的驗證結果與 csv 相同"""
+        outputs = {}
+        for fmt, path in self.paths.items():
+            sink = CollectingSink()
+            verifier = Verify(self.classification, sink = sink)
+            data = read_table(path, chart_name = "chart_brands")
+            verifier.check_category_coverage(data)
+            results = verifier.run_plan(data, "chart_brands")
+            outputs[fmt] = (sink.messages, sink.tables, results)
+        self.assertEqual(outputs["parquet"], outputs["csv"])
+        self.assertEqual(outputs["arrow"], outputs["csv"])
+
+
+class TestOptimizeDtypes(unittest.TestCase):
+
+    def setUp(self):
+        """設置測試環境"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.data = pd.DataFrame({
+            'id': [1, 2, 3, 4],
+            'category': ['電子產品', '電子產品', '家具', None],
+            'subcategory': ['手機', '電腦', '桌子', '沙發'],
+            'further_subcategory': ['智慧型手機', '平板', '辦公桌', None],
+            'stats_type': ['further_subcategory'] * 4,
+            'brand': ['A', 'B', 'C', 'D'],
+            'brand_rank': [1, 2, 11, 999],
+            'extend_detail_rank': [1.0, None, 3.0, 999.0],
+            'extend_detail_rank_ordinal': [1.5, 2.0, None, 3.0]
+        })
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_categorical_columns(self):
+        """測試低基數的文字欄位轉為 category，其他文字欄位維持原樣"""
+        data = optimize_dtypes(self.data, "chart_brands_extend")
+        for col in ['category', 'subcategory', 'further_subcategory', 'stats_type']:
+            self.assertIsInstance(data[col].dtype, pd.CategoricalDtype)
+        self.assertNotIsInstance(data['brand'].dtype, pd.CategoricalDtype)
+        self.assertTrue(pd.isna(data['category'].iloc[3]))
+        # 不修改傳入的資料
+        self.assertNotIsInstance(self.data['category'].dtype, pd.CategoricalDtype)
+
+    def test_rank_columns(self):
+        """測試名次欄位：整數縮減為較小的整數型別，有空值的整數值改為 float32，非整數值維持原樣"""
+        data = optimize_dtypes(self.data, "chart_brands_extend")
+        self.assertEqual(data['brand_rank'].dtype, np.int16)
+        self.assertEqual(data['extend_detail_rank'].dtype, np.float32)
+        self.assertEqual(data['extend_detail_rank_ordinal'].dtype, np.float64)
+        self.assertEqual(data['brand_rank'].tolist(), [1, 2, 11, 999])
+
+    def test_read_table(self):
+        """測試讀取報表時縮減欄位型別，csv 與 Parquet 的結果相同；讀取分類表時不轉換"""
+        csv_path = os.path.join(self.tmp_dir, "chart_brands.csv")
+        parquet_path = os.path.join(self.tmp_dir, "chart_brands.parquet")
+        self.data.to_csv(csv_path, index = False)
+        self.data.to_parquet(parquet_path)
+        for path in [csv_path, parquet_path]:
+            data = read_table(path, chart_name = "chart_brands")
+            self.assertIsInstance(data['category'].dtype, pd.CategoricalDtype)
+            self.assertEqual(data['brand_rank'].dtype, np.int16)
+        self.assertNotIsInstance(read_table(csv_path)['category'].dtype, pd.CategoricalDtype)
+
+    def test_same_result_as_object_columns(self):
+        """測試 category 欄位的驗證結果與原本的文字欄位相同"""
+        classification = create_test_classification()
+        outputs = []
+        for data in [self.data, optimize_dtypes(self.data, "chart_brands")]:
+            sink = CollectingSink()
+            verifier = Verify(classification, sink = sink)
+            verifier.check_category_coverage(data)
+            verifier.run_plan(data, "chart_brands")
+            outputs.append((sink.messages, sink.tables, {name: result.to_dict() | {"seconds": None} for name, result in verifier.results.items()}))
+        self.assertEqual(outputs[0], outputs[1])
+
+
+class TestFormatSniffing(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.data = pd.DataFrame({
+            'category': ['電子產品', '家具'],
+            'subcategory': ['手機', '桌子'],
+            'further_subcategory': ['智慧型手機', '辦公桌']
+        })
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _write(self, name, writer):
+        path = os.path.join(self.tmp_dir, name)
+        writer(path)
+        return path
+
+    def _to_excel(self, path):
+        # 以檔案物件寫入，副檔名不是 xlsx 也能寫出 Excel 檔
+        with open(path, "wb") as f:
+            self.data.to_excel(f, index = False, engine = "openpyxl")
+
+    def test_magic_bytes(self):
+        """測試以檔案內容判斷格式，不依賴副檔名"""
+        paths = {
+            "csv": self._write("a.xlsx", lambda path: self.data.to_csv(path, index = False)),
+            "excel": self._write("b.csv", self._to_excel),
+            "parquet": self._write("c.csv", lambda path: self.data.to_parquet(path)),
+            "arrow": self._write("d", lambda path: feather.write_feather(self.data, path))
+        }
+        for file_format, path in paths.items():
+            self.assertEqual(sniff_format(path), file_format)
+            pd.testing.assert_frame_equal(read_table(path), self.data, check_dtype = False)
+
+    def test_sniff_keeps_position(self):
+        """測試判斷上傳檔案的格式後，檔案物件回到原本的位置"""
+        upload = io.BytesIO(self.data.to_csv(index = False).encode("utf-8"))
+        self.assertEqual(sniff_format(upload), "csv")
+        self.assertEqual(upload.tell(), 0)
+
+    def test_reads_consumed_upload_from_start(self):
+        """測試已被讀取過的上傳檔案會從頭重新讀取"""
+        upload = io.BytesIO(self.data.to_csv(index = False).encode("utf-8"))
+        read_table(upload)
+        pd.testing.assert_frame_equal(read_table(upload), self.data, check_dtype = False)
+
+    def test_file_digest(self):
+        """測試檔案路徑與檔案物件的內容雜湊值相同，且不改變檔案物件的位置"""
+        path = self._write("a.csv", lambda path: self.data.to_csv(path, index = False))
+        with open(path, "rb") as f:
+            upload = io.BytesIO(f.read())
+        upload.seek(3)
+        self.assertEqual(file_digest(upload), file_digest(path))
+        self.assertEqual(upload.tell(), 3)
+
+    def test_classification_cached_by_content(self):
+        """測試內容相同的分類表只解析一次，且回傳的是副本"""
+        path = self._write("classification.xlsx", lambda path: self.data.to_excel(path, index = False))
+        with open(path, "rb") as f:
+            content = f.read()
+
+        first = read_classification(io.BytesIO(content))
+        first.loc[0, 'category'] = '已修改'
+        with mock.patch('readers.read_table', wraps = readers.read_table) as read:
+            second = read_classification(io.BytesIO(content))
+            third = read_classification(path)
+        read.assert_not_called()
+        pd.testing.assert_frame_equal(second, self.data, check_dtype = False)
+        pd.testing.assert_frame_equal(third, second)
+
+    def test_classification_cache_concurrent(self):
+        """測試多個執行緒同時讀取不同的分類表（超過快取數量而持續淘汰），結果與依序讀取相同"""
+        contents = [
+            self.data.assign(category = self.data['category'] + str(i)).to_csv(index = False).encode('utf-8')
+            for i in range(readers.CLASSIFICATION_CACHE_SIZE * 2)
+        ]
+        expected = [read_classification(io.BytesIO(content)) for content in contents]
+        with concurrent.futures.ThreadPoolExecutor(max_workers = 8) as executor:
+            results = list(executor.map(lambda content: read_classification(io.BytesIO(content)), contents * 10))
+        for result, table in zip(results, expected * 10):
+            pd.testing.assert_frame_equal(result, table)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,100 @@
+"""
+測試驗證結果的磁碟快取 (result_cache.py) 的單元測試
+"""
+
+import unittest
+import dataclasses
+import sys
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+# 將專案根目錄添加到 Python 路徑
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import constants
+from result_cache import ResultCache, schema_fingerprint
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        """設置測試環境"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'results.sqlite')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_round_trip(self):
+        """測試存入的結果可以讀回，並在重新開啟後仍然存在"""
+        result = {'chart_name': 'products', 'rows': 3, 'duplicated_ids': [2], 'messages': ['✅ 沒有缺失重要欄位']}
+        with ResultCache(self.path) as cache:
+            key = cache.key('report', 'classification', 'products')
+            self.assertIsNone(cache.get(key))
+            cache.put(key, result)
+        with ResultCache(self.path) as cache:
+            self.assertEqual(cache.get(key), result)
+
+    def test_key(self):
+        """測試報表、分類表、報表種類任一不同時快取鍵不同"""
+        with ResultCache(self.path) as cache:
+            keys = {
+                cache.key('report', 'classification', 'products'),
+                cache.key('other', 'classification', 'products'),
+                cache.key('report', 'other', 'products'),
+                cache.key('report', 'classification', 'products_extend')
+            }
+        self.assertEqual(len(keys), 4)
+
+    def test_schema_change_invalidates(self):
+        """測試修改 rules.json 的規範後，舊的結果不再使用"""
+        with ResultCache(self.path) as cache:
+            key = cache.key('report', 'classification', 'products')
+            cache.put(key, {'rows': 1})
+        fingerprint = schema_fingerprint()
+        products = dataclasses.replace(constants.Chart_rules['products'], duplicate_keys = ['source_product_id', 'domain'])
+        with mock.patch.dict(constants.Chart_rules, {'products': products}):
+            self.assertNotEqual(schema_fingerprint(), fingerprint)
+            with ResultCache(self.path) as cache:
+                self.assertIsNone(cache.get(cache.key('report', 'classification', 'products')))
+        self.assertEqual(schema_fingerprint(), fingerprint)
+
+    def test_lru_eviction(self):
+        """測試總大小超過上限時淘汰最久沒有使用的結果"""
+        # 不易壓縮的內容，讓每筆結果的大小接近
+        value = {'data': os.urandom(2000).hex()}
+        with ResultCache(self.path) as cache:
+            cache.put('a', value)
+            size = cache.total_bytes()
+            cache.max_bytes = size * 2 + size // 2
+            cache.put('b', value)
+            with mock.patch('result_cache.time.time', return_value = 2 ** 40):
+                # 使用 a 之後，最久沒有使用的是 b
+                self.assertIsNotNone(cache.get('a'))
+            with mock.patch('result_cache.time.time', return_value = 2 ** 41):
+                cache.put('c', value)
+            self.assertEqual(len(cache), 2)
+            self.assertIsNone(cache.get('b'))
+            self.assertIsNotNone(cache.get('a'))
+            self.assertIsNotNone(cache.get('c'))
+            self.assertLessEqual(cache.total_bytes(), cache.max_bytes)
+
+    def test_oversized_result_skipped(self):
+        """測試單筆超過上限的結果不會存入，也不會淘汰其他結果"""
+        with ResultCache(self.path, max_bytes = 200) as cache:
+            cache.put('small', {'rows': 1})
+            cache.put('large', {'data': os.urandom(1000).hex()})
+            self.assertIsNone(cache.get('large'))
+            self.assertEqual(cache.get('small'), {'rows': 1})
+
+    def test_clear(self):
+        """測試清除所有結果"""
+        with ResultCache(self.path) as cache:
+            cache.put('a', {'rows': 1})
+            cache.clear()
+            self.assertEqual(len(cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
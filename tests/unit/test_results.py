@@ -0,0 +1,91 @@
+"""
+測試結構化檢查結果 (results.py) 與呈現層 (presenter.py) 的單元測試
+"""
+
+import unittest
+import sys
+import os
+import json
+
+# 將專案根目錄添加到 Python 路徑
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pandas as pd
+from verify import Verify
+from output import CollectingSink, NullSink
+from presenter import present
+from results import DuplicateResult, ClassificationStepResult
+from tests.conftest import (
+    create_test_classification
+)
+
+class TestCheckResults(unittest.TestCase):
+
+    def setUp(self):
+        """
+        設置測試環境
+        """
+        self.classification = create_test_classification()
+        self.data = pd.DataFrame({
+            'id': [1, 2, 3, 4],
+            'source_product_id': ['a', 'a', 'b', 'c'],
+            'extend_class': ['功能', '功能', '風格', None],
+            'extend_subclass': ['x', 'x', None, 'z'],
+            'extend_detail': ['d', 'd', 'e', 'f'],
+            'extend_unit': [None, None, 'cm', None],
+            'category': ['電子產品', '電子產品', '家具', '家具'],
+            'subcategory': ['手機', '手機', '桌子', '沙發'],
+            'further_subcategory': ['智慧型手機', '智慧型手機', '辦公桌', '沙發']
+        })
+
+    def test_checks_return_records(self):
+        """測試每個步驟回傳結果物件，並記錄在 Verify.results"""
+        verifier = Verify(self.classification, sink = NullSink())
+        results = verifier.run_plan(self.data, "products_extend")
+
+        self.assertIsInstance(results["step3"], DuplicateResult)
+        self.assertEqual(results["step3"].duplicated_ids, [2])
+        self.assertIsInstance(results["step5"], ClassificationStepResult)
+        self.assertEqual(results["step5"].incorrect_ids, [4])
+        self.assertEqual(results["step4"].null_counts["功能"], {"extend_subclass": 0, "extend_unit": 2, "rows": 2})
+        self.assertEqual(set(verifier.results), {result.name for result in results.values()})
+        for result in results.values():
+            self.assertGreaterEqual(result.seconds, 0)
+
+    def test_to_dict_json_safe(self):
+        """測試所有結果都可以轉為 JSON"""
+        verifier = Verify(self.classification, sink = NullSink())
+        verifier.check_category_coverage(self.data)
+        verifier.run_plan(self.data, "products_extend")
+        for name, result in verifier.results.items():
+            as_dict = json.loads(json.dumps(result.to_dict(), ensure_ascii = False))
+            self.assertEqual(as_dict["check"], name)
+            self.assertIn("seconds", as_dict)
+
+    def test_present_matches_direct_output(self):
+        """測試保存的結果交給 present 重新輸出時，與檢查時直接輸出的內容相同"""
+        direct = CollectingSink()
+        verifier = Verify(self.classification, sink = direct)
+        verifier.check_category_coverage(self.data)
+        verifier.run_plan(self.data, "products_extend")
+
+        replayed = CollectingSink()
+        for result in verifier.results.values():
+            present(result, replayed)
+        self.assertEqual(replayed.messages, direct.messages)
+        self.assertEqual(replayed.tables, direct.tables)
+
+    def test_verification_report_includes_checks(self):
+        """測試 generate_verification_report 直接使用保存的檢查結果"""
+        verifier = Verify(self.classification, sink = NullSink())
+        verifier.run_plan(self.data, "products")
+        report = verifier.generate_verification_report()
+        self.assertEqual(report['checks']['duplicates']['duplicated_ids'], [2])
+
+    def test_seconds_not_compared(self):
+        """測試比較結果時不比較計算時間"""
+        self.assertEqual(DuplicateResult("products", [1], seconds = 1.0), DuplicateResult("products", [1], seconds = 2.0))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,91 @@
+"""
+測試驗證規範 (rules.json / rules.py) 的單元測試
+"""
+
+import unittest
+import copy
+import dataclasses
+import json
+import sys
+import os
+from unittest import mock
+
+# 將專案根目錄添加到 Python 路徑
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pandas as pd
+import constants
+from rules import RULES_FILE, RuleError, compile_rules, load_rules
+from verify import Verify, DUPLICATE_KEYS, CLASSIFICATION_MODES
+from output import NullSink
+from tests.conftest import (
+    create_test_classification
+)
+
+class TestRules(unittest.TestCase):
+
+    def setUp(self):
+        """設置測試環境"""
+        with open(RULES_FILE, encoding = 'utf-8') as f:
+            self.spec = json.load(f)
+
+    def test_constants_from_rules(self):
+        """測試 constants 的各項規範由 rules.json 產生"""
+        rules = load_rules()
+        self.assertEqual(list(constants.Config), list(self.spec))
+        self.assertNotIn('chart_brands_comment_score', constants.charts)
+        self.assertEqual(constants.charts['keyword'], ['step1', 'step2', 'step8', 'step5'])
+        self.assertEqual(constants.Rank_col_schema['chart_brands_extend']['factor_stats'], ('extend_detail_rank', 10))
+        self.assertEqual(constants.Extend_class_schema['chart_trends'], [])
+        self.assertNotIn('products', constants.Extend_class_schema)
+        self.assertEqual(DUPLICATE_KEYS['products'], ['source_product_id'])
+        self.assertEqual(CLASSIFICATION_MODES['chart_brands'], 'mixed')
+        self.assertEqual(rules['products_extend'].extend_null_columns, ['extend_subclass', 'extend_unit'])
+
+    def test_invalid_spec(self):
+        """測試格式錯誤的規範會回報報表種類與原因"""
+        cases = [
+            ('steps', ['step1', 'step9'], '未知的步驟'),
+            ('rank_columns', {'brand': {'column': 'brand_rank', 'max': 0}}, '正整數'),
+            ('classification_mode', 'category', 'classification_mode'),
+            ('required_column', ['id'], '未知的規範項目')
+        ]
+        for key, value, message in cases:
+            with self.subTest(key = key):
+                spec = copy.deepcopy(self.spec)
+                spec['chart_brands'][key] = value
+                with self.assertRaisesRegex(RuleError, f'chart_brands: .*{message}'):
+                    compile_rules(spec)
+
+    def test_step_requirements(self):
+        """測試步驟缺少需要的規範項目時回報錯誤"""
+        spec = copy.deepcopy(self.spec)
+        del spec['products']['duplicate_keys']
+        with self.assertRaisesRegex(RuleError, 'products: step3 需要 duplicate_keys'):
+            compile_rules(spec)
+
+    def test_rules_help(self):
+        """測試網頁版的步驟說明依報表規範填入重複值組合鍵與小數位數"""
+        self.assertIn("'source_product_id', 'extend_class', 'extend_subclass', 'extend_detail'", constants.rules_help('products_extend'))
+        chart_others = dataclasses.replace(constants.Chart_rules['chart_others'], decimal_limits = {'ratio': 1})
+        with mock.patch.dict(constants.Chart_rules, {'chart_others': chart_others}):
+            help = constants.rules_help('chart_others')
+        self.assertIn("ratio: 是否最多至小數 1 位", help)
+        self.assertNotIn("avg_price", help)
+
+    def test_decimal_limits_per_chart(self):
+        """測試小數點位數驗證使用報表規範的 decimal_limits"""
+        data = pd.DataFrame({'extend_stats': ['{"ratio": 0.12, "avg_price": 10.5}', '{"ratio": 0.1234, "avg_price": 3}']})
+        verifier = Verify(create_test_classification(), sink = NullSink())
+        self.assertEqual(verifier.verify_decimal(data, 'chart_others').counts['ratio']['too_many_decimals'], 1)
+
+        chart_others = dataclasses.replace(constants.Chart_rules['chart_others'], decimal_limits = {'ratio': 1})
+        with mock.patch.dict(constants.Chart_rules, {'chart_others': chart_others}):
+            result = verifier.verify_decimal(data, 'chart_others')
+        self.assertEqual(result.limits, {'ratio': 1})
+        self.assertEqual(list(result.counts), ['ratio'])
+        self.assertEqual(result.counts['ratio']['too_many_decimals'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,86 @@
+"""
+測試搜尋量檢測 (step8) 向量化判斷與 is_brand / domain 分組的單元測試
+"""
+
+import unittest
+import sys
+import os
+
+# 將專案根目錄添加到 Python 路徑
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import numpy as np
+import pandas as pd
+from verify import Verify, search_volume_masks
+from output import CollectingSink
+from streaming import StreamingVerifier
+from tests.conftest import (
+    create_test_classification
+)
+
+class TestSearchVolume(unittest.TestCase):
+
+    def setUp(self):
+        """設置測試環境"""
+        self.classification = create_test_classification()
+        self.data = pd.DataFrame({
+            'search_volume': [0, 10, None, '0', ' ', 'abc', 0.0, 3],
+            'is_brand': [True, True, True, False, False, False, True, False],
+            'domain': ['momo', 'momo', None, 'momo', 'pchome', 'pchome', 'pchome', 'momo']
+        })
+
+    def test_masks(self):
+        """測試數值、文字、空白與空值的判斷"""
+        zero, empty = search_volume_masks(self.data['search_volume'])
+        self.assertEqual(zero.tolist(), [True, False, False, True, False, False, True, False])
+        self.assertEqual(empty.tolist(), [False, False, True, False, True, False, False, False])
+
+    def test_numeric_column(self):
+        """測試數值欄位"""
+        zero, empty = search_volume_masks(pd.Series([0, 1.5, np.nan, 0]))
+        self.assertEqual(zero.tolist(), [True, False, False, True])
+        self.assertEqual(empty.tolist(), [False, False, True, False])
+
+    def test_nullable_column(self):
+        """測試可為空值的 Int64 / Float64 與 string 欄位（例如從 Parquet 讀回的欄位）"""
+        for dtype in ['Int64', 'Float64']:
+            with self.subTest(dtype = dtype):
+                zero, empty = search_volume_masks(pd.Series([0, 5, None, 0], dtype = dtype))
+                self.assertEqual(zero.tolist(), [True, False, False, True])
+                self.assertEqual(empty.tolist(), [False, False, True, False])
+        zero, empty = search_volume_masks(pd.Series(['0', '5', None, ' '], dtype = 'string'))
+        self.assertEqual(zero.tolist(), [True, False, False, False])
+        self.assertEqual(empty.tolist(), [False, False, True, True])
+        result = Verify(self.classification, sink = CollectingSink()).check_search_volume(pd.DataFrame({'search_volume': pd.array([0, None, 0, 7], dtype = 'Int64')}))
+        self.assertIsNone(result.error)
+        self.assertEqual(result.zero_count, 3)
+
+    def test_breakdown(self):
+        """測試依 is_brand 與 domain 分組的列數（含 domain 為空值的組）"""
+        result = Verify(self.classification, sink = CollectingSink()).check_search_volume(self.data)
+        self.assertEqual(result.zero_count, 5)
+        self.assertEqual(result.breakdown, [
+            {"is_brand": False, "domain": "momo", "rows": 2, "zero": 1, "empty": 0},
+            {"is_brand": False, "domain": "pchome", "rows": 2, "zero": 0, "empty": 1},
+            {"is_brand": True, "domain": "momo", "rows": 2, "zero": 1, "empty": 0},
+            {"is_brand": True, "domain": "pchome", "rows": 1, "zero": 1, "empty": 0},
+            {"is_brand": True, "domain": None, "rows": 1, "zero": 0, "empty": 1}
+        ])
+
+    def test_streaming_same_as_in_memory(self):
+        """測試分段累計的結果與一次計算相同"""
+        expected = Verify(self.classification, sink = CollectingSink()).check_search_volume(self.data)
+        stream = StreamingVerifier(Verify(self.classification, sink = CollectingSink()), "keyword", steps = ["step8"], coverage_level = None)
+        for start in range(0, len(self.data), 3):
+            stream.update(self.data.iloc[start:start + 3])
+        self.assertEqual(stream.finish()["step8"], expected)
+
+    def test_error(self):
+        """測試缺少 search_volume 欄位時回報錯誤"""
+        result = Verify(self.classification, sink = CollectingSink()).check_search_volume(self.data.drop(columns = ['search_volume']))
+        self.assertIsNone(result.zero_count)
+        self.assertIsNotNone(result.error)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
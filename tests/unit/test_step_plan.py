@@ -0,0 +1,104 @@
+"""
+測試步驟執行器 (run_plan / run_step) 的單元測試
+"""
+
+import unittest
+import sys
+import os
+from unittest import mock
+
+# 將專案根目錄添加到 Python 路徑
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pandas as pd
+from constants import charts
+from verify import Verify, STEP_FUNCTIONS, STEP_CACHE_SIZE
+from tests.conftest import (
+    create_test_classification
+)
+
+class TestStepPlan(unittest.TestCase):
+
+    def setUp(self):
+        """設置測試環境"""
+        self.verifier = Verify(create_test_classification())
+        self.data = pd.DataFrame({
+            'id': [1, 2],
+            'category': ['電子產品', '家具'],
+            'subcategory': ['手機', '桌子'],
+            'further_subcategory': ['智慧型手機', '辦公桌'],
+            'brand_rank': [1, 2],
+            'extend_class': ['功能 x 售價', '尺寸 x 售價'],
+            'extend_subclass': ['a', None],
+            'extend_stats': ['{"ratio": 0.5}', '{"ratio": 0.25}'],
+            'stats_type': ['further_subcategory', 'further_subcategory']
+        })
+
+    def test_all_steps_defined(self):
+        """測試 charts 中的每個步驟都有對應的函數，每個報表種類都有 check_ 函數"""
+        for chart_name, steps in charts.items():
+            for step in steps:
+                self.assertIn(step, STEP_FUNCTIONS)
+            self.assertTrue(hasattr(self.verifier, "check_" + chart_name))
+
+    def test_plan_follows_charts(self):
+        """測試步驟依 charts 的順序執行"""
+        results = self.verifier.run_plan(self.data, "chart_brands_extend_cross")
+        self.assertEqual(list(results.keys()), charts["chart_brands_extend_cross"])
+
+    def test_no_duplicate_steps(self):
+        """測試 chart_brands_extend_cross 的每個檢查只執行一次"""
+        with mock.patch.object(Verify, 'verify_decimal', autospec = True, return_value = {}) as decimal, \
+             mock.patch.object(Verify, 'check_extend_class', autospec = True) as extend_class:
+            self.verifier.check_chart_brands_extend_cross(self.data)
+        self.assertEqual(decimal.call_count, 1)
+        self.assertEqual(extend_class.call_count, 1)
+        self.assertEqual(extend_class.call_args.args[2], "chart_brands_extend_cross")
+
+    def test_step_memoized(self):
+        """測試同一份資料重複執行時直接使用記住的結果"""
+        with mock.patch.object(Verify, 'rank_verifier', autospec = True, return_value = {}) as rank:
+            self.verifier.run_plan(self.data, "chart_brands")
+            self.verifier.run_plan(self.data, "chart_brands")
+            self.assertEqual(rank.call_count, 1)
+
+            # 不同的資料會重新執行
+            self.verifier.run_plan(self.data.copy(), "chart_brands")
+            self.assertEqual(rank.call_count, 2)
+
+    def test_step_cache_bounded(self):
+        """測試記住的步驟結果不超過 STEP_CACHE_SIZE 筆，最久沒有使用的結果先被移除"""
+        reports = [self.data.copy() for _ in range(STEP_CACHE_SIZE)]
+        for report in reports:
+            self.verifier.run_step("step6", report, "chart_brands")
+        self.assertEqual(len(self.verifier._step_cache), STEP_CACHE_SIZE)
+
+        # 再次使用第一份報表後加入新的報表，移除的是第二份報表的結果
+        with mock.patch.object(Verify, 'rank_verifier', autospec = True, return_value = {}) as rank:
+            self.verifier.run_step("step6", reports[0], "chart_brands")
+            self.verifier.run_step("step6", self.data, "chart_brands")
+            self.verifier.run_step("step6", reports[0], "chart_brands")
+            self.assertEqual(rank.call_count, 1)
+            self.verifier.run_step("step6", reports[1], "chart_brands")
+            self.assertEqual(rank.call_count, 2)
+        self.assertEqual(len(self.verifier._step_cache), STEP_CACHE_SIZE)
+
+    def test_keyword_plan(self):
+        """測試 keyword 報表先檢查 search_volume 再依 is_brand 分開檢查分類"""
+        data = pd.DataFrame({
+            'id': [1, 2, 3],
+            'domain': ['a', 'a', 'a'],
+            'category': ['電子產品', '家具', '家具'],
+            'subcategory': ['手機', '桌子', '沙發'],
+            'further_subcategory': ['智慧型手機', '辦公桌', '沙發'],
+            'search_volume': [0, 10, None],
+            'is_brand': [True, False, False]
+        })
+        results = self.verifier.run_plan(data, "keyword")
+        self.assertEqual(list(results.keys()), ["step1", "step2", "step8", "step5"])
+        self.assertEqual(results["step8"].zero_count, 2)
+        self.assertEqual(results["step5"].incorrect_ids, [3])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
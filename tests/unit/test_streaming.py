@@ -0,0 +1,151 @@
+"""
+測試串流（分段讀取）驗證的單元測試：結果需與一次讀入整份資料的驗證相同
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# 將專案根目錄添加到 Python 路徑
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pandas as pd
+from verify import Verify
+from output import CollectingSink
+from unittest import mock
+from streaming import StreamingVerifier, ReportReadError, read_csv_chunks, stream_verify
+from tests.conftest import (
+    create_test_classification
+)
+
+class TestStreamingVerifier(unittest.TestCase):
+
+    def setUp(self):
+        """
+        設置測試環境
+        """
+        self.classification = create_test_classification()
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _write_csv(self, data, name):
+        path = os.path.join(self.tmp_dir, name)
+        data.to_csv(path, index = False)
+        return path
+
+    def assert_same_as_in_memory(self, data, chart_name, chunksize = 2):
+        """分段驗證與一次讀入整份資料的驗證，輸出的文字、表格與步驟結果都要相同"""
+        path = self._write_csv(data, f"{chart_name}.csv")
+
+        in_memory_sink = CollectingSink()
+        verifier = Verify(self.classification, sink = in_memory_sink)
+        full = pd.read_csv(path)
+        verifier.check_category_coverage(full)
+        coverage = verifier.results["category_coverage"]
+        expected = verifier.run_plan(full, chart_name)
+
+        streaming_sink = CollectingSink()
+        stream = stream_verify(Verify(self.classification, sink = streaming_sink), path, chart_name, chunksize = chunksize)
+
+        self.assertEqual(stream.rows, len(full))
+        self.assertEqual(stream.results, expected)
+        self.assertEqual(streaming_sink.messages, in_memory_sink.messages)
+        self.assertEqual(streaming_sink.tables, in_memory_sink.tables)
+        self.assertEqual(stream.verifier.results["category_coverage"], coverage)
+        self.assertEqual(stream.verifier.category_coverage_details['missing'], coverage.missing)
+        return stream
+
+    def test_products_extend(self):
+        """測試 products_extend：跨區塊的重複列、空值、擴充屬性與分類組合"""
+        data = pd.DataFrame({
+            'id': [1, 2, 3, 4, 5, 6, 7],
+            'source_product_id': [10, 11, 10, 12, 11, 13, 10],
+            'extend_class': ['功能', '風格', '功能', None, '風格', '色彩', '功能'],
+            'extend_subclass': ['a', None, 'a', 'b', None, None, 'a'],
+            'extend_detail': ['x', 'y', 'x', 'z', 'y', 'w', 'v'],
+            'extend_unit': [None, 'cm', None, 'kg', None, None, 'g'],
+            'category': ['電子產品', '電子產品', '家具', '家具', '家具', '電子產品', None],
+            'subcategory': ['手機', '電腦', '桌子', '椅子', '沙發', '手機', '手機'],
+            'further_subcategory': ['智慧型手機', '筆記型電腦', '辦公桌', '辦公椅', '沙發', '平板', '智慧型手機']
+        })
+        stream = self.assert_same_as_in_memory(data, "products_extend")
+        self.assertEqual(stream.results["step3"].duplicated_ids, [3, 5])
+        self.assertEqual(stream.results["step3"].groups, [
+            {"first_id": 1, "ids": [1, 3], "size": 2},
+            {"first_id": 2, "ids": [2, 5], "size": 2}
+        ])
+
+    def test_chart_brands_extend(self):
+        """測試混合層級的分類檢查、名次欄位與 extend_stats 小數位數"""
+        data = pd.DataFrame({
+            'id': [1, 2, 3, 4, 5],
+            'category': ['電子產品', '電子產品', '家具', '家具', '家具'],
+            'subcategory': ['手機', '電腦', '桌子', '沙發', '椅子'],
+            'further_subcategory': ['智慧型手機', '平板', '辦公桌', None, '辦公椅'],
+            'stats_type': ['further_subcategory', 'further_subcategory', 'further_subcategory',
+                           'subcategory', 'further_subcategory'],
+            'brand_rank': [1, 2, 7, 999, None],
+            'extend_detail_rank': [1, 11, 2, 3, 4],
+            'extend_detail_rank_ordinal': [1, 2, 3, 4, 5],
+            'extend_class': ['功能', '功能', '色彩', None, '材質'],
+            'extend_subclass': [None, 'a', 'b', None, None],
+            'extend_stats': ['{"ratio": 0.1234}', '{"ratio": 0.5}', '{"avg_price": 10.50}', None, '{"ratio": 0.25}']
+        })
+        stream = self.assert_same_as_in_memory(data, "chart_brands_extend")
+        self.assertEqual(stream.results["step5"].incorrect_ids, [2, 4])
+        self.assertEqual(stream.results["step6"].columns["brand"]["invalid_ids"], [3])
+
+    def test_keyword(self):
+        """測試 keyword 報表依 is_brand 分開檢查，並累計 search_volume 為 0 的列數"""
+        data = pd.DataFrame({
+            'domain': ['a', 'b', 'a', 'c', 'b'],
+            'category': ['電子產品', '電子產品', '家具', '家具', '家具'],
+            'subcategory': ['手機', '電腦', '桌子', '沙發', '椅子'],
+            'further_subcategory': ['智慧型手機', '平板', '辦公桌', '沙發', '辦公椅'],
+            'search_volume': [0, 10, None, 5, 0],
+            'is_brand': [True, False, True, False, True]
+        })
+        stream = self.assert_same_as_in_memory(data, "keyword")
+        self.assertEqual(stream.results["step8"].zero_count, 3)
+
+    def test_update_order_independent_of_chunksize(self):
+        """測試不同的 chunksize 得到相同的結果"""
+        data = pd.DataFrame({
+            'id': range(20),
+            'source_product_id': [i % 7 for i in range(20)],
+            'category': ['電子產品'] * 20,
+            'subcategory': ['手機'] * 20,
+            'further_subcategory': ['智慧型手機'] * 20
+        })
+        path = self._write_csv(data, "products.csv")
+        results = []
+        for chunksize in [1, 3, 20]:
+            stream = StreamingVerifier(Verify(self.classification, sink = CollectingSink()), "products", coverage_level = None)
+            for chunk in read_csv_chunks(path, "products", chunksize):
+                stream.update(chunk)
+            results.append(stream.finish())
+        self.assertEqual(results[0]["step3"].duplicated_ids, list(range(7, 20)))
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[0], results[2])
+
+
+    def test_read_errors(self):
+        """測試讀取失敗時拋出 ReportReadError，驗證步驟中的錯誤照原樣拋出"""
+        path = os.path.join(self.tmp_dir, "products.csv")
+        with open(path, "wb") as f:
+            f.write("id,category\n1,電子產品\n".encode("big5") + b"\xff\xfe\n")
+        with self.assertRaises(ReportReadError):
+            stream_verify(Verify(self.classification, sink = CollectingSink()), path, "products")
+
+        path = self._write_csv(pd.DataFrame({'id': [1], 'source_product_id': ['a']}), "products.csv")
+        with mock.patch.object(StreamingVerifier, '_update_step3', side_effect = KeyError('boom')):
+            with self.assertRaises(KeyError):
+                stream_verify(Verify(self.classification, sink = CollectingSink()), path, "products")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
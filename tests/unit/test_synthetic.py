@@ -0,0 +1,83 @@
+"""
+測試合成報表 (tests/synthetic.py) 與效能測試 (tests/benchmark.py) 的單元測試
+"""
+
+import unittest
+import sys
+import os
+
+# 將專案根目錄添加到 Python 路徑
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from verify import Verify
+from output import NullSink
+from readers import report_columns
+from constants import charts
+from tests.synthetic import make_classification, make_report, chart_names
+from tests.benchmark import run_benchmark, compare_with_baseline
+
+class TestSynthetic(unittest.TestCase):
+
+    def setUp(self):
+        """設置測試環境"""
+        self.classification = make_classification()
+
+    def test_columns_and_rows(self):
+        """測試每種報表都包含需要的欄位與指定的列數"""
+        for chart_name in chart_names():
+            with self.subTest(chart_name = chart_name):
+                data = make_report(chart_name, 500, self.classification)
+                self.assertEqual(len(data), 500)
+                self.assertTrue(set(report_columns(chart_name)).issubset(data.columns))
+
+    def test_deterministic(self):
+        """測試相同的亂數種子產生相同的報表"""
+        first = make_report("products_extend", 300, self.classification, seed = 1)
+        self.assertTrue(first.equals(make_report("products_extend", 300, self.classification, seed = 1)))
+        self.assertFalse(first.equals(make_report("products_extend", 300, self.classification, seed = 2)))
+
+    def test_contains_errors(self):
+        """測試合成報表含有重複列與錯誤的分類組合，各檢查都有結果可以計算"""
+        data = make_report("products", 5000, self.classification)
+        verifier = Verify(self.classification, sink = NullSink())
+        verifier.run_plan(data, "products")
+        self.assertGreater(len(verifier.results["duplicates"].duplicated_ids), 0)
+        self.assertGreater(len(verifier.results["classification_step"].incorrect_ids), 0)
+
+    def test_run_plan(self):
+        """測試每種有步驟規劃的報表都能完成驗證"""
+        for chart_name in charts:
+            with self.subTest(chart_name = chart_name):
+                verifier = Verify(self.classification, sink = NullSink())
+                verifier.run_plan(make_report(chart_name, 500, self.classification), chart_name)
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_run_benchmark(self):
+        """測試每個列數都有整體與各步驟的量測結果"""
+        results = run_benchmark(["products"], rows = [200, 400], repeat = 1, log = None)
+        steps = {(entry["rows"], entry["step"]) for entry in results}
+        for rows in [200, 400]:
+            self.assertIn((rows, "check_products"), steps)
+            self.assertIn((rows, "check_category_coverage"), steps)
+            self.assertIn((rows, "step3 duplicates_analysis"), steps)
+
+    def test_compare_with_baseline(self):
+        """測試只回報慢於門檻、且 baseline 夠長的步驟"""
+        baseline = [
+            {"chart_name": "products", "rows": 10, "step": "a", "wall": 1.0},
+            {"chart_name": "products", "rows": 10, "step": "b", "wall": 1.0},
+            {"chart_name": "products", "rows": 10, "step": "c", "wall": 0.001}
+        ]
+        results = [
+            {"chart_name": "products", "rows": 10, "step": "a", "wall": 2.0},
+            {"chart_name": "products", "rows": 10, "step": "b", "wall": 1.2},
+            {"chart_name": "products", "rows": 10, "step": "c", "wall": 0.01}
+        ]
+        regressions = compare_with_baseline(results, baseline, threshold = 1.5)
+        self.assertEqual(regressions["step"].tolist(), ["a"])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,81 @@
+"""
+測試 extend_stats 小數位數檢查 (verify_decimal) 的單元測試
+"""
+
+import unittest
+import sys
+import os
+from unittest import mock
+
+# 將專案根目錄添加到 Python 路徑
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import numpy as np
+import pandas as pd
+import verify.core
+from verify import Verify, extract_decimal_places
+from tests.conftest import (
+    create_test_classification
+)
+
+class TestVerifyDecimal(unittest.TestCase):
+
+    def setUp(self):
+        """設置測試環境"""
+        self.verifier = Verify(create_test_classification())
+        self.data = pd.DataFrame({
+            'extend_stats': [
+                '{"count": 3, "ratio": 0.125, "avg_price": 199.5}',
+                '{"count": 1, "ratio": 0.1234, "avg_price": 10.50}',
+                '{"ratio": 1e-05, "avg_price": 20}',
+                '{"sales_ratio": 0.55555, "avg_price": 35.12345}',
+                np.nan
+            ]
+        })
+
+    def test_extract_decimal_places(self):
+        """測試以原始文字計算小數位數，科學記號換算為實際位數"""
+        result = extract_decimal_places(self.data['extend_stats'], 'ratio')
+        self.assertEqual(result['decimals'].tolist()[:3], [3, 4, 5])
+        # 其他 key 名稱中包含 ratio 的不應被視為 ratio；空值列沒有數值
+        self.assertTrue(result['decimals'].iloc[3:].isna().all())
+
+    def test_ends_with_zero(self):
+        """測試小數以 0 結尾的數值（原始文字）"""
+        result = extract_decimal_places(self.data['extend_stats'], 'avg_price')
+        self.assertEqual(result['ends_with_zero'].tolist(), [False, True, False, False, False])
+
+    def test_verify_decimal_counts(self):
+        """測試 verify_decimal 的統計結果"""
+        results = self.verifier.verify_decimal(self.data).counts
+        self.assertEqual(results['ratio'], {'rows': 3, 'too_many_decimals': 2, 'ends_with_zero': 0})
+        self.assertEqual(results['avg_price'], {'rows': 4, 'too_many_decimals': 1, 'ends_with_zero': 1})
+
+    def test_without_pyarrow(self):
+        """測試沒有 pyarrow 時以 pandas str.extract 計算，結果相同"""
+        expected = extract_decimal_places(self.data['extend_stats'], 'ratio')
+        with mock.patch.object(verify.core, 'pc', None):
+            result = extract_decimal_places(self.data['extend_stats'], 'ratio')
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_nested_key(self):
+        """測試內層物件中同名的 key 不會被當成最上層的數值"""
+        stats = pd.Series([
+            '{"x": {"ratio": 0.5}, "ratio": 0.12345}',
+            '{"x": {"ratio": 0.5}}',
+            '{"items": [1, 2], "ratio": "0.50"}'
+        ])
+        expected = pd.DataFrame({'decimals': [5.0, np.nan, 2.0], 'ends_with_zero': [False, False, True]})
+        pd.testing.assert_frame_equal(extract_decimal_places(stats, 'ratio'), expected, check_dtype = False)
+        with mock.patch.object(verify.core, 'pc', None):
+            pd.testing.assert_frame_equal(extract_decimal_places(stats, 'ratio'), expected, check_dtype = False)
+
+    def test_no_extend_stats(self):
+        """測試沒有 extend_stats 欄位時不做檢查"""
+        result = self.verifier.verify_decimal(pd.DataFrame({'id': [1]}))
+        self.assertFalse(result.has_column)
+        self.assertEqual(result.counts, {})
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,27 @@
+"""
+驗證核心套件：報表的各項檢查、批次模式 (python -m verify) 與共用的工具函數，不需要 streamlit
+
+    from verify import Verify, prepare_classification
+    python -m verify source/設研院產品分類表.xlsx reports/ -o result.json
+
+實作都在 verify.core。匯入本套件時不會載入 pandas 等相依套件，第一次取用其中的名稱時才載入 verify.core，
+因此只匯入套件（例如批次模式的主程序解析參數、排程檢查環境）的啟動時間與記憶體用量都很小。
+"""
+
+import importlib
+
+
+def _core():
+    return importlib.import_module("verify.core")
+
+def __getattr__(name):
+    # 每次都從 verify.core 取值，測試中以 mock.patch 替換 verify.core 的名稱時也會生效
+    if name.startswith("__"):
+        raise AttributeError(f"module 'verify' has no attribute '{name}'")
+    try:
+        return getattr(_core(), name)
+    except AttributeError:
+        raise AttributeError(f"module 'verify' has no attribute '{name}'") from None
+
+def __dir__():
+    return sorted(set(globals()) | set(dir(_core())))
@@ -0,0 +1,7 @@
+"""命令列批次模式：python -m verify 分類表 報表... [-o result.json]"""
+
+import sys
+
+from verify.core import main
+
+sys.exit(main())
@@ -0,0 +1,1550 @@
+import pandas as pd
+import numpy as np
+import json
+import re
+import weakref
+import argparse
+import concurrent.futures
+import multiprocessing
+import os
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa = pc = None
+from output import CollectingSink, NullSink
+from results import (
+    ColumnResult,
+    NullResult,
+    DuplicateResult,
+    ExtendClassResult,
+    ClassificationResult,
+    ClassificationStepResult,
+    RankResult,
+    DecimalResult,
+    SearchVolumeResult,
+    CoverageResult
+)
+from presenter import present, style_category_coverage
+from profiling import Profile
+from utils import match_chart_type_from_filename
+from readers import read_table, read_classification, sniff_format, file_digest, COLUMNAR_EXTENSIONS
+from result_cache import ResultCache, DEFAULT_CACHE_BYTES
+from constants import charts, Config, Chart_rules, classification_columns, Rank_col_schema, Extend_class_schema, CATEGORY_COVERAGE_THRESHOLD
+
+
+# 各步驟對應的輔助函數；步驟清單見 constants.charts
+STEP_FUNCTIONS = {
+    "step1": lambda verifier, data, chart_name: verifier.column_assertion(data, chart_name),
+    "step2": lambda verifier, data, chart_name: verifier.null_analysis(data, chart_name),
+    "step3": lambda verifier, data, chart_name: verifier.duplicates_analysis(data, chart_name),
+    "step4": lambda verifier, data, chart_name: verifier.check_extend_class(data, chart_name),
+    "step5": lambda verifier, data, chart_name: verifier.classification_step(data, chart_name),
+    "step6": lambda verifier, data, chart_name: verifier.rank_verifier(data, chart_name),
+    "step7": lambda verifier, data, chart_name: verifier.verify_decimal(data, chart_name),
+    "step8": lambda verifier, data, chart_name: verifier.check_search_volume(data, chart_name)
+}
+
+# 效能紀錄 (Verify.profile) 中各步驟的名稱
+STEP_LABELS = {
+    "step1": "step1 column_assertion",
+    "step2": "step2 null_analysis",
+    "step3": "step3 duplicates_analysis",
+    "step4": "step4 check_extend_class",
+    "step5": "step5 classification_step",
+    "step6": "step6 rank_verifier",
+    "step7": "step7 verify_decimal",
+    "step8": "step8 check_search_volume"
+}
+COVERAGE_LABEL = "check_category_coverage"
+
+# 以下依 rules.json 的規範（constants.Chart_rules）整理
+# 子品類標籤驗證 (step5) 的分類層級
+CLASSIFICATION_MODES = {name: chart_rules.classification_mode for name, chart_rules in Chart_rules.items()}
+
+# 重複列檢查 (step3) 的組合鍵欄位
+DUPLICATE_KEYS = {name: chart_rules.duplicate_keys for name, chart_rules in Chart_rules.items() if chart_rules.duplicate_keys}
+
+# 擴充屬性檢查 (step4) 中，依 extend_class 分析空值的欄位；空的清單表示不做空值分析
+EXTEND_NULL_COLUMNS = {name: chart_rules.extend_null_columns for name, chart_rules in Chart_rules.items()}
+
+# 搜尋量檢測 (step8) 的分組欄位
+SEARCH_VOLUME_GROUPS = ["is_brand", "domain"]
+
+# 分類覆蓋率檢查各層級對應的分類欄位
+COVERAGE_COLUMNS = {
+    "further_subcategory": classification_columns,
+    "subcategory": ["category", "subcategory"]
+}
+
+def format_rank_value(x):
+    """名次值格式化為字串，整數值的浮點數去掉小數點（3.0 -> '3'）"""
+    if pd.notna(x) and isinstance(x, (int, float, np.number)) and np.isfinite(x) and x == int(x):
+        return str(int(x))
+    return str(x)
+
+def check_rank_column(data, col_name, range_):
+    """
+    檢查單一名次欄位：列出資料中的名次值域，並找出不在 1..range_ 與 999 之內的列
+
+    只對 distinct 值做格式化；是否符合規範以數值向量化比對。空值不列為違規。
+
+    Parameters:
+    -----------
+    data : pandas DataFrame
+    col_name : str
+        名次欄位名稱
+    range_ : int
+        規範的最大名次
+
+    Returns:
+    --------
+    dict
+        column, values（排序後的名次字串）, expected（規範名次）, null_count,
+        invalid_count, invalid_values, invalid_ids（違規列的 id，沒有 id 欄位時為列索引）
+    """
+    column = data[col_name]
+    expected = [i + 1 for i in range(range_)] + [999]
+
+    values = sorted({format_rank_value(x) for x in column.unique()})
+
+    numeric = pd.to_numeric(column, errors = "coerce")
+    null = column.isna().to_numpy()
+    invalid = ~(numeric.isin(expected).to_numpy() | null)
+    ids = data['id'] if 'id' in data.columns else data.index.to_series()
+    return {
+        "column": col_name,
+        "values": values,
+        "expected": expected,
+        "null_count": int(null.sum()),
+        "invalid_count": int(invalid.sum()),
+        "invalid_values": sorted({format_rank_value(x) for x in column[invalid].unique()}),
+        "invalid_ids": ids[invalid].tolist()
+    }
+
+def merge_rank_results(first, second):
+    """合併兩段資料（例如串流讀取的兩個區塊）各自的 check_rank_column 結果"""
+    return {
+        "column": first["column"],
+        "values": sorted(set(first["values"]) | set(second["values"])),
+        "expected": first["expected"],
+        "null_count": first["null_count"] + second["null_count"],
+        "invalid_count": first["invalid_count"] + second["invalid_count"],
+        "invalid_values": sorted(set(first["invalid_values"]) | set(second["invalid_values"])),
+        "invalid_ids": first["invalid_ids"] + second["invalid_ids"]
+    }
+
+# extend_stats 中需要檢查小數位數的數值與允許的最多位數；報表的規範沒有 decimal_limits 時使用
+DECIMAL_LIMITS = {
+    "ratio": 3,
+    "avg_price": 3
+}
+
+def decimal_limits(chart_name = None):
+    """報表種類的小數位數規範（rules.json 的 decimal_limits），沒有指定時為 DECIMAL_LIMITS"""
+    chart_rules = Chart_rules.get(chart_name)
+    if chart_rules is None or chart_rules.decimal_limits is None:
+        return DECIMAL_LIMITS
+    return chart_rules.decimal_limits
+
+# 數值文字：整數部分、小數部分與科學記號的指數
+DECIMAL_PATTERN = r"(?P<integer>-?\d+)(?:\.(?P<fraction>\d*))?(?:[eE](?P<exponent>[+-]?\d+))?"
+# 第一個 { 之後還有 { 或 [ 的 JSON，key 可能出現在內層的物件中
+NESTED_JSON_PATTERN = r"(?s)^[^{]*\{.*[{\[]"
+
+def _top_level_decimal_parts(texts, key):
+    """
+    以 json 解析巢狀的 extend_stats（數值保留原始文字），取出最上層 key 的數值文字並拆成 integer / fraction / exponent
+
+    無法以 json 解析的列為 None，沿用正規表示式的結果。
+    """
+    number = re.compile(DECIMAL_PATTERN)
+    parts = []
+    for text in texts:
+        try:
+            stats = json.loads(text, parse_float = str, parse_int = str)
+        except (TypeError, ValueError):
+            parts.append(None)
+            continue
+        value = stats.get(key) if isinstance(stats, dict) else None
+        match = number.match(value) if isinstance(value, str) else None
+        parts.append(match.groupdict() if match else {"integer": None, "fraction": None, "exponent": None})
+    return parts
+
+def extract_decimal_places(stats, key):
+    """
+    從 extend_stats 的原始 JSON 文字中取出 key 對應的數值，計算其文字的小數位數
+
+    以向量化的正規表示式比對，不解析整個 JSON。科學記號（如 1e-05）會換算成實際的小數位數。
+    含有內層物件或陣列的列，key 可能出現在內層，這些列改以 json 解析，只取最上層的 key。
+
+    Parameters:
+    -----------
+    stats : pandas Series
+        extend_stats 欄位（JSON 字串）
+    key : str
+        要檢查的數值名稱，例如 "ratio"
+
+    Returns:
+    --------
+    pandas DataFrame
+        decimals: 小數位數（沒有該數值的列為空值）
+        ends_with_zero: 小數是否以 0 結尾（如 0.500、5.0，應寫成 0.5、5）
+    """
+    pattern = rf"""["']{re.escape(key)}["']\s*:\s*["']?{DECIMAL_PATTERN}"""
+    if pc is not None:
+        # pyarrow 以 RE2 比對，比 pandas 的 str.extract 快數倍
+        array = pa.array(stats, type = pa.large_string(), from_pandas = True)
+        parts = pc.extract_regex(array, pattern)
+        parts = pd.DataFrame(
+            {name: pc.struct_field(parts, name).to_pandas() for name in ["integer", "fraction", "exponent"]}
+        ).set_axis(stats.index)
+        nested = pc.fill_null(pc.match_substring_regex(array, NESTED_JSON_PATTERN), False).to_numpy(zero_copy_only = False)
+    else:
+        parts = stats.str.extract(pattern)
+        nested = stats.str.contains(NESTED_JSON_PATTERN, regex = True, na = False).to_numpy(dtype = bool)
+
+    positions = np.flatnonzero(nested)
+    if len(positions):
+        parts = parts.astype(object)
+        for position, row in zip(positions, _top_level_decimal_parts(stats.iloc[positions], key)):
+            if row is not None:
+                parts.iloc[position] = [row["integer"], row["fraction"], row["exponent"]]
+
+    fraction = parts["fraction"].fillna("")
+    exponent_text = parts["exponent"].fillna("")
+    exponent = pd.to_numeric(exponent_text, errors = "coerce").fillna(0)
+    decimals = (fraction.str.len() - exponent).clip(lower = 0)
+    decimals = decimals.where(parts["integer"].notna())
+    ends_with_zero = fraction.str.endswith("0").astype(bool) & (exponent_text.str.len() == 0)
+    return pd.DataFrame({"decimals": decimals, "ends_with_zero": ends_with_zero})
+
+def count_decimal_places(stats, limits = DECIMAL_LIMITS):
+    """
+    統計 extend_stats 中 limits 各數值的小數位數問題
+
+    Parameters:
+    -----------
+    stats : pandas Series
+        extend_stats 欄位（JSON 字串）
+    limits : dict
+        數值名稱 -> 允許的最多位數
+
+    Returns:
+    --------
+    dict
+        key -> {"rows": 有該數值的列數, "too_many_decimals": 超過位數的列數, "ends_with_zero": 小數以 0 結尾的列數}
+    """
+    if not pd.api.types.is_string_dtype(stats):
+        stats = stats.astype(str)
+
+    results = {}
+    for key, limit in limits.items():
+        decimals = extract_decimal_places(stats, key)
+        results[key] = {
+            "rows": int(decimals["decimals"].notna().sum()),
+            "too_many_decimals": int((decimals["decimals"] > limit).sum()),
+            "ends_with_zero": int(decimals["ends_with_zero"].sum())
+        }
+    return results
+
+def convert_numpy_to_native(obj):
+    """處理 numpy 類型的問題，遞迴轉為 Python 原生類型（可直接 json.dumps）"""
+    if hasattr(obj, 'items'):
+        return {k: convert_numpy_to_native(v) for k, v in obj.items()}
+    elif hasattr(obj, '__iter__') and not isinstance(obj, str):
+        return [convert_numpy_to_native(v) for v in obj]
+    elif hasattr(obj, 'item'):
+        return obj.item()  # 將 numpy 類型轉為 Python 原生類型
+    else:
+        return obj
+
+def build_classification_index(classification, levels = ("further_subcategory", "subcategory")):
+    """
+    建立分類組合鍵的雜湊索引，可傳給多個 Verify 實例（或批次模式的子程序）共用
+
+    Returns:
+    --------
+    dict
+        層級名稱 -> pandas Index
+    """
+    return {
+        level: pd.Index(classification['classification_' + level].dropna().unique())
+        for level in levels
+    }
+
+def join_class_columns(data, class_cols):
+    """將分類欄位以底線串接成組合鍵（向量化字串串接）；任一欄位為空值的列，組合鍵為空值"""
+    key = data[class_cols[0]].astype(str)
+    for col in class_cols[1:]:
+        key = key + "_" + data[col].astype(str)
+    return key.where(data[class_cols].notna().all(axis = 1))
+
+def _is_compact_integer(column):
+    """numpy 整數欄位（不會有空值），且值域不超過列數的數倍"""
+    if not (isinstance(column.dtype, np.dtype) and column.dtype.kind == "i" and len(column)):
+        return False
+    return int(column.max()) - int(column.min()) < 4 * len(column)
+
+def composite_keys(data, columns):
+    """
+    將多個欄位的值組合合併成一個 int64 整數鍵：值組合相同的列得到相同的鍵（空值視為一個值）
+
+    category 欄位直接使用既有的整數代碼，值域不大的整數欄位（例如 id）直接以數值減去最小值作為代碼，
+    其他欄位以雜湊表 factorize；各欄位的代碼以混合進位制合併，只有在合併後可能超過 int64 時才先重新 factorize 壓縮鍵值。
+
+    Returns:
+    --------
+    tuple
+        (整數鍵 numpy.ndarray, 任一欄位為空值的列 numpy.ndarray (bool))
+    """
+    keys = np.zeros(len(data), dtype = np.int64)
+    # keys 的上限（不含）
+    bound = 1
+    null = np.zeros(len(data), dtype = bool)
+    for col in columns:
+        column = data[col]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            codes, size = column.cat.codes.to_numpy(dtype = np.int64), len(column.cat.categories)
+        elif _is_compact_integer(column):
+            values = column.to_numpy(dtype = np.int64)
+            codes, size = values - values.min(), int(values.max() - values.min()) + 1
+        else:
+            codes, uniques = pd.factorize(column)
+            size = len(uniques)
+        null |= codes < 0
+        if bound * (size + 1) >= 2 ** 63:
+            keys, uniques = pd.factorize(keys)
+            bound = len(uniques)
+        # 空值的代碼為 -1，加 1 後成為獨立的值
+        keys = keys * (size + 1) + codes + 1
+        bound *= size + 1
+    return keys, null
+
+def factorize_columns(data, columns):
+    """
+    將多個欄位的值組合編成整數組別代碼（依第一次出現的順序編號 0, 1, 2...）
+
+    Returns:
+    --------
+    tuple
+        (組別代碼 numpy.ndarray，任一欄位為空值的列為 -1；各組第一次出現的列位置 numpy.ndarray)
+    """
+    keys, null = composite_keys(data, columns)
+    rows = np.flatnonzero(~null)
+    codes, _ = pd.factorize(keys[rows])
+    group_ids = np.full(len(data), -1, dtype = np.int64)
+    group_ids[rows] = codes
+    return group_ids, rows[first_occurrences(codes)]
+
+def first_occurrences(group_ids):
+    """
+    依第一次出現順序編號的組別代碼中，每組第一次出現的位置（布林遮罩）
+
+    代碼依出現順序遞增，某列是該組第一次出現，若且唯若其代碼大於前面所有列的代碼。
+    """
+    running_max = np.maximum.accumulate(group_ids) if len(group_ids) else group_ids
+    return np.diff(running_max, prepend = -1) > 0
+
+def duplicate_groups(keys, ids):
+    """
+    整理重複的列
+
+    Parameters:
+    -----------
+    keys : numpy.ndarray
+        每列的整數組合鍵（composite_keys 的結果，或串流讀取時的 64 位元雜湊值），鍵相同即為重複
+    ids : pandas Series
+        與 keys 對齊的列 id
+
+    Returns:
+    --------
+    tuple
+        (重複列（第二次以後出現）的 id 列表,
+         重複組列表 [{"first_id": 第一次出現的 id, "ids": 組內所有 id, "size": 列數}]，依第一次出現的順序)
+    """
+    keys = pd.Series(keys)
+    later = keys.duplicated().to_numpy()
+    duplicated_ids = ids[later].tolist()
+    # 只對屬於重複組的列（通常只占很小的比例）編組
+    rows = np.flatnonzero(keys.isin(keys[later].unique()).to_numpy())
+    group_ids, _ = pd.factorize(keys.to_numpy()[rows])
+    # 同一組的列排在一起，組內維持原本的列順序
+    members = ids.iloc[rows[np.argsort(group_ids, kind = "stable")]].tolist()
+    groups = []
+    offset = 0
+    for size in np.bincount(group_ids).tolist():
+        groups.append({"first_id": members[offset], "ids": members[offset:offset + size], "size": size})
+        offset += size
+    return duplicated_ids, groups
+
+def as_text(column):
+    """欄位轉為文字；類別本身已是文字的 category 欄位維持原樣，保留整數代碼"""
+    if isinstance(column.dtype, pd.CategoricalDtype) and pd.api.types.is_string_dtype(column.cat.categories.dtype):
+        return column
+    return column.astype(str)
+
+def search_volume_masks(search_volume):
+    """
+    search_volume 為 0 與空值的列
+
+    數值欄位直接比較；混有文字的欄位先以 pd.to_numeric 轉成數值（'0'、' 0.0 ' 等文字也視為 0），
+    只有無法轉換的文字再去除空白判斷是否為空字串。
+
+    Returns:
+    --------
+    tuple
+        (為 0 的列, 空值或空白文字的列)，皆為 numpy.ndarray (bool)
+    """
+    null = search_volume.isna().to_numpy()
+    if pd.api.types.is_numeric_dtype(search_volume.dtype) or pd.api.types.is_bool_dtype(search_volume.dtype):
+        # 可為空值的 Int64 / Float64 欄位（例如從 Parquet 讀回）比較結果含有 NA，視為不是 0
+        return (search_volume == 0).to_numpy(dtype = bool, na_value = False) & ~null, null
+    numeric = pd.to_numeric(search_volume, errors = "coerce").to_numpy(dtype = float, na_value = np.nan)
+    zero = numeric == 0
+    # 無法轉成數值的文字
+    residue = np.isnan(numeric) & ~null
+    empty = null.copy()
+    empty[residue] = (search_volume[residue].astype(str).str.strip() == "").to_numpy()
+    return zero, empty
+
+def count_search_volume(data):
+    """
+    一次計算 search_volume 為 0 與空值的列數，並依 is_brand、domain 分組（缺少的欄位不分組）
+
+    Returns:
+    --------
+    pandas DataFrame
+        columns 為 rows, zero, empty；有分組欄位時 index 為分組欄位的值（含空值）
+    """
+    zero, empty = search_volume_masks(data["search_volume"])
+    counts = pd.DataFrame({"rows": np.ones(len(data), dtype = np.int64), "zero": zero, "empty": empty}, index = data.index)
+    keys = [col for col in SEARCH_VOLUME_GROUPS if col in data.columns]
+    if not keys:
+        return counts.sum().to_frame().T
+    return counts.groupby([data[col] for col in keys], observed = True, dropna = False).sum()
+
+def search_volume_result(counts):
+    """整理 count_search_volume（或多段資料累計）的結果；zero_count 為 0 或空值的總列數"""
+    zero_count = int(counts["zero"].sum() + counts["empty"].sum())
+    if counts.index.names == [None]:
+        return SearchVolumeResult(zero_count)
+    breakdown = [
+        {
+            **{name: (None if pd.isna(value) else convert_numpy_to_native(value)) for name, value in zip(counts.index.names, key if isinstance(key, tuple) else (key,))},
+            **{col: int(row[col]) for col in ["rows", "zero", "empty"]}
+        }
+        for key, row in counts.iterrows()
+    ]
+    return SearchVolumeResult(zero_count, breakdown = breakdown)
+
+def count_extend_class_nulls(data, columns):
+    """
+    依 extend_class 分組，一次計算各欄位的空值數與每組列數
+
+    Returns:
+    --------
+    pandas DataFrame
+        index 為 extend_class；columns 為各欄位的空值數與 "rows"（該組列數）
+    """
+    grouped = data[columns].isna().groupby(data["extend_class"], observed = True)
+    return grouped.sum().assign(rows = grouped.size())
+
+def count_extend_class_presence(data):
+    """
+    各小分類 (further_subcategory) 中每個 extend_class 的列數（一次 groupby）
+
+    Returns:
+    --------
+    pandas Series or None
+        index 為 (further_subcategory, extend_class)；資料沒有 further_subcategory 欄位時為 None
+    """
+    if "further_subcategory" not in data.columns:
+        return None
+    return data.groupby(["further_subcategory", "extend_class"], observed = True).size()
+
+def extend_presence_to_dict(presence_counts, expected):
+    """count_extend_class_presence 的結果轉為 further_subcategory -> {extend_class: 列數}，只保留規範中的擴充屬性，沒有出現的為 0"""
+    if presence_counts is None:
+        return None
+    matrix = presence_counts.unstack(fill_value = 0).reindex(columns = expected, fill_value = 0)
+    return {
+        further_subcategory: {extend_class: int(count) for extend_class, count in counts.items()}
+        for further_subcategory, counts in matrix.iterrows()
+    }
+
+def extend_null_counts_to_dict(null_counts):
+    """count_extend_class_nulls 的結果轉為 extend_class -> {欄位: 空值數, "rows": 列數}"""
+    return {
+        extend_class: {col: int(count) for col, count in counts.items()}
+        for extend_class, counts in null_counts.to_dict(orient = "index").items()
+    }
+
+def extend_class_result(chart_name, present, null_counts, presence_counts = None):
+    """
+    整理擴充屬性檢查 (step4) 的結果
+
+    Parameters:
+    -----------
+    chart_name : str
+    present : set
+        資料中出現過的 extend_class
+    null_counts : dict or None
+        extend_null_counts_to_dict 的結果；規範的 extend_null_columns 為空（例如 chart_brands_comment_counts）時不做空值分析，為 None
+    presence_counts : pandas Series or None
+        count_extend_class_presence 的結果
+
+    Returns:
+    --------
+    results.ExtendClassResult
+    """
+    expected = list(Extend_class_schema[chart_name])
+    return ExtendClassResult(
+        chart_name,
+        expected,
+        [extend_class for extend_class in expected if extend_class in present],
+        EXTEND_NULL_COLUMNS.get(chart_name, ["extend_subclass"]),
+        null_counts,
+        extend_presence_to_dict(presence_counts, expected)
+    )
+
+def decimal_result(counts, limits = DECIMAL_LIMITS):
+    """整理小數點檢查 (step7) 的結果；counts 為 None 表示資料沒有 extend_stats 欄位，只保留有出現的數值"""
+    if counts is None:
+        return DecimalResult(False, {}, dict(limits))
+    return DecimalResult(True, {key: result for key, result in counts.items() if result["rows"] > 0}, dict(limits))
+
+def coverage_result(classification, columns, counts, level = "further_subcategory"):
+    """
+    依分類表的順序整理各分類組合的數量
+
+    Parameters:
+    -----------
+    classification : pandas DataFrame
+        已加上 classification_* 組合鍵欄位的分類表
+    columns : list-like
+        資料的欄位名稱，用來確認必要的分類欄位是否存在
+    counts : pandas Series or None
+        以分類欄位為 MultiIndex 的各分類組合數量；缺少分類欄位時為 None
+    level : str
+        "subcategory" 或 "further_subcategory"
+
+    Returns:
+    --------
+    results.CoverageResult
+    """
+    categories = classification['classification_' + level].tolist()
+    class_cols = COVERAGE_COLUMNS[level]
+
+    # 檢查必要的欄位是否存在
+    missing_cols = [col for col in class_cols if col not in columns]
+    if missing_cols:
+        return CoverageResult(level, len(categories), [], [], [], missing_cols)
+
+    # 拆分分類字串；層級數不符的分類略過
+    valid = []
+    for category in categories:
+        cat_parts = category.split('_') if isinstance(category, str) else []
+        if len(cat_parts) == len(class_cols):
+            valid.append((category, tuple(cat_parts)))
+
+    # 依分類表的順序 reindex
+    counts = counts.reindex(
+        pd.MultiIndex.from_tuples([parts for _, parts in valid], names = class_cols),
+        fill_value = 0
+    ).to_numpy(dtype = np.int64).tolist()
+    valid_categories = [category for category, _ in valid]
+
+    # 找出缺失的分類 (count == 0)
+    missing = [category for category, count in zip(valid_categories, counts) if count == 0]
+    return CoverageResult(level, len(categories), valid_categories, counts, missing, [])
+
+# 以分類欄位內容的雜湊值快取組合鍵，重複使用同一份分類表時不需重新串接；存取時需持有 _prepared_classification_cache_lock
+_prepared_classification_cache = OrderedDict()
+_prepared_classification_cache_lock = threading.Lock()
+PREPARED_CLASSIFICATION_CACHE_SIZE = 8
+
+def prepare_classification(classification):
+    """
+    為分類表加上 classification_further_subcategory 與 classification_subcategory 組合鍵欄位
+
+    以向量化字串串接建立組合鍵，分類欄位有空值的列組合鍵為空值（不會被視為合法分類）。
+    結果依分類欄位的內容雜湊快取，不會修改傳入的 DataFrame。
+
+    Parameters:
+    -----------
+    classification : pandas DataFrame
+        含有 category, subcategory, further_subcategory 欄位的分類表
+
+    Returns:
+    --------
+    pandas DataFrame
+        加上組合鍵欄位的新分類表
+    """
+    hashes = pd.util.hash_pandas_object(classification[classification_columns], index = False)
+    digest = hashlib.sha1(hashes.to_numpy().tobytes()).hexdigest()
+
+    with _prepared_classification_cache_lock:
+        keys = _prepared_classification_cache.get(digest)
+        if keys is not None:
+            _prepared_classification_cache.move_to_end(digest)
+    if keys is None:
+        keys = (
+            join_class_columns(classification, classification_columns).to_numpy(),
+            join_class_columns(classification, ["category", "subcategory"]).to_numpy()
+        )
+        with _prepared_classification_cache_lock:
+            _prepared_classification_cache[digest] = keys
+            if len(_prepared_classification_cache) > PREPARED_CLASSIFICATION_CACHE_SIZE:
+                _prepared_classification_cache.popitem(last = False)
+
+    further_subcategory_keys, subcategory_keys = keys
+    return classification.assign(
+        classification_further_subcategory = further_subcategory_keys,
+        classification_subcategory = subcategory_keys
+    )
+
+# Verify.run_step 最多記住的步驟結果數量（約兩份報表的所有步驟），長時間執行的服務與網頁版不會持續累積
+STEP_CACHE_SIZE = 16
+
+class Verify():
+    def __init__(self, classification_data, file_name=None, sink=None, classification_index=None, profile=None):
+        self.classification = classification_data
+        self.file_name = file_name  # 新增檔案名稱參數，允許為 None
+        # 輸出管道，預設不輸出（結果保存在 self.results）；網頁版由 app.py 傳入 streamlit 的 sink，見 output.py
+        self.sink = sink if sink is not None else NullSink()
+        self.chart_brand_details = {"subcategory": {},
+                                    "further_subcategory": {}}
+        self.chart_brand_extend_details = {}
+        self.chart_brand_extend_cross_details = {}
+        self.chart_brand_extend_image_details = {}
+        self.chart_brand_comment_counts_details = {}
+        self.chart_others_details = {}
+        self.chart_trends_details = {}
+        self.category_coverage_details = {}
+        self.empty_cells_details = {}
+        self.duplicated_products_details = {}
+        # 最近一次各檢查的結果：result.name -> results.CheckResult（見 publish）
+        self.results = {}
+        # 各步驟的執行時間、CPU 時間與記憶體峰值（見 profiling.py）；可傳入同一個 Profile 一併記錄讀檔等步驟
+        self.profile = profile if profile is not None else Profile()
+        # run_step 記住的步驟結果：(step, chart_name, id(data)) -> (weakref(data), result)，最多 STEP_CACHE_SIZE 筆
+        self._step_cache = OrderedDict()
+        # 分類組合鍵的雜湊索引，於第一次檢查時建立；批次模式可傳入預先建立好的索引共用
+        self._classification_index = dict(classification_index) if classification_index else {}
+        
+    def publish(self, result, start = None):
+        """
+        記錄檢查結果並交給 presenter 輸出
+
+        Parameters:
+        -----------
+        result : results.CheckResult
+            檢查的結果物件
+        start : float or None
+            檢查開始時的 time.perf_counter()；指定時記錄計算時間 (result.seconds)
+
+        Returns:
+        --------
+        result
+        """
+        if start is not None:
+            result.seconds = time.perf_counter() - start
+        self.results[result.name] = result
+        if isinstance(result, CoverageResult) and not result.missing_columns:
+            self.category_coverage_details['result'] = result.to_frame()
+            self.category_coverage_details['missing'] = result.missing
+        present(result, self.sink)
+        return result
+
+    def column_assertion(self, data, chart_name):
+        start = time.perf_counter()
+        missing_columns = [col for col in Config[chart_name] if col not in data.columns]
+        return self.publish(ColumnResult(chart_name, missing_columns), start)
+
+    def null_analysis(self, data, chart_name):
+        start = time.perf_counter()
+        # 缺少的欄位已在欄位檢測中列出，這裡只分析存在的欄位
+        columns = [col for col in Config[chart_name] if col in data.columns]
+        # 逐欄計算，不建立整張布林表
+        null_counts = {col: int(data[col].isna().sum()) for col in columns}
+        return self.publish(NullResult(len(data), null_counts), start)
+
+    def duplicates_analysis(self, data, chart_name):
+        assert chart_name in DUPLICATE_KEYS, "duplicates analysis is only available for 'products' and 'products_extend' tables"
+        start = time.perf_counter()
+        # 組合鍵欄位合併成整數鍵（category 欄位直接使用既有代碼），空值視為相同的值（與 DataFrame.duplicated 相同）
+        keys, _ = composite_keys(data, DUPLICATE_KEYS[chart_name])
+        duplicated_ids, groups = duplicate_groups(keys, data["id"])
+        return self.publish(DuplicateResult(chart_name, duplicated_ids, groups), start)
+
+    def _classification_keys(self, statstype):
+        """
+        取得分類表中指定層級的組合鍵索引（每個 Verify 實例只建立一次）
+
+        Parameters:
+        -----------
+        statstype : str
+            "subcategory" 或 "further_subcategory"
+
+        Returns:
+        --------
+        pandas Index
+            以雜湊表比對的分類組合鍵
+        """
+        if statstype not in self._classification_index:
+            self._classification_index[statstype] = build_classification_index(self.classification, [statstype])[statstype]
+        return self._classification_index[statstype]
+
+    def _find_unclassified(self, data, statstype, rows = None):
+        """
+        以整欄向量化的方式找出分類組合不在分類表中的列
+
+        Parameters:
+        -----------
+        rows : numpy.ndarray (bool) or None
+            只檢查這些列；只取出分類欄位的這些列，不複製整份資料
+
+        Returns:
+        --------
+        numpy.ndarray (bool)
+            與 data（或 data[rows]）列順序對齊的遮罩；分類欄位有空值的列不列入檢查（視為 False）
+        """
+        class_cols = classification_columns if statstype == "further_subcategory" else ["category", "subcategory"]
+        columns = data[class_cols] if rows is None else data[class_cols][rows]
+        # 只對不重複的分類組合串接組合鍵並比對分類表，再依組別代碼展開回每一列
+        group_ids, first = factorize_columns(columns, class_cols)
+        combos = columns.iloc[first]
+        unknown = ~join_class_columns(combos, class_cols).isin(self._classification_keys(statstype)).to_numpy()
+        checked = group_ids >= 0
+        mask = np.zeros(len(columns), dtype = bool)
+        mask[checked] = unknown[group_ids[checked]]
+        return mask
+
+    def find_incorrect_classified(self, data, statstype = "further_subcategory"):
+        """
+        找出分類組合不存在於分類表中的列
+
+        Returns:
+        --------
+        tuple
+            (不符合的列數, 不符合的列 id 列表)
+        """
+        assert statstype in ["subcategory", "further_subcategory", "mixed"] 
+        incorrect_classified_ids = []
+
+        if statstype == "mixed":
+            """
+            當表中同時有子類與品類層級的資料 -> 分開處理
+            """
+            # * 子類、品類依序檢查
+            for level in ["further_subcategory", "subcategory"]:
+                rows = (data['stats_type'] == level).to_numpy()
+                mask = self._find_unclassified(data, level, rows)
+                incorrect_classified_ids.extend(data['id'][rows][mask].tolist())
+
+            return len(incorrect_classified_ids), incorrect_classified_ids
+
+        """
+        當表中只有子類或品類其一層級的資料
+        """
+        mask = self._find_unclassified(data, statstype)
+        # * 新增 reference 報表的例外處理
+        for id_col in ["id", "reference_id"]:
+            if id_col in data.columns:
+                incorrect_classified_ids = data[id_col][mask].tolist()
+                break
+        return int(mask.sum()), incorrect_classified_ids
+
+    def classification_check(self, data, statstype = "further_subcategory", caption = None):
+        """
+        檢查分類組合是否存在於分類表中
+
+        Returns:
+        --------
+        list
+            分類組合不存在的列 id；結果物件 (results.ClassificationResult) 記錄在 self.results["classification"]
+        """
+        start = time.perf_counter()
+        count, incorrect_classified_ids = self.find_incorrect_classified(data, statstype)
+        self.publish(ClassificationResult(statstype, len(data), count, incorrect_classified_ids, caption), start)
+        return incorrect_classified_ids
+    
+    def rank_verifier(self, data, chart_name):
+        """
+        驗證報表中各名次欄位的值域
+
+        Returns:
+        --------
+        results.RankResult
+            columns 為 schema key -> check_rank_column 的結果
+        """
+        start = time.perf_counter()
+        columns = {}
+        missing_columns = []
+        for key, (col_name, range_) in Rank_col_schema[chart_name].items():
+            if col_name in data.columns:
+                columns[key] = check_rank_column(data, col_name, range_)
+            else:
+                missing_columns.append(col_name)
+        return self.publish(RankResult(chart_name, columns, missing_columns), start)
+
+    def check_extend_class(self, data, chart_name):
+        start = time.perf_counter()
+        present = set(data['extend_class'].dropna().unique())
+        null_columns = EXTEND_NULL_COLUMNS.get(chart_name, ["extend_subclass"])
+        null_counts = None
+        if null_columns:
+            null_counts = extend_null_counts_to_dict(count_extend_class_nulls(data, null_columns))
+        return self.publish(extend_class_result(chart_name, present, null_counts, count_extend_class_presence(data)), start)
+
+    def verify_decimal(self, data, chart_name = None):
+        """
+        檢查 extend_stats 中 ratio / avg_price 等數值的小數位數（規範見 decimal_limits）
+
+        直接以正規表示式從原始 JSON 文字取出需要的數值，計算原始文字的小數位數，
+        不逐列 json.loads，也不建立展開後的整張表。
+
+        Returns:
+        --------
+        results.DecimalResult
+            counts 為 key -> {"rows": 有該數值的列數, "too_many_decimals": 超過位數的列數, "ends_with_zero": 小數以 0 結尾的列數}
+        """
+        start = time.perf_counter()
+        limits = decimal_limits(chart_name)
+        if "extend_stats" not in data.columns:
+            return self.publish(decimal_result(None, limits), start)
+        return self.publish(decimal_result(count_decimal_places(data["extend_stats"], limits), limits), start)
+
+    def classification_groups(self, data, chart_name):
+        """
+        子品類標籤驗證 (step5) 要分開檢查的資料組
+
+        Yields:
+        -------
+        tuple
+            (說明文字或 None, 該組資料, 分類層級)；keyword 報表依 is_brand 分成兩組，
+            每組只包含 id 與轉為文字的分類欄位，不修改也不複製傳入的整份資料
+        """
+        if chart_name != "keyword":
+            yield None, data, CLASSIFICATION_MODES.get(chart_name, "mixed")
+            return
+
+        id_cols = [col for col in ["id", "reference_id"] if col in data.columns]
+        text = pd.DataFrame({
+            **{col: data[col] for col in id_cols},
+            **{col: as_text(data[col]) for col in classification_columns}
+        })
+        for is_brand, caption in [(True, "針對 is_brand = 1 之 keyword 資料"), (False, "針對 is_brand = 0 之 keyword 資料")]:
+            yield caption, text[(data['is_brand'] == is_brand).to_numpy()], "further_subcategory"
+
+    def classification_step(self, data, chart_name):
+        """
+        子品類標籤驗證 (step5)：依報表種類選擇分類層級；keyword 報表依 is_brand 分開檢查
+
+        Returns:
+        --------
+        results.ClassificationStepResult
+        """
+        start = time.perf_counter()
+        groups = []
+        for caption, group, statstype in self.classification_groups(data, chart_name):
+            count, ids = self.find_incorrect_classified(group, statstype)
+            groups.append(ClassificationResult(statstype, len(group), count, ids, caption))
+        return self.publish(ClassificationStepResult(chart_name, groups), start)
+
+    def check_search_volume(self, data, chart_name = "keyword"):
+        """搜尋量檢測 (step8)：檢查 keyword 表中 search_volume 為 0 或空值的列數，並依 is_brand、domain 分組"""
+        start = time.perf_counter()
+        try:
+            counts = count_search_volume(data)
+        except Exception as e:
+            return self.publish(SearchVolumeResult(None, str(e)), start)
+        return self.publish(search_volume_result(counts), start)
+
+    # ==========================================================================================================================
+    # * * * 步驟執行器：依 constants.charts 的步驟清單執行上面的輔助函數 * * * 
+    # ==========================================================================================================================
+
+    def run_step(self, step, data, chart_name):
+        """
+        執行單一驗證步驟。同一份資料、同一報表種類的同一步驟只會執行一次，之後直接回傳記住的結果。
+
+        Parameters:
+        -----------
+        step : str
+            STEP_FUNCTIONS 中的步驟名稱，例如 "step1"
+        data : pandas DataFrame
+        chart_name : str
+
+        Returns:
+        --------
+        results.CheckResult
+            該步驟輔助函數回傳的結果物件
+        """
+        key = (step, chart_name, id(data))
+        cached = self._step_cache.get(key)
+        # 以 weakref 確認是同一個 DataFrame，而不是 id 被重複使用的新物件
+        if cached is not None and cached[0]() is data:
+            self._step_cache.move_to_end(key)
+            return cached[1]
+        with self.profile.measure(STEP_LABELS[step]):
+            result = STEP_FUNCTIONS[step](self, data, chart_name)
+        self._step_cache[key] = (weakref.ref(data), result)
+        self._step_cache.move_to_end(key)
+        if len(self._step_cache) > STEP_CACHE_SIZE:
+            self._step_cache.popitem(last = False)
+        return result
+
+    def run_plan(self, data, chart_name, steps = None):
+        """
+        依報表種類的步驟清單（預設為 constants.charts[chart_name]）依序執行驗證
+
+        Returns:
+        --------
+        dict
+            步驟名稱 -> 該步驟的結果物件 (results.CheckResult)
+        """
+        if steps is None:
+            steps = charts[chart_name]
+        return {step: self.run_step(step, data, chart_name) for step in steps}
+
+    # ==========================================================================================================================
+    # * * * 以下為各表的資料驗證函數。步驟清單定義於 constants.charts * * * 
+    # ==========================================================================================================================
+
+    def check_products(self, data):
+        return self.run_plan(data, "products")["step3"].duplicated_ids
+
+    def check_products_extend(self, data):
+        return self.run_plan(data, "products_extend")["step3"].duplicated_ids
+
+    def check_chart_brands(self, data):
+        self.run_plan(data, "chart_brands")
+
+    def check_chart_brands_extend(self, data):
+        self.run_plan(data, "chart_brands_extend")
+
+    def check_chart_brands_extend_cross(self, data):
+        self.run_plan(data, "chart_brands_extend_cross")
+
+    def check_chart_brands_extend_image(self, data):
+        results = self.run_plan(data, "chart_brands_extend_image")
+        self.chart_brand_extend_image_details["incorrect_classified_ids"] = results["step5"].incorrect_ids
+
+    def check_chart_brands_comment_counts(self, data):
+        self.run_plan(data, "chart_brands_comment_counts")
+
+    def check_chart_brands_comment_score(self, data):
+        # chart_brands_comment_score 目前未開放 (rules.json 的 enabled 為 false)，不在 charts 中
+        self.run_plan(data, "chart_brands_comment_score", Chart_rules["chart_brands_comment_score"].steps)
+
+    def check_chart_others(self, data):
+        self.run_plan(data, "chart_others")
+
+    def check_chart_trends(self, data):
+        self.run_plan(data, "chart_trends")
+
+    def check_reference(self, data):
+        self.run_plan(data, "reference")
+
+    def check_keyword(self, data):
+        self.run_plan(data, "keyword")
+        
+    def check_category_coverage(self, data, level="further_subcategory"):
+        """
+        檢查上傳的表格是否包含所有分類
+        
+        Parameters:
+        -----------
+        data : pandas DataFrame
+            要檢查的資料
+        level : str
+            檢查的分類層級，可以是 "subcategory" 或 "further_subcategory"
+            
+        Returns:
+        --------
+        list
+            缺失的分類列表；結果物件 (results.CoverageResult) 記錄在 self.results["category_coverage"]
+        """
+        with self.profile.measure(COVERAGE_LABEL):
+            start = time.perf_counter()
+            class_cols = COVERAGE_COLUMNS[level]
+            counts = None
+            if all(col in data.columns for col in class_cols):
+                # 一次 groupby 計算資料中各分類組合的數量
+                counts = data.groupby(class_cols, dropna = True, observed = True).size()
+            return self.publish(coverage_result(self.classification, data.columns, counts, level), start).missing
+        
+    def _style_category_coverage(self, df):
+        """
+        為分類覆蓋率結果添加樣式（見 presenter.style_category_coverage）
+        
+        Parameters:
+        -----------
+        df : pandas DataFrame
+            要添加樣式的資料
+            
+        Returns:
+        --------
+        pandas DataFrame
+            帶有樣式的資料
+        """
+        return style_category_coverage(df)
+    
+    def check_category_coverage_stats(self):
+        """
+        檢查類別覆蓋率統計
+        
+        Returns:
+        --------
+        dict
+            包含各分類層級覆蓋率和是否通過閾值檢查的結果
+        """
+        # 獲取當前資料的唯一分類值
+        current_counts = {
+            '大分類': len(self.classification['category'].unique()) if 'category' in self.classification.columns else 0,
+            '中分類': len(self.classification['subcategory'].unique()) if 'subcategory' in self.classification.columns else 0,
+            '小分類': len(self.classification['further_subcategory'].unique()) if 'further_subcategory' in self.classification.columns else 0
+        }
+        
+        # 獲取總類別數量
+        total_counts = self.get_total_category_counts()
+        
+        # 計算覆蓋率
+        coverage = {
+            '大分類覆蓋率': current_counts['大分類'] / total_counts['大分類'] if total_counts['大分類'] > 0 else 0,
+            '中分類覆蓋率': current_counts['中分類'] / total_counts['中分類'] if total_counts['中分類'] > 0 else 0,
+            '小分類覆蓋率': current_counts['小分類'] / total_counts['小分類'] if total_counts['小分類'] > 0 else 0
+        }
+        
+        # 判斷是否通過
+        passed = all(rate >= CATEGORY_COVERAGE_THRESHOLD for rate in coverage.values())
+        
+        # 返回結果
+        return {
+            **coverage,
+            '閾值': CATEGORY_COVERAGE_THRESHOLD,
+            '通過': passed
+        }
+    
+    def get_total_category_counts(self):
+        """
+        獲取標準分類表中各層級的總類別數量
+        
+        Returns:
+        --------
+        dict
+            各分類層級的總數量
+        """
+        if hasattr(self, 'classification') and isinstance(self.classification, pd.DataFrame):
+            # 使用相同的欄位名稱來獲取計數
+            return {
+                '大分類': len(self.classification['category'].unique()) if 'category' in self.classification.columns else 0,
+                '中分類': len(self.classification['subcategory'].unique()) if 'subcategory' in self.classification.columns else 0,
+                '小分類': len(self.classification['further_subcategory'].unique()) if 'further_subcategory' in self.classification.columns else 0
+            }
+        else:
+            # 如果沒有標準分類表，返回預設值
+            return {'大分類': 1, '中分類': 1, '小分類': 1}
+
+    def check_empty_cells(self):
+        """
+        檢查資料中的空值儲存格
+        
+        Returns:
+        --------
+        dict
+            包含各欄位空值數量的字典
+        """
+        empty_cells = {}
+        
+        if hasattr(self, 'classification') and isinstance(self.classification, pd.DataFrame):
+            # 計算每個欄位的空值數量
+            for col in self.classification.columns:
+                null_count = self.classification[col].isna().sum()
+                if null_count > 0:
+                    empty_cells[col] = null_count
+                    
+            # 保存詳細資訊
+            self.empty_cells_details = empty_cells
+            
+            # 在 streamlit 環境中顯示結果（如果是在應用中運行）
+            try:
+                if empty_cells:
+                    self.sink.write("🔆 資料中存在空值儲存格：")
+                    self.sink.dataframe(pd.DataFrame(list(empty_cells.items()), columns=['欄位', '空值數量']))
+                else:
+                    self.sink.write("✅ 資料中沒有空值儲存格")
+            except (AttributeError, NameError):
+                # 如果在測試環境，忽略 streamlit 顯示
+                pass
+                
+        return empty_cells
+    
+    def check_duplicated_products(self):
+        """
+        檢查重複的產品資料
+        
+        Returns:
+        --------
+        list
+            重複產品的索引列表
+        """
+        duplicates = []
+        
+        if hasattr(self, 'classification') and isinstance(self.classification, pd.DataFrame):
+            # 根據產品名稱檢查重複
+            if '產品名稱' in self.classification.columns:
+                dup_mask = self.classification.duplicated(subset=['產品名稱'], keep=False)
+                duplicates = self.classification[dup_mask].index.tolist()
+                
+                # 保存詳細資訊
+                self.duplicated_products_details = {
+                    'count': len(duplicates),
+                    'indices': duplicates
+                }
+                
+                # 在 streamlit 環境中顯示結果（如果是在應用中運行）
+                try:
+                    if duplicates:
+                        self.sink.write(f"🔔 發現 {len(duplicates)} 筆重複的產品資料")
+                        self.sink.dataframe(self.classification[dup_mask])
+                    else:
+                        self.sink.write("✅ 沒有重複的產品資料")
+                except (AttributeError, NameError):
+                    # 如果在測試環境，忽略 streamlit 顯示
+                    pass
+                    
+        return duplicates
+    
+    def check_brands(self):
+        """
+        檢查品牌資料
+        
+        Returns:
+        --------
+        dict
+            品牌統計資訊
+        """
+        brand_stats = {}
+        
+        if hasattr(self, 'classification') and isinstance(self.classification, pd.DataFrame):
+            # 檢查品牌欄位是否存在
+            if '品牌' in self.classification.columns:
+                # 統計每個品牌的數量
+                brand_counts = self.classification['品牌'].value_counts()
+                
+                # 轉換為字典
+                brand_stats = brand_counts.to_dict()
+                
+                # 在 streamlit 環境中顯示結果（如果是在應用中運行）
+                try:
+                    self.sink.write("🔆 品牌統計資訊：")
+                    self.sink.dataframe(pd.DataFrame(list(brand_stats.items()), columns=['品牌', '數量']))
+                except (AttributeError, NameError):
+                    # 如果在測試環境，忽略 streamlit 顯示
+                    pass
+                
+        return brand_stats
+    
+    def chart_brands_category(self):
+        """
+        生成品牌與大分類的交叉統計圖表
+        """
+        if hasattr(self, 'classification') and isinstance(self.classification, pd.DataFrame):
+            # 檢查必要欄位是否存在
+            if '品牌' in self.classification.columns and 'category' in self.classification.columns:
+                # 生成交叉表
+                cross_tab = pd.crosstab(
+                    self.classification['品牌'], 
+                    self.classification['category']
+                )
+                
+                # 在 streamlit 環境中顯示結果（如果是在應用中運行）
+                try:
+                    self.sink.write("🔆 品牌與大分類交叉統計：")
+                    self.sink.dataframe(cross_tab)
+                except (AttributeError, NameError):
+                    # 如果在測試環境，忽略 streamlit 顯示
+                    pass
+                
+                # 保存詳細資訊
+                self.chart_brand_details["category"] = cross_tab.to_dict()
+                
+    def chart_brands_subcategory(self):
+        """
+        生成品牌與中分類的交叉統計圖表
+        """
+        if hasattr(self, 'classification') and isinstance(self.classification, pd.DataFrame):
+            # 檢查必要欄位是否存在
+            if '品牌' in self.classification.columns and 'subcategory' in self.classification.columns:
+                # 生成交叉表
+                cross_tab = pd.crosstab(
+                    self.classification['品牌'], 
+                    self.classification['subcategory']
+                )
+                
+                # 在 streamlit 環境中顯示結果（如果是在應用中運行）
+                try:
+                    self.sink.write("🔆 品牌與中分類交叉統計：")
+                    self.sink.dataframe(cross_tab)
+                except (AttributeError, NameError):
+                    # 如果在測試環境，忽略 streamlit 顯示
+                    pass
+                
+                # 保存詳細資訊
+                self.chart_brand_details["subcategory"] = cross_tab.to_dict()
+    
+    def generate_verification_report(self):
+        """
+        生成驗證報告
+        
+        Returns:
+        --------
+        dict
+            包含所有驗證結果的報告
+        """
+        # 轉換 empty_cells_details
+        if self.empty_cells_details:
+            self.empty_cells_details = convert_numpy_to_native(self.empty_cells_details)
+            
+        report = {
+            'empty_cells': self.empty_cells_details,
+            'duplicate_products': self.duplicated_products_details,
+            'category_coverage': self.category_coverage_details,
+            'brands': self.chart_brand_details,
+            'checks': {name: result.to_dict() for name, result in self.results.items()},
+            'profile': self.profile.to_dict()
+        }
+        
+        # 添加檔案名稱（如果有）
+        if self.file_name:
+            report['file_name'] = self.file_name
+        
+        # 計算問題總數
+        empty_cell_count = sum(self.empty_cells_details.values()) if self.empty_cells_details else 0
+        duplicate_count = self.duplicated_products_details.get('count', 0) if self.duplicated_products_details else 0
+        
+        summary = pd.DataFrame({
+            '項目': ['空值儲存格數量', '重複產品數量'],
+            '數量': [empty_cell_count, duplicate_count]
+        })
+        
+        # 在 streamlit 環境中顯示報告摘要（如果是在應用中運行）
+        try:
+            self.sink.write("📋 驗證報告摘要：")
+            self.sink.dataframe(summary)
+            
+            # 提供下載報告的按鈕
+            if self.file_name:
+                # 轉換報告中的所有 numpy 類型為 Python 原生類型
+                json_safe_report = convert_numpy_to_native(report)
+                
+                self.sink.download_button(
+                    label="下載驗證報告",
+                    data=json.dumps(json_safe_report, ensure_ascii=False, indent=2),
+                    file_name=f"{self.file_name.split('.')[0]}_verification_report.json",
+                    mime="application/json"
+                )
+        except (AttributeError, NameError):
+            # 如果在測試環境，忽略 streamlit 顯示
+            pass
+            
+        return report
+
+
+# ==========================================================================================================================
+# * * * 命令列批次模式：python -m verify <分類表> <報表檔案或資料夾> ... * * *
+# ==========================================================================================================================
+
+REPORT_EXTENSIONS = (".csv", ".xlsx") + COLUMNAR_EXTENSIONS
+
+def load_table(path, chart_name = None):
+    """讀取 csv、Excel、Parquet 或 Arrow 檔案（依檔案內容判斷格式）；指定 chart_name 時欄式格式只載入該報表需要的欄位"""
+    return read_table(path, chart_name = chart_name)
+
+def collect_report_files(paths):
+    """
+    展開報表路徑：檔案直接保留，資料夾則遞迴找出其中所有報表檔案（REPORT_EXTENSIONS）
+
+    略過 Office / LibreOffice 的暫存鎖定檔（~$xxx.xlsx、.~lock.xxx#）。
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                for name in sorted(names):
+                    if name.startswith(("~$", ".~lock")) or not name.lower().endswith(REPORT_EXTENSIONS):
+                        continue
+                    files.append(os.path.join(root, name))
+        else:
+            files.append(path)
+    return files
+
+def verify_report(classification, path, chart_name = None, classification_index = None, chunksize = None, trace_memory = False):
+    """
+    驗證單一報表檔案，回傳可轉為 JSON 的結果字典
+
+    Parameters:
+    -----------
+    classification : pandas DataFrame
+        已加上 classification_* 組合鍵欄位的分類表
+    path : str
+        報表檔案路徑
+    chart_name : str or None
+        報表種類；為 None 時依檔名自動判斷
+    classification_index : dict or None
+        build_classification_index 的結果；多個報表共用同一份索引
+    chunksize : int or None
+        指定時 csv 報表改為分段讀取（見 streaming.py），每段 chunksize 列
+    trace_memory : bool
+        是否在 profile 中記錄各步驟的記憶體峰值（tracemalloc，會拖慢執行速度）
+
+    Returns:
+    --------
+    dict
+        file, chart_name, rows, missing_categories, duplicated_ids, checks（各檢查的結果物件 to_dict()）,
+        profile（讀檔與各步驟的執行時間，見 profiling.py）, messages, tables；
+        無法判斷報表種類或讀取失敗時只有 file 與 error
+    """
+    file_name = os.path.basename(path)
+    result = {"file": path}
+    if chart_name is None:
+        chart_name, auto_detected = match_chart_type_from_filename(file_name, list(charts.keys()))
+        if not auto_detected:
+            result["error"] = "無法依檔名判斷報表種類，請以 --chart 指定"
+            return result
+    result["chart_name"] = chart_name
+
+    sink = CollectingSink()
+    profile = Profile(trace_memory = trace_memory)
+    verifier = Verify(classification, file_name = file_name, sink = sink, classification_index = classification_index, profile = profile)
+    if chunksize and sniff_format(path) == "csv":
+        # 分段讀取：記憶體用量取決於 chunksize，而不是檔案大小
+        from streaming import stream_verify
+        try:
+            stream = stream_verify(verifier, path, chart_name, chunksize)
+        except Exception as e:
+            result["error"] = f"驗證失敗: {type(e).__name__}: {e}"
+            return convert_numpy_to_native(result)
+        result["rows"] = stream.rows
+        plan_results = stream.results
+    else:
+        try:
+            with profile.measure("load_report"):
+                data = load_table(path, chart_name)
+        except Exception as e:
+            result["error"] = f"讀取報表失敗: {e}"
+            return result
+        result["rows"] = len(data)
+        try:
+            verifier.check_category_coverage(data)
+            plan_results = verifier.run_plan(data, chart_name)
+        except Exception as e:
+            result["error"] = f"驗證失敗: {type(e).__name__}: {e}"
+            return convert_numpy_to_native(result)
+    coverage = verifier.results.get("category_coverage")
+    result["missing_categories"] = coverage.missing if coverage is not None else []
+    result["duplicated_ids"] = plan_results["step3"].duplicated_ids if "step3" in plan_results else []
+    result["checks"] = {name: check.to_dict() for name, check in verifier.results.items()}
+    result["profile"] = profile.to_dict()
+    result["messages"] = [message for message in sink.messages if message]
+    result["tables"] = sink.tables
+    return convert_numpy_to_native(result)
+
+# 子程序共用的分類表與索引；以 fork 啟動時直接繼承父程序的記憶體，不需重新建立
+# make_worker_pool 的子程序保留的分類表、索引與驗證選項（見 _init_worker）
+_worker_state = {}
+
+def _init_worker(classification, classification_index, chart_name, chunksize, trace_memory):
+    _worker_state["classification"] = classification
+    _worker_state["classification_index"] = classification_index
+    _worker_state["chart_name"] = chart_name
+    _worker_state["chunksize"] = chunksize
+    _worker_state["trace_memory"] = trace_memory
+
+def make_worker_pool(classification, jobs, classification_index = None, chart_name = None, chunksize = None, trace_memory = False):
+    """
+    建立驗證報表的子程序池，以 verify_in_worker 送出工作
+
+    優先以 fork 啟動，子程序直接繼承分類表與索引；其他啟動方式在每個子程序啟動時傳入一次，
+    之後每個工作都不需要重新傳送分類表。
+
+    Parameters:
+    -----------
+    classification : pandas DataFrame
+        已加上 classification_* 組合鍵欄位的分類表
+    jobs : int
+        子程序數量
+    classification_index : dict or None
+        build_classification_index 的結果；None 時在這裡建立
+    chart_name : str or None
+        verify_in_worker 沒有指定報表種類時使用的種類；None 時依檔名判斷
+    chunksize : int or None
+        指定時 csv 報表改為分段讀取
+    trace_memory : bool
+        是否記錄各步驟的記憶體峰值
+
+    Returns:
+    --------
+    concurrent.futures.ProcessPoolExecutor
+    """
+    if classification_index is None:
+        classification_index = build_classification_index(classification)
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    return concurrent.futures.ProcessPoolExecutor(
+        max_workers = jobs,
+        mp_context = context,
+        initializer = _init_worker,
+        initargs = (classification, classification_index, chart_name, chunksize, trace_memory)
+    )
+
+def verify_in_worker(path, chart_name = None, file_name = None):
+    """
+    在 make_worker_pool 的子程序中以保留的分類表與索引驗證一個報表（executor.submit(verify_in_worker, path)）
+
+    Parameters:
+    -----------
+    path : str
+        報表檔案路徑
+    chart_name : str or None
+        報表種類；None 時使用 make_worker_pool 指定的種類
+    file_name : str or None
+        指定時取代結果中的 file（例如上傳檔案的原始檔名，而不是暫存檔的路徑）
+
+    Returns:
+    --------
+    dict
+        verify_report 的結果
+    """
+    result = verify_report(
+        _worker_state["classification"],
+        path,
+        chart_name if chart_name is not None else _worker_state["chart_name"],
+        _worker_state["classification_index"],
+        _worker_state["chunksize"],
+        _worker_state["trace_memory"]
+    )
+    if file_name is not None:
+        result["file"] = file_name
+    return result
+
+def _run_reports(classification, paths, chart_name, classification_index, jobs, chunksize, trace_memory):
+    """依序或以多個子程序驗證報表，回傳與 paths 順序相同的 verify_report 結果"""
+    jobs = min(jobs or os.cpu_count() or 1, len(paths))
+    if jobs <= 1:
+        return [verify_report(classification, path, chart_name, classification_index, chunksize, trace_memory) for path in paths]
+
+    with make_worker_pool(classification, jobs, classification_index, chart_name, chunksize, trace_memory) as executor:
+        return list(executor.map(verify_in_worker, paths))
+
+def _cache_key(cache, path, chart_name, classification_digest):
+    """報表的快取鍵；無法判斷報表種類或讀不到檔案時為 None（交給 verify_report 回報錯誤，不快取）"""
+    if chart_name is None:
+        chart_name, auto_detected = match_chart_type_from_filename(os.path.basename(path), list(charts.keys()))
+        if not auto_detected:
+            return None
+    try:
+        return cache.key(file_digest(path), classification_digest, chart_name)
+    except OSError:
+        return None
+
+def verify_reports(classification, paths, chart_name = None, jobs = 1, chunksize = None, trace_memory = False,
+                   cache = None, classification_digest = None):
+    """
+    以同一份分類表驗證多個報表，可使用多個子程序平行處理
+
+    分類組合鍵索引只在主程序建立一次，再交給所有子程序共用。
+    指定 cache 時，報表內容、分類表、報表種類與規範都沒有改變的報表直接回傳快取的結果（帶有 cached = True），
+    其餘報表驗證成功後存入快取。
+
+    Parameters:
+    -----------
+    classification : pandas DataFrame
+        已加上 classification_* 組合鍵欄位的分類表
+    paths : list
+        報表檔案路徑
+    chart_name : str or None
+        報表種類；為 None 時依檔名自動判斷
+    jobs : int
+        平行處理的子程序數量；1 表示在目前程序中依序處理，0 表示使用所有 CPU 核心
+    chunksize : int or None
+        指定時 csv 報表改為分段讀取
+    trace_memory : bool
+        是否記錄各步驟的記憶體峰值
+    cache : result_cache.ResultCache or None
+        驗證結果的磁碟快取
+    classification_digest : str or None
+        分類表檔案內容的雜湊值（快取鍵的一部分）；為 None 時以分類表的內容計算
+
+    Returns:
+    --------
+    list
+        與 paths 順序相同的 verify_report 結果
+    """
+    results = [None] * len(paths)
+    keys = [None] * len(paths)
+    if cache is not None:
+        if classification_digest is None:
+            classification_digest = hashlib.sha1(pd.util.hash_pandas_object(classification, index = False).to_numpy()).hexdigest()
+        for i, path in enumerate(paths):
+            keys[i] = _cache_key(cache, path, chart_name, classification_digest)
+            cached = cache.get(keys[i]) if keys[i] is not None else None
+            if cached is not None:
+                # 相同內容的報表可能位於不同路徑
+                results[i] = {**cached, "file": path, "cached": True}
+
+    pending = [i for i, result in enumerate(results) if result is None]
+    if pending:
+        classification_index = build_classification_index(classification)
+        verified = _run_reports(classification, [paths[i] for i in pending], chart_name, classification_index, jobs, chunksize, trace_memory)
+        for i, result in zip(pending, verified):
+            results[i] = result
+            # 讀取失敗等錯誤可能只是暫時的，不快取
+            if keys[i] is not None and "error" not in result:
+                cache.put(keys[i], result)
+    return results
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(
+        prog = "python -m verify",
+        description = "設研院報表驗證（命令列批次模式）：依檔名判斷報表種類並輸出 JSON 驗證結果"
+    )
+    parser.add_argument("classification", help = "產品分類表（csv、xlsx、Parquet 或 Arrow）")
+    parser.add_argument("reports", nargs = "+", help = "欲驗證的報表檔案或資料夾")
+    parser.add_argument("--chart", choices = list(charts.keys()), help = "指定報表種類（預設依檔名自動判斷）")
+    parser.add_argument("-o", "--output", help = "輸出 JSON 檔案路徑（預設輸出至 stdout）")
+    parser.add_argument("-j", "--jobs", type = int, default = 1, help = "平行處理的子程序數量，0 表示使用所有 CPU 核心（預設 1）")
+    parser.add_argument("--chunksize", type = int, help = "csv 報表改為分段讀取，每段的列數（大型報表節省記憶體）")
+    parser.add_argument("--trace-memory", action = "store_true", help = "在 profile 中記錄各步驟的記憶體峰值（會拖慢執行速度）")
+    parser.add_argument("--cache", help = "驗證結果的快取檔案（SQLite）；報表、分類表、報表種類與規範都沒有改變時直接使用先前的結果")
+    parser.add_argument("--cache-size", type = int, default = DEFAULT_CACHE_BYTES // 2 ** 20, help = "快取的大小上限 (MB)，超過時淘汰最久沒有使用的結果（預設 256）")
+    args = parser.parse_args(argv)
+
+    classification = prepare_classification(read_classification(args.classification))
+
+    cache = ResultCache(args.cache, args.cache_size * 2 ** 20) if args.cache else None
+    try:
+        results = verify_reports(
+            classification, collect_report_files(args.reports), args.chart, args.jobs, args.chunksize, args.trace_memory,
+            cache = cache, classification_digest = file_digest(args.classification) if cache is not None else None
+        )
+    finally:
+        if cache is not None:
+            cache.close()
+    output = json.dumps(results, ensure_ascii = False, indent = 2)
+    if args.output:
+        with open(args.output, "w", encoding = "utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    # 有任何檔案無法驗證時回傳非 0，方便排程判斷
+    return 1 if any("error" in result for result in results) else 0
+